@@ -0,0 +1,102 @@
+"""
+Chargement en cache de l'utilisateur authentifié par session.
+
+À chaque requête authentifiée par session, Django recharge l'utilisateur depuis
+la table auth_user puis compare le hash de session enregistré à la connexion
+(dérivé du mot de passe) à celui de l'utilisateur. `CachedAuthenticationMiddleware`
+lit d'abord l'utilisateur dans le cache Django, sous une clé qui contient son id
+et une empreinte de ce hash de session.
+
+Une entrée n'est créée qu'après la vérification complète faite par Django : la
+retrouver à partir du hash de la session vaut vérification. Après un changement
+de mot de passe, le hash de l'utilisateur change et les anciennes sessions ne
+correspondent plus à aucune entrée. L'entrée de l'ancien hash est de plus
+supprimée par les signaux de `accounts.signals` à chaque `save()`, ce qui
+applique aussi une désactivation (is_active) sans attendre. Avant une
+modification sans signal (`QuerySet.update()`, SQL), appeler
+`invalider_cache_utilisateur` avec l'utilisateur et son mot de passe actuel,
+sinon les sessions existantes restent acceptées jusqu'à AUTH_USER_CACHE_TIMEOUT.
+
+Le hash du mot de passe n'est pas mis en cache : l'utilisateur est reconstruit
+avec le champ `password` différé (relu en base seulement si on y accède, et non
+réécrit par `save()`).
+"""
+import hashlib
+
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils.functional import SimpleLazyObject
+
+# Champs de l'utilisateur non conservés dans le cache
+CHAMPS_NON_CACHES = ('password',)
+
+
+def cle_cache_utilisateur(user_id, hash_session):
+    """Clé de cache de l'utilisateur `user_id` pour le hash de session `hash_session`."""
+    empreinte = hashlib.sha256(hash_session.encode()).hexdigest()[:16]
+    return f'auth_user:{user_id}:{empreinte}'
+
+
+def invalider_cache_utilisateur(user):
+    """Supprime du cache l'utilisateur `user` pour son mot de passe actuel."""
+    cache.delete(cle_cache_utilisateur(user.pk, user.get_session_auth_hash()))
+
+
+def valeurs_utilisateur(user):
+    """Valeurs des champs de `user` mises en cache."""
+    return {
+        field.attname: getattr(user, field.attname)
+        for field in User._meta.concrete_fields
+        if field.attname not in CHAMPS_NON_CACHES
+    }
+
+
+def utilisateur_depuis_cache(valeurs):
+    """Reconstruit l'utilisateur à partir de ses valeurs en cache, `password` différé."""
+    noms = list(valeurs)
+    return User.from_db(User.objects.db, noms, [valeurs[nom] for nom in noms])
+
+
+def charger_utilisateur(request):
+    """
+    Retourne l'utilisateur de la session de `request`, comme
+    `django.contrib.auth.get_user`, en le lisant si possible dans le cache.
+    """
+    session = request.session
+    user_id = session.get(SESSION_KEY)
+    hash_session = session.get(HASH_SESSION_KEY)
+    if user_id is None or not hash_session or session.get(BACKEND_SESSION_KEY) not in settings.AUTHENTICATION_BACKENDS:
+        return auth.get_user(request)
+
+    valeurs = cache.get(cle_cache_utilisateur(user_id, hash_session))
+    if valeurs is not None:
+        return utilisateur_depuis_cache(valeurs)
+
+    # Lecture et vérification de la session par Django (ModelBackend écarte les
+    # utilisateurs inactifs)
+    user = auth.get_user(request)
+    if user.is_authenticated:
+        cache.set(
+            cle_cache_utilisateur(user.pk, user.get_session_auth_hash()),
+            valeurs_utilisateur(user),
+            timeout=settings.AUTH_USER_CACHE_TIMEOUT,
+        )
+    return user
+
+
+def obtenir_utilisateur(request):
+    if not hasattr(request, '_cached_user'):
+        request._cached_user = charger_utilisateur(request)
+    return request._cached_user
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """AuthenticationMiddleware dont `request.user` est lu par `charger_utilisateur`."""
+
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: obtenir_utilisateur(request))
@@ -5,6 +5,11 @@ Ces serializers gèrent la sérialisation et la validation des données d'authen
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+
+from .tokens import GinRefreshToken
 from .models import Administrateur
 
 
@@ -95,4 +100,34 @@ class ConnexionSerializer(serializers.Serializer):
             raise serializers.ValidationError(msg, code='authorization')
 
         attrs['user'] = user
+        attrs['admin'] = admin
         return attrs
+
+
+class GinTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    Sérialiseur d'obtention des tokens JWT.
+    Les tokens générés portent le rôle de l'utilisateur (claim `is_gin_admin`).
+    """
+    token_class = GinRefreshToken
+
+
+class GinTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Sérialiseur de rafraîchissement du token d'accès.
+    Le claim `is_gin_admin` du nouveau token d'accès est réévalué.
+
+    Les requêtes authentifiées par le token d'accès ne lisent pas auth_user :
+    le rafraîchissement est le seul moment où un compte désactivé ou supprimé
+    est refusé, il est donc vérifié explicitement.
+    """
+    token_class = GinRefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        user = User.objects.filter(
+            **{api_settings.USER_ID_FIELD: refresh.payload.get(api_settings.USER_ID_CLAIM)}
+        ).first()
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(self.error_messages['no_active_account'], 'no_active_account')
+        return super().validate(attrs)
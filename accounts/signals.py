@@ -1,6 +1,10 @@
 from django.contrib.auth.models import User
-from django.db.models.signals import post_save
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_save, m2m_changed, pre_delete, pre_save
 from django.dispatch import receiver
+from backend.permissions import cle_cache_admin
+from .middleware import invalider_cache_utilisateur
 from .models import Administrateur
 
 @receiver(post_save, sender=User)
@@ -8,3 +12,48 @@ def ajouter_admin_automatiquement(sender, instance, created, **kwargs):
     if instance.is_superuser:
         admin_obj, created = Administrateur.objects.get_or_create(id=1)
         admin_obj.utilisateurs.add(instance)
+
+
+def invalider_cache_admin(user_ids):
+    """
+    Supprime du cache le statut administrateur des utilisateurs donnés.
+    La suppression est refaite après validation de la transaction, au cas où une
+    requête concurrente aurait remis en cache l'ancienne valeur entre-temps.
+    """
+    cles = [cle_cache_admin(user_id) for user_id in user_ids]
+    if cles:
+        cache.delete_many(cles)
+        transaction.on_commit(lambda: cache.delete_many(cles))
+
+
+@receiver(m2m_changed, sender=Administrateur.utilisateurs.through)
+def administrateurs_modifies(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear':
+        # La liste des utilisateurs concernés n'est plus disponible après le clear
+        if reverse:
+            instance._utilisateurs_avant_clear = [instance.pk]
+        else:
+            instance._utilisateurs_avant_clear = list(instance.utilisateurs.values_list('pk', flat=True))
+    elif action == 'post_clear':
+        invalider_cache_admin(getattr(instance, '_utilisateurs_avant_clear', []))
+    elif action in ('post_add', 'post_remove'):
+        invalider_cache_admin([instance.pk] if reverse else pk_set)
+
+
+@receiver(pre_delete, sender=Administrateur)
+def administrateur_supprime(sender, instance, **kwargs):
+    invalider_cache_admin(list(instance.utilisateurs.values_list('pk', flat=True)))
+
+
+@receiver(pre_save, sender=User)
+@receiver(pre_delete, sender=User)
+def utilisateur_modifie(sender, instance, **kwargs):
+    # L'utilisateur mis en cache par CachedAuthenticationMiddleware est rangé
+    # sous le hash du mot de passe en base, relu ici avant son éventuel changement
+    if instance._state.adding:
+        return
+    ancien = User.objects.filter(pk=instance.pk).values_list('password', flat=True).first()
+    if ancien is not None:
+        utilisateur = User(pk=instance.pk, password=ancien)
+        invalider_cache_utilisateur(utilisateur)
+        transaction.on_commit(lambda: invalider_cache_utilisateur(utilisateur))
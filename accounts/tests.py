@@ -1,13 +1,25 @@
+from unittest import mock
 from rest_framework.test import APITestCase
 from rest_framework import status
+from rest_framework.settings import api_settings
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import AccessToken
+from backend.permissions import is_gin_admin
+from .middleware import cle_cache_utilisateur
 from .models import Administrateur
+from .throttles import nombre_rejets
 from django.urls import reverse
 
 class AccountsAPITestCase(APITestCase):
 
     def setUp(self):
         """Configuration initiale pour les tests."""
+        cache.clear()
         self.user = User.objects.create_user(username="admin", password="adminpass")
         self.admin = Administrateur.objects.create()
         self.admin.utilisateurs.add(self.user)
@@ -66,3 +78,216 @@ class AccountsAPITestCase(APITestCase):
     def test_model_str_representation(self):
         """Test de la représentation textuelle du modèle Administrateur."""
         self.assertIn(self.user.username, str(self.admin))
+
+
+class IsGinAdminTestCase(APITestCase):
+    """Tests du résolveur is_gin_admin et de son cache."""
+
+    def setUp(self):
+        """Configuration initiale pour les tests."""
+        cache.clear()
+        self.user = User.objects.create_user(username="admin", password="adminpass")
+        self.admin = Administrateur.objects.create()
+        self.admin.utilisateurs.add(self.user)
+
+    def test_resultat_mis_en_cache(self):
+        """Le statut administrateur n'est lu en base qu'une seule fois."""
+        with self.assertNumQueries(1):
+            self.assertTrue(is_gin_admin(self.user))
+        with self.assertNumQueries(0):
+            self.assertTrue(is_gin_admin(self.user))
+
+    def test_memorise_sur_la_requete(self):
+        """Plusieurs vérifications pendant la même requête ne consultent pas le cache."""
+        request = RequestFactory().get('/')
+        is_gin_admin(self.user, request)
+        with mock.patch('backend.permissions.cache') as cache_mock:
+            self.assertTrue(is_gin_admin(self.user, request))
+        cache_mock.get.assert_not_called()
+
+    def test_invalidation_retrait_administrateur(self):
+        """Retirer un utilisateur des administrateurs invalide le cache."""
+        self.assertTrue(is_gin_admin(self.user))
+        self.admin.utilisateurs.remove(self.user)
+        self.assertFalse(is_gin_admin(self.user))
+        self.user.administrateurs.add(self.admin)
+        self.assertTrue(is_gin_admin(self.user))
+        self.admin.utilisateurs.clear()
+        self.assertFalse(is_gin_admin(self.user))
+
+
+class TokenAdminClaimTestCase(APITestCase):
+    """Tests du claim is_gin_admin embarqué dans les tokens JWT."""
+
+    def setUp(self):
+        """Configuration initiale pour les tests."""
+        cache.clear()
+        self.user = User.objects.create_user(username="admin", password="adminpass")
+        self.admin = Administrateur.objects.create()
+        self.admin.utilisateurs.add(self.user)
+        self.non_admin_user = User.objects.create_user(username="user", password="userpass")
+
+    def obtenir_tokens(self, username, password):
+        response = self.client.post(
+            reverse('accounts:token-obtain'), {'username': username, 'password': password}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_claim_dans_le_token(self):
+        """Le token d'accès porte le rôle de l'utilisateur."""
+        access = AccessToken(self.obtenir_tokens("admin", "adminpass")['access'])
+        self.assertTrue(access['is_gin_admin'])
+        access = AccessToken(self.obtenir_tokens("user", "userpass")['access'])
+        self.assertFalse(access['is_gin_admin'])
+
+    def test_permission_sans_requete_utilisateur(self):
+        """Une requête authentifiée par JWT ne lit ni auth_user ni les administrateurs."""
+        access = self.obtenir_tokens("admin", "adminpass")['access']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('demandestage-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        tables = ' '.join(query['sql'] for query in ctx.captured_queries)
+        self.assertNotIn('auth_user', tables)
+        self.assertNotIn('accounts_administrateur', tables)
+
+    def test_claim_reevalue_au_rafraichissement(self):
+        """Le retrait des administrateurs est pris en compte au rafraîchissement du token."""
+        refresh = self.obtenir_tokens("admin", "adminpass")['refresh']
+        self.admin.utilisateurs.remove(self.user)
+        response = self.client.post(reverse('accounts:token-refresh'), {'refresh': refresh}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(AccessToken(response.data['access'])['is_gin_admin'])
+
+    def test_rafraichissement_refuse_compte_inactif(self):
+        """Un compte désactivé ou supprimé ne peut plus obtenir de token d'accès."""
+        refresh = self.obtenir_tokens("admin", "adminpass")['refresh']
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.post(reverse('accounts:token-refresh'), {'refresh': refresh}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        refresh = self.obtenir_tokens("user", "userpass")['refresh']
+        self.non_admin_user.delete()
+        response = self.client.post(reverse('accounts:token-refresh'), {'refresh': refresh}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class CachedAuthenticationMiddlewareTestCase(APITestCase):
+    """Tests de la mise en cache de l'utilisateur authentifié par session."""
+
+    def setUp(self):
+        """Configuration initiale pour les tests."""
+        cache.clear()
+        self.user = User.objects.create_user(username="admin", password="adminpass")
+        self.admin = Administrateur.objects.create()
+        self.admin.utilisateurs.add(self.user)
+        self.client.force_login(self.user)
+
+    def requetes_auth_user(self, statut=status.HTTP_200_OK):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('demandestage-list'))
+        self.assertEqual(response.status_code, statut)
+        return [query['sql'] for query in ctx.captured_queries if 'auth_user' in query['sql']]
+
+    def test_utilisateur_lu_une_seule_fois(self):
+        """Les requêtes suivantes ne relisent pas la table auth_user."""
+        self.assertEqual(len(self.requetes_auth_user()), 1)
+        self.assertEqual(self.requetes_auth_user(), [])
+
+    def test_mot_de_passe_non_cache(self):
+        """Le hash du mot de passe n'est pas conservé dans le cache."""
+        self.requetes_auth_user()
+        cle = cle_cache_utilisateur(self.user.pk, self.user.get_session_auth_hash())
+        valeurs = cache.get(cle)
+        self.assertEqual(valeurs['username'], "admin")
+        self.assertNotIn('password', valeurs)
+
+    def test_changement_mot_de_passe_invalide_la_session(self):
+        """Un changement de mot de passe invalide le cache et la session."""
+        self.requetes_auth_user()
+        self.user.set_password("nouveau")
+        self.user.save()
+        self.requetes_auth_user(status.HTTP_401_UNAUTHORIZED)
+
+    def test_changement_mot_de_passe_sans_signal(self):
+        """Sans invalidation, l'ancienne entrée ne correspond plus au hash de la nouvelle session."""
+        self.requetes_auth_user()
+        User.objects.filter(pk=self.user.pk).update(password=make_password("nouveau"))
+        self.client.force_login(User.objects.get(pk=self.user.pk))
+        self.assertEqual(len(self.requetes_auth_user()), 1)
+
+    def test_desactivation_invalide_le_cache(self):
+        """Un utilisateur désactivé n'est plus authentifié par sa session."""
+        self.requetes_auth_user()
+        self.user.is_active = False
+        self.user.save()
+        self.requetes_auth_user(status.HTTP_401_UNAUTHORIZED)
+
+
+class ConnexionThrottleTestCase(APITestCase):
+    """Tests de la limitation des tentatives de connexion."""
+
+    def setUp(self):
+        """Configuration initiale pour les tests."""
+        cache.clear()
+        self.addCleanup(cache.clear)
+        User.objects.create_user(username="admin", password="adminpass")
+        self.login_url = reverse('accounts:admin-connexion')
+        patcher = mock.patch.dict(
+            'rest_framework.throttling.SimpleRateThrottle.THROTTLE_RATES',
+            {'connexion_ip': '5/min', 'connexion_utilisateur': '2/min'},
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_rejet_par_utilisateur_avant_hachage(self):
+        """Au-delà de la limite, le mot de passe n'est plus vérifié."""
+        for _ in range(2):
+            response = self.client.post(self.login_url, {"username": "admin", "password": "faux"})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        with mock.patch('accounts.serializers.authenticate') as authenticate_mock:
+            response = self.client.post(self.login_url, {"username": "Admin", "password": "faux"})
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        authenticate_mock.assert_not_called()
+        self.assertEqual(nombre_rejets('connexion_utilisateur'), 1)
+
+    def test_rejet_par_ip(self):
+        """Les tentatives sur des noms d'utilisateur différents sont limitées par IP."""
+        for i in range(5):
+            self.client.post(self.login_url, {"username": f"user{i}", "password": "faux"})
+        response = self.client.post(self.login_url, {"username": "autre", "password": "faux"})
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(nombre_rejets('connexion_ip'), 1)
+
+    def test_x_forwarded_for_ignore(self):
+        """Un X-Forwarded-For différent à chaque tentative ne réinitialise pas la limite par IP."""
+        for i in range(5):
+            self.client.post(
+                self.login_url, {"username": f"user{i}", "password": "faux"}, HTTP_X_FORWARDED_FOR=f"10.0.0.{i}",
+            )
+        response = self.client.post(
+            self.login_url, {"username": "autre", "password": "faux"}, HTTP_X_FORWARDED_FOR="10.0.0.99",
+        )
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_x_forwarded_for_derriere_un_proxy(self):
+        """Derrière un proxy, seule l'adresse ajoutée par le proxy compte."""
+        with mock.patch.object(api_settings, 'NUM_PROXIES', 1):
+            for i in range(5):
+                self.client.post(
+                    self.login_url, {"username": f"user{i}", "password": "faux"},
+                    HTTP_X_FORWARDED_FOR=f"10.0.0.{i}, 203.0.113.7",
+                )
+            response = self.client.post(
+                self.login_url, {"username": "autre", "password": "faux"},
+                HTTP_X_FORWARDED_FOR="203.0.113.8",
+            )
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            response = self.client.post(
+                self.login_url, {"username": "autre", "password": "faux"},
+                HTTP_X_FORWARDED_FOR="10.0.0.99, 203.0.113.7",
+            )
+            self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
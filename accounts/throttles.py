@@ -0,0 +1,69 @@
+"""
+Limitation du nombre de tentatives de connexion.
+
+Ces throttles sont évalués par DRF avant l'exécution de la vue, donc avant
+`authenticate()` et le hachage PBKDF2 du mot de passe : une rafale de tentatives
+(credential stuffing) est rejetée sans consommer de CPU. La fenêtre glissante
+est conservée dans le cache Django, partagé entre les processus si REDIS_URL est
+configuré.
+"""
+import hashlib
+import logging
+
+from django.core.cache import cache
+from rest_framework.throttling import SimpleRateThrottle
+
+logger = logging.getLogger(__name__)
+
+
+def cle_metrique_rejets(scope):
+    """Clé de cache du compteur de tentatives rejetées pour `scope`."""
+    return f'metriques:connexion_rejetee:{scope}'
+
+
+def nombre_rejets(scope):
+    """Retourne le nombre de tentatives de connexion rejetées pour `scope`."""
+    return cache.get(cle_metrique_rejets(scope), 0)
+
+
+class ConnexionThrottleMixin:
+    """
+    Enregistre les tentatives rejetées (compteur dans le cache et log).
+    """
+
+    def throttle_failure(self):
+        cle = cle_metrique_rejets(self.scope)
+        cache.add(cle, 0, timeout=None)
+        try:
+            cache.incr(cle)
+        except ValueError:
+            # Entrée expirée ou évincée entre add() et incr()
+            cache.set(cle, 1, timeout=None)
+        logger.warning("Tentative de connexion rejetée (%s) : %s", self.scope, self.key)
+        return super().throttle_failure()
+
+
+class ConnexionIPThrottle(ConnexionThrottleMixin, SimpleRateThrottle):
+    """
+    Limite les tentatives de connexion par adresse IP.
+    L'IP est déterminée d'après REST_FRAMEWORK['NUM_PROXIES'] : un en-tête
+    X-Forwarded-For ajouté par le client ne change pas la clé.
+    """
+    scope = 'connexion_ip'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+class ConnexionUtilisateurThrottle(ConnexionThrottleMixin, SimpleRateThrottle):
+    """Limite les tentatives de connexion par nom d'utilisateur, quelle que soit l'IP."""
+    scope = 'connexion_utilisateur'
+
+    def get_cache_key(self, request, view):
+        data = request.data
+        username = data.get('username') if hasattr(data, 'get') else None
+        if not isinstance(username, str) or not username.strip():
+            return None
+        # Le nom d'utilisateur est haché : la clé reste valide pour tous les backends de cache
+        ident = hashlib.sha256(username.strip().lower().encode()).hexdigest()
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
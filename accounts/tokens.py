@@ -0,0 +1,51 @@
+"""
+Tokens JWT de l'API.
+
+Les tokens embarquent le rôle de l'utilisateur (`is_gin_admin`, `is_staff`...)
+afin que l'authentification JWT sans état (`JWTStatelessUserAuthentication`)
+et les permissions n'aient besoin d'aucune requête en base.
+"""
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from backend.permissions import is_gin_admin, statut_admin
+
+
+class GinRefreshToken(RefreshToken):
+    """
+    Token de rafraîchissement portant les claims de rôle de l'utilisateur.
+    Ces claims sont recopiés dans chaque token d'accès généré.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token['username'] = user.get_username()
+        token['is_staff'] = user.is_staff
+        token['is_superuser'] = user.is_superuser
+        token['is_gin_admin'] = is_gin_admin(user)
+        return token
+
+    @property
+    def access_token(self):
+        access = super().access_token
+        # Le statut administrateur est réévalué à chaque rafraîchissement :
+        # un retrait des administrateurs est pris en compte au plus tard à
+        # l'expiration du token d'accès (ACCESS_TOKEN_LIFETIME).
+        access['is_gin_admin'] = statut_admin(access[api_settings.USER_ID_CLAIM])
+        return access
+
+
+class GinTokenUser(TokenUser):
+    """
+    Utilisateur construit à partir du token d'accès, sans lecture de la table auth_user.
+    """
+
+    @cached_property
+    def is_gin_admin(self):
+        """Rôle lu dans le claim du token ; un token émis avant l'ajout du claim est vérifié en cache/base."""
+        if 'is_gin_admin' in self.token:
+            return bool(self.token['is_gin_admin'])
+        return statut_admin(self.pk)
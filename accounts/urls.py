@@ -3,6 +3,9 @@ Configuration des URLs pour le module accounts.
 Ce module définit les points d'accès API pour l'authentification de l'administrateur.
 """
 from django.urls import path
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+
+from .throttles import ConnexionIPThrottle, ConnexionUtilisateurThrottle
 from .views import ConnexionView, DeconnexionView
 
 app_name = 'accounts'
@@ -10,4 +13,10 @@ app_name = 'accounts'
 urlpatterns = [
     path('admin/connexion/', ConnexionView.as_view(), name='admin-connexion'),
     path('admin/deconnexion/', DeconnexionView.as_view(), name='admin-deconnexion'),
-]
\ No newline at end of file
+    path(
+        'token/',
+        TokenObtainPairView.as_view(throttle_classes=[ConnexionIPThrottle, ConnexionUtilisateurThrottle]),
+        name='token-obtain',
+    ),
+    path('token/refresh/', TokenRefreshView.as_view(), name='token-refresh'),
+]
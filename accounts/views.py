@@ -11,6 +11,7 @@ from drf_spectacular.utils import extend_schema, OpenApiResponse
 
 from .models import Administrateur
 from .serializers import ConnexionSerializer, AdministrateurSerializer, AdministrateurConnexionSerializer
+from .throttles import ConnexionIPThrottle, ConnexionUtilisateurThrottle
 
 
 class ConnexionView(APIView):
@@ -21,12 +22,15 @@ class ConnexionView(APIView):
     """
     permission_classes = [AllowAny]
     serializer_class = ConnexionSerializer
+    # Rejet des rafales de tentatives avant le hachage du mot de passe
+    throttle_classes = [ConnexionIPThrottle, ConnexionUtilisateurThrottle]
     
     @extend_schema(
         request=ConnexionSerializer,
         responses={
             200: OpenApiResponse(description="Connexion réussie"),
-            400: OpenApiResponse(description="Identifiants invalides")
+            400: OpenApiResponse(description="Identifiants invalides"),
+            429: OpenApiResponse(description="Trop de tentatives de connexion")
         },
         description="Connexion de l'administrateur",
         operation_id="admin_login"
@@ -41,8 +45,8 @@ class ConnexionView(APIView):
         # Connexion de l'utilisateur avec une session
         user = serializer.validated_data['user']
         login(request, user)
-          # Récupérer les informations de l'administrateur
-        admin = Administrateur.objects.filter(utilisateurs=user).first()
+        # Administrateur déjà chargé par le serializer lors de la validation
+        admin = serializer.validated_data.get('admin')
         
         # Vérifier si l'utilisateur est un administrateur
         if admin is None:
@@ -109,7 +113,9 @@ class ProfileAdminView(generics.RetrieveAPIView):
         """
         Récupère les informations de l'administrateur connecté.
         """
-        admin = Administrateur.objects.filter(utilisateurs=request.user).first()
+        # Filtre par identifiant : avec l'authentification JWT sans état,
+        # request.user est un GinTokenUser et non une instance de User
+        admin = Administrateur.objects.filter(utilisateurs__id=request.user.pk).first()
         if admin is None:
             return Response(
                 {'message': "Vous n'êtes pas un administrateur."},
@@ -0,0 +1,101 @@
+"""
+Mixins partagés par les vues de l'API.
+"""
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+from rest_framework.serializers import ListSerializer
+
+from .serializers import ListSerializerCompile, colonnes_champs, colonnes_lecture
+
+
+class ChampsPartielsMixin:
+    """
+    Mixin de vue en lecture qui limite les champs renvoyés :
+    `?fields=id,titre` ne sérialise que ces champs, `?omit=description` tous
+    sauf ceux-là. Seules les colonnes correspondantes sont lues en base
+    (`.only()`, ou `.values()` avec ListeCompileeMixin). Un nom de champ inconnu
+    donne une erreur 400. Les requêtes d'écriture ne sont pas concernées.
+
+    À placer avant ListeCompileeMixin et la vue générique :
+        class RealisationListView(CacheReponseMixin, ChampsPartielsMixin, ListeCompileeMixin, generics.ListAPIView)
+    """
+    parametre_champs = 'fields'
+    parametre_exclusion = 'omit'
+
+    def _lire_parametre(self, parametre):
+        valeur = self.request.query_params.get(parametre)
+        if valeur is None:
+            return None
+        return [nom.strip() for nom in valeur.split(',') if nom.strip()]
+
+    def get_champs_selectionnes(self):
+        """
+        Retourne les noms des champs à sérialiser, ou None si tous le sont.
+        Calculé une seule fois par requête.
+        """
+        if hasattr(self, '_champs_selectionnes'):
+            return self._champs_selectionnes
+        self._champs_selectionnes = None
+        if self.request is None or self.request.method not in SAFE_METHODS:
+            return None
+        demandes = self._lire_parametre(self.parametre_champs)
+        exclus = self._lire_parametre(self.parametre_exclusion)
+        if demandes is None and exclus is None:
+            return None
+
+        self._serializer_complet = self.get_serializer_class()(context=self.get_serializer_context())
+        disponibles = list(self._serializer_complet.fields)
+        for parametre, noms in ((self.parametre_champs, demandes), (self.parametre_exclusion, exclus)):
+            inconnus = [nom for nom in noms or () if nom not in disponibles]
+            if inconnus:
+                raise ValidationError({parametre: [
+                    f"Champs inconnus : {', '.join(inconnus)}. Champs disponibles : {', '.join(disponibles)}."
+                ]})
+
+        selection = [nom for nom in disponibles if demandes is None or nom in demandes]
+        self._champs_selectionnes = [nom for nom in selection if nom not in (exclus or ())]
+        return self._champs_selectionnes
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        noms = self.get_champs_selectionnes()
+        if noms is not None:
+            fields = serializer.child.fields if isinstance(serializer, ListSerializer) else serializer.fields
+            for nom in list(fields):
+                if nom not in noms:
+                    fields.pop(nom)
+        return serializer
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        noms = self.get_champs_selectionnes()
+        if noms is not None:
+            colonnes = colonnes_champs(self._serializer_complet, noms)
+            if colonnes is not None:
+                queryset = queryset.only(*colonnes)
+        return queryset
+
+
+class ListeCompileeMixin:
+    """
+    Mixin de vue de liste qui lit uniquement les colonnes utiles avec `.values()`
+    et les sérialise avec le plan compilé du serializer (voir backend/serializers.py).
+    Le serializer doit déclarer `Meta.list_serializer_class = ListSerializerCompile`.
+    """
+
+    def list(self, request, *args, **kwargs):
+        serializer_class = self.get_serializer_class()
+        if getattr(serializer_class.Meta, 'list_serializer_class', None) is not ListSerializerCompile:
+            return super().list(request, *args, **kwargs)
+
+        # Champs effectivement sérialisés (éventuellement réduits par ChampsPartielsMixin)
+        noms = list(self.get_serializer(many=True).child.fields)
+        queryset = self.filter_queryset(self.get_queryset()).values(*colonnes_lecture(serializer_class, noms))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(serializer.data)
@@ -0,0 +1,253 @@
+"""
+Cache des réponses des endpoints publics en lecture et requêtes conditionnelles.
+
+Chaque modèle mis en cache possède une version conservée dans le cache Django
+(`version_modele`). Elle est renouvelée par les signaux post_save, post_delete et
+m2m_changed (voir `suivre_versions`, appelé depuis le `signals.py` de chaque
+application). Les entrées en cache mémorisent les versions avec lesquelles elles
+ont été calculées : une modification faite par un administrateur rend
+immédiatement obsolètes toutes les réponses concernées, sans avoir à les
+énumérer. `lire_ou_calculer` évite qu'une entrée obsolète ou expirée soit
+recalculée simultanément par toutes les requêtes.
+
+Les mises à jour en masse (`QuerySet.update()`, `bulk_create`) n'envoient pas ces
+signaux : appeler `modifier_version` explicitement dans ce cas.
+"""
+import hashlib
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+
+def cle_version(model):
+    """Clé de cache de la version du modèle `model`."""
+    return f'version:{model._meta.label_lower}'
+
+
+def version_modele(model):
+    """
+    Retourne la version courante du modèle `model`.
+
+    La version est un horodatage en nanosecondes : elle sert aussi de date de
+    dernière modification. Si elle est absente du cache (premier accès, éviction),
+    elle est initialisée à l'instant présent, toujours postérieur aux versions
+    précédentes.
+    """
+    cle = cle_version(model)
+    version = cache.get(cle)
+    if version is None:
+        cache.add(cle, time.time_ns(), timeout=None)
+        version = cache.get(cle)
+    return version
+
+
+def modifier_version(*models):
+    """
+    Renouvelle la version des modèles donnés.
+    Le renouvellement est refait après validation de la transaction, au cas où une
+    requête concurrente aurait mis en cache l'ancien contenu sous la nouvelle version.
+    """
+    def renouveler():
+        cache.set_many({cle_version(model): time.time_ns() for model in models}, timeout=None)
+
+    renouveler()
+    transaction.on_commit(renouveler)
+
+
+def _modele_modifie(sender, **kwargs):
+    modifier_version(sender)
+
+
+def _relation_modifiee(sender, instance, action, model, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        modifier_version(type(instance), model)
+
+
+def suivre_versions(*models):
+    """
+    Connecte les signaux qui renouvellent la version des modèles donnés
+    lorsqu'une de leurs instances (ou une de leurs relations many-to-many) change.
+    """
+    for model in models:
+        uid = f'suivre_versions:{model._meta.label_lower}'
+        post_save.connect(_modele_modifie, sender=model, dispatch_uid=uid)
+        post_delete.connect(_modele_modifie, sender=model, dispatch_uid=uid)
+        for field in model._meta.local_many_to_many:
+            m2m_changed.connect(_relation_modifiee, sender=field.remote_field.through, dispatch_uid=uid)
+
+
+def _executer_en_arriere_plan(fonction):
+    """Exécute `fonction` dans un thread du pool de revalidation."""
+    global _pool_revalidation
+    if _pool_revalidation is None:
+        _pool_revalidation = ThreadPoolExecutor(max_workers=2, thread_name_prefix='revalidation-cache')
+
+    def executer():
+        try:
+            fonction()
+        except Exception:
+            logger.exception("Échec de la revalidation en arrière-plan")
+        finally:
+            # Le thread ouvre ses propres connexions : elles ne doivent pas rester ouvertes
+            connections.close_all()
+
+    _pool_revalidation.submit(executer)
+
+
+_pool_revalidation = None
+
+
+def _recalculer(cle, calculer, version, timeout, duree_fraiche):
+    """Calcule la valeur, la met en cache (sauf si None) puis libère le verrou de `cle`."""
+    try:
+        valeur = calculer()
+        if valeur is not None:
+            fraiche_jusqu_a = time.time() + duree_fraiche if duree_fraiche else None
+            cache.set(
+                cle,
+                {'valeur': valeur, 'version': version, 'fraiche_jusqu_a': fraiche_jusqu_a},
+                timeout=timeout,
+            )
+        return valeur
+    finally:
+        cache.delete(f'{cle}:verrou')
+
+
+def lire_ou_calculer(cle, calculer, version=None, timeout=None, duree_fraiche=None, arriere_plan=True):
+    """
+    Lit `cle` dans le cache ou la calcule avec `calculer()`, en évitant que les
+    requêtes concurrentes ne recalculent toutes la même valeur.
+
+    - Une seule requête à la fois recalcule une clé (verrou `cache.add`).
+    - Une entrée périmée (version différente de `version`, ou plus vieille que
+      `duree_fraiche` secondes) reste servie aux autres requêtes pendant le
+      recalcul. Si seule la durée est dépassée et que `arriere_plan` est vrai,
+      le recalcul se fait dans un thread et la requête reçoit l'ancienne valeur.
+      Après un changement de version, la requête qui obtient le verrou recalcule
+      elle-même la valeur.
+    - Sans entrée en cache, les autres requêtes attendent le résultat (au plus
+      CACHE_RECALCUL_ATTENTE secondes) avant de calculer elles-mêmes.
+
+    `calculer` doit pouvoir s'exécuter hors de la requête en cours si
+    `arriere_plan` est vrai. Une valeur None n'est pas mise en cache.
+
+    Returns:
+        tuple: (valeur, a_jour) où `a_jour` est faux si une valeur périmée est servie
+    """
+    verrou = f'{cle}:verrou'
+    entree = cache.get(cle)
+
+    if entree is not None:
+        version_a_jour = entree['version'] == version
+        fraiche = entree['fraiche_jusqu_a'] is None or time.time() < entree['fraiche_jusqu_a']
+        if version_a_jour and fraiche:
+            return entree['valeur'], True
+        if not cache.add(verrou, 1, timeout=settings.CACHE_RECALCUL_TIMEOUT):
+            # Recalcul déjà en cours dans une autre requête
+            return entree['valeur'], version_a_jour
+        if version_a_jour and arriere_plan:
+            _executer_en_arriere_plan(lambda: _recalculer(cle, calculer, version, timeout, duree_fraiche))
+            return entree['valeur'], True
+        return _recalculer(cle, calculer, version, timeout, duree_fraiche), True
+
+    if cache.add(verrou, 1, timeout=settings.CACHE_RECALCUL_TIMEOUT):
+        return _recalculer(cle, calculer, version, timeout, duree_fraiche), True
+
+    limite = time.monotonic() + settings.CACHE_RECALCUL_ATTENTE
+    while time.monotonic() < limite:
+        time.sleep(0.05)
+        entree = cache.get(cle)
+        if entree is not None and entree['version'] == version:
+            return entree['valeur'], True
+    # Le recalcul en cours n'a pas abouti à temps : calcul sans mise en cache
+    return calculer(), True
+
+
+def obtenir_ou_calculer(cle, calculer, **kwargs):
+    """Comme `lire_ou_calculer`, mais ne retourne que la valeur."""
+    return lire_ou_calculer(cle, calculer, **kwargs)[0]
+
+
+class CacheReponseMixin:
+    """
+    Met en cache le résultat de `list` et `retrieve` des vues DRF publiques et
+    gère les requêtes conditionnelles (ETag / Last-Modified).
+
+    Ce sont les données sérialisées (`response.data`) qui sont conservées : le
+    rendu (JSON, API navigable...) reste fait à chaque requête selon l'en-tête
+    Accept. La clé dépend de l'hôte (URLs absolues des images), du chemin et des
+    paramètres de requête ; l'entrée est valide pour les versions courantes de
+    `modeles_caches` (par défaut le modèle du queryset). Pendant son recalcul,
+    les requêtes concurrentes reçoivent l'ancienne réponse, sans validateurs.
+    Les serializers concernés ne dépendent pas de l'utilisateur connecté.
+
+    L'ETag et la date de dernière modification sont dérivés de ces seules
+    versions : une requête `If-None-Match` / `If-Modified-Since` à jour reçoit
+    une réponse 304 sans lecture des lignes ni sérialisation.
+    """
+    modeles_caches = ()
+
+    def get_modeles_caches(self):
+        return self.modeles_caches or (self.get_queryset().model,)
+
+    def get_cle_cache(self, request):
+        parametres = sorted((cle, sorted(valeurs)) for cle, valeurs in request.query_params.lists())
+        empreinte = hashlib.sha256(
+            repr((request.scheme, request.get_host(), request.path, parametres)).encode()
+        ).hexdigest()
+        return f'reponse:{empreinte}'
+
+    def _ajouter_validateurs(self, response, etag, derniere_modification):
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(derniere_modification)
+        # Le client doit revalider à chaque fois : la réponse change dès qu'un administrateur modifie le contenu
+        patch_cache_control(response, no_cache=True)
+        return response
+
+    def _reponse_en_cache(self, action, request, *args, **kwargs):
+        versions = tuple(version_modele(model) for model in self.get_modeles_caches())
+        cle = self.get_cle_cache(request)
+
+        # Le format négocié fait partie de l'ETag : JSON et API navigable sont deux représentations
+        etag = '"%s"' % hashlib.sha256(f'{cle}:{versions}:{request.accepted_media_type}'.encode()).hexdigest()[:32]
+        derniere_modification = max(versions) // 10**9
+        non_modifie = get_conditional_response(
+            request._request, etag=etag, last_modified=derniere_modification
+        )
+        if non_modifie is not None:
+            return self._ajouter_validateurs(non_modifie, etag, derniere_modification)
+
+        reponses = []
+
+        def calculer():
+            response = action(request, *args, **kwargs)
+            reponses.append(response)
+            return response.data if response.status_code == 200 else None
+
+        # La réponse dépend de la requête : recalcul synchrone, jamais en arrière-plan
+        data, a_jour = lire_ou_calculer(
+            cle, calculer, version=versions, timeout=settings.API_CACHE_TIMEOUT, arriere_plan=False
+        )
+        if data is None:
+            return reponses[-1]
+        response = reponses[-1] if reponses else Response(data)
+        if a_jour:
+            # Pas de validateurs sur une réponse périmée : le client ne doit pas la conserver
+            self._ajouter_validateurs(response, etag, derniere_modification)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self._reponse_en_cache(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._reponse_en_cache(super().retrieve, request, *args, **kwargs)
@@ -0,0 +1,287 @@
+"""
+Instantanés statiques du catalogue public.
+
+`publier_catalogue` rend les endpoints publics en lecture (services, équipe,
+réalisations, partenaires, formations) et écrit leur JSON dans
+STATIC_ROOT/catalogue/, sous un nom versionné par le hash du contenu
+(`services.<hash>.json`) accompagné de sa version gzip. Le fichier
+`catalogue/manifest.json` indique la version courante de chaque fichier.
+
+Ces fichiers sont servis par `backend.middleware.CatalogueWhiteNoiseMiddleware`
+sans passer par Django ni la base : les fichiers versionnés avec un cache
+permanent, le manifeste avec le cache court de WhiteNoise (WHITENOISE_MAX_AGE).
+
+Avec CATALOGUE_AUTO_PUBLISH, les fichiers d'un endpoint sont régénérés après
+chaque modification d'un modèle concerné (voir `suivre_catalogue`), dans un
+thread du processus web et non dans la requête de l'administrateur : les
+modifications rapprochées sont regroupées en une seule publication. La
+publication a lieu dans le processus web parce que les fichiers doivent être
+écrits là où WhiteNoise les sert ; STATIC_ROOT doit être accessible en écriture.
+
+Les URLs absolues des images utilisent l'hôte de CATALOGUE_BASE_URL (requis avec
+CATALOGUE_AUTO_PUBLISH), à défaut le premier hôte de ALLOWED_HOSTS.
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    # Windows : verrou par création exclusive d'un fichier (voir `verrou_publication`)
+    fcntl = None
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models.signals import post_delete, post_save
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DOSSIER_CATALOGUE = 'catalogue'
+NOM_MANIFESTE = 'manifest.json'
+NOM_VERROU = '.publication.lock'
+
+# Sans fcntl, un fichier de verrou plus ancien est considéré comme abandonné
+# (processus interrompu pendant la publication)
+DUREE_MAX_VERROU = 60
+
+# Nom du fichier -> nom de l'URL de l'endpoint rendu
+ENDPOINTS_CATALOGUE = {
+    'services': 'services:service-list',
+    'equipe': 'equipe:employe-list',
+    'realisations': 'realisations:list',
+    'categories': 'realisations:categorie-list',
+    'partenaires': 'partenaire-list-create',
+    'formations': 'formations:formation-list',
+}
+
+# Nom de fichier versionné : <nom>.<12 caractères hexadécimaux>.json
+FICHIER_VERSIONNE = re.compile(r'^[\w-]+\.[0-9a-f]{12}\.json$')
+
+# Nombre de versions conservées par fichier (les clients peuvent encore
+# détenir l'ancien manifeste pendant WHITENOISE_MAX_AGE)
+VERSIONS_CONSERVEES = 2
+
+
+def dossier_catalogue():
+    """Chemin du dossier des instantanés dans STATIC_ROOT."""
+    return os.path.join(settings.STATIC_ROOT, DOSSIER_CATALOGUE)
+
+
+def url_base():
+    """URL du site des requêtes de rendu : CATALOGUE_BASE_URL, sinon le premier hôte autorisé."""
+    if settings.CATALOGUE_BASE_URL:
+        return urlsplit(settings.CATALOGUE_BASE_URL)
+    hote = next((hote for hote in settings.ALLOWED_HOSTS if hote and hote[0] not in '.*'), 'localhost')
+    return urlsplit(f'http://{hote}')
+
+
+def rendre_endpoint(nom):
+    """
+    Rend l'endpoint `nom` comme le ferait une requête anonyme et retourne ses données.
+    Pour un endpoint paginé, toutes les pages sont regroupées dans `results`.
+    """
+    base = url_base()
+    factory = RequestFactory()
+    chemin = reverse(ENDPOINTS_CATALOGUE[nom])
+    vue = resolve(chemin)
+
+    resultats = []
+    page = 1
+    while True:
+        requete = factory.get(
+            chemin,
+            {'page': page},
+            HTTP_HOST=base.netloc,
+            HTTP_ACCEPT='application/json',
+            secure=base.scheme == 'https',
+        )
+        response = vue.func(requete, *vue.args, **vue.kwargs)
+        response.render()
+        if response.status_code != 200:
+            raise RuntimeError(f"L'endpoint {chemin} a répondu {response.status_code}")
+        data = json.loads(response.content)
+
+        if not (isinstance(data, dict) and 'results' in data and 'next' in data):
+            return data
+        resultats.extend(data['results'])
+        if not data['next']:
+            return {'count': len(resultats), 'next': None, 'previous': None, 'results': resultats}
+        page += 1
+
+
+def _ecrire(chemin, contenu):
+    """
+    Écrit `contenu` de façon atomique (jamais de fichier à moitié écrit servi).
+    Le fichier temporaire a un nom unique : plusieurs workers peuvent publier en même temps.
+    """
+    dossier, nom = os.path.split(chemin)
+    with tempfile.NamedTemporaryFile(dir=dossier, prefix=f'.{nom}.', suffix='.tmp', delete=False) as fichier:
+        fichier.write(contenu)
+    try:
+        # NamedTemporaryFile crée le fichier en 0600 : WhiteNoise doit pouvoir le lire
+        os.chmod(fichier.name, 0o644)
+        os.replace(fichier.name, chemin)
+    except BaseException:
+        os.remove(fichier.name)
+        raise
+
+
+def _supprimer_anciennes_versions(dossier, nom, courant):
+    versions = [
+        fichier for fichier in os.listdir(dossier)
+        if fichier.startswith(f'{nom}.') and FICHIER_VERSIONNE.match(fichier) and fichier != courant
+    ]
+    versions.sort(key=lambda fichier: os.path.getmtime(os.path.join(dossier, fichier)), reverse=True)
+    for fichier in versions[VERSIONS_CONSERVEES - 1:]:
+        for chemin in (fichier, f'{fichier}.gz'):
+            try:
+                os.remove(os.path.join(dossier, chemin))
+            except FileNotFoundError:
+                pass
+
+
+@contextmanager
+def verrou_publication(dossier):
+    """
+    Verrou exclusif entre processus sur la mise à jour du manifeste de `dossier`.
+    flock quand fcntl est disponible, sinon création exclusive du fichier de verrou.
+    """
+    chemin = os.path.join(dossier, NOM_VERROU)
+    if fcntl is not None:
+        with open(chemin, 'a') as verrou:
+            fcntl.flock(verrou, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(verrou, fcntl.LOCK_UN)
+        return
+
+    while True:
+        try:
+            os.close(os.open(chemin, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(chemin) > DUREE_MAX_VERROU:
+                    os.remove(chemin)
+                    continue
+            except FileNotFoundError:
+                continue
+            time.sleep(0.05)
+    try:
+        yield
+    finally:
+        os.remove(chemin)
+
+
+def lire_manifeste():
+    """Retourne le manifeste courant, ou un manifeste vide s'il n'existe pas."""
+    try:
+        with open(os.path.join(dossier_catalogue(), NOM_MANIFESTE), 'rb') as fichier:
+            return json.load(fichier)
+    except (FileNotFoundError, ValueError):
+        return {'fichiers': {}}
+
+
+def publier_catalogue(noms=None):
+    """
+    Régénère les instantanés des endpoints `noms` (tous par défaut) et le manifeste.
+
+    Returns:
+        dict: Nom de l'endpoint -> URL du fichier versionné
+    """
+    noms = list(ENDPOINTS_CATALOGUE) if noms is None else list(noms)
+    dossier = dossier_catalogue()
+    os.makedirs(dossier, exist_ok=True)
+
+    fichiers = {}
+    for nom in noms:
+        contenu = json.dumps(rendre_endpoint(nom), ensure_ascii=False, separators=(',', ':')).encode()
+        nom_fichier = f'{nom}.{hashlib.sha256(contenu).hexdigest()[:12]}.json'
+        chemin = os.path.join(dossier, nom_fichier)
+
+        # Contenu inchangé : le fichier versionné existe déjà
+        if not os.path.exists(chemin):
+            _ecrire(f'{chemin}.gz', gzip.compress(contenu, compresslevel=9, mtime=0))
+            _ecrire(chemin, contenu)
+        fichiers[nom] = nom_fichier
+
+    # Chaque worker gunicorn a son thread de publication : le manifeste est relu
+    # et réécrit sous verrou pour ne pas remettre l'entrée publiée par un autre
+    with verrou_publication(dossier):
+        manifeste = lire_manifeste()
+        for nom, nom_fichier in fichiers.items():
+            _supprimer_anciennes_versions(dossier, nom, nom_fichier)
+            manifeste['fichiers'][nom] = f'{settings.STATIC_URL}{DOSSIER_CATALOGUE}/{nom_fichier}'
+        manifeste['genere_le'] = timezone.now().isoformat()
+        _ecrire(os.path.join(dossier, NOM_MANIFESTE), json.dumps(manifeste, indent=2).encode())
+    return {nom: manifeste['fichiers'][nom] for nom in noms}
+
+
+# Endpoints à republier et thread unique de publication (pas de publications concurrentes)
+_noms_en_attente = set()
+_verrou_attente = threading.Lock()
+_pool_publication = None
+
+
+def _executer_publication(fonction):
+    """Exécute `fonction` dans le thread de publication."""
+    global _pool_publication
+    if _pool_publication is None:
+        _pool_publication = ThreadPoolExecutor(max_workers=1, thread_name_prefix='publication-catalogue')
+
+    def executer():
+        try:
+            fonction()
+        finally:
+            # Le thread ouvre ses propres connexions : elles ne doivent pas rester ouvertes
+            connections.close_all()
+
+    _pool_publication.submit(executer)
+
+
+def _publier_en_attente():
+    with _verrou_attente:
+        noms = sorted(_noms_en_attente)
+        _noms_en_attente.clear()
+    try:
+        publier_catalogue(noms)
+    except Exception as e:
+        # L'API reste la source de vérité : un échec est seulement journalisé
+        logger.exception("Échec de la publication du catalogue (%s) : %s", ', '.join(noms), e)
+
+
+def _planifier_publication(noms):
+    """Ajoute `noms` aux endpoints à republier ; une seule publication est planifiée à la fois."""
+    with _verrou_attente:
+        deja_planifiee = bool(_noms_en_attente)
+        _noms_en_attente.update(noms)
+    if not deja_planifiee:
+        _executer_publication(_publier_en_attente)
+
+
+def suivre_catalogue(model, *noms):
+    """
+    Planifie la régénération des instantanés `noms` après validation de chaque
+    modification de `model`, si CATALOGUE_AUTO_PUBLISH est activé.
+    """
+    def contenu_modifie(sender, **kwargs):
+        if settings.CATALOGUE_AUTO_PUBLISH:
+            transaction.on_commit(lambda: _planifier_publication(noms))
+
+    uid = f'suivre_catalogue:{model._meta.label_lower}'
+    post_save.connect(contenu_modifie, sender=model, dispatch_uid=uid, weak=False)
+    post_delete.connect(contenu_modifie, sender=model, dispatch_uid=uid, weak=False)
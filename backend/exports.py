@@ -0,0 +1,201 @@
+"""
+Exports en flux (CSV, NDJSON) des tables volumineuses.
+
+Les lignes sont lues par paquets de EXPORT_CHUNK_SIZE avec
+`QuerySet.iterator()` (curseur côté serveur sous PostgreSQL) et envoyées au fur
+et à mesure par une StreamingHttpResponse : la mémoire utilisée ne dépend pas
+du nombre de lignes exportées et le téléchargement commence immédiatement.
+
+Utilisation :
+    COLONNES = [Colonne('id'), Colonne('offre', 'offre__titre'), Colonne('cv', media=True)]
+    return reponse_export(request, queryset, COLONNES, 'csv', 'demandes-stage')
+
+`ArchiveZipFlux` produit de la même façon une archive ZIP de fichiers stockés.
+"""
+import csv
+import io
+import zipfile
+from collections import namedtuple
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+
+from .media import resolveur_media
+from .renderers import OrjsonRenderer
+
+FORMATS_EXPORT = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+}
+
+# Nombre de lignes CSV regroupées par morceau envoyé
+LIGNES_PAR_MORCEAU = 200
+
+# nom : en-tête CSV / clé NDJSON ; chemin : champ lu avec values_list (nom par défaut) ;
+# media : valeur convertie en URL absolue du fichier
+Colonne = namedtuple('Colonne', ['nom', 'chemin', 'media'], defaults=[None, False])
+
+
+def lire_lignes(queryset, colonnes, request=None):
+    """Itère sur les valeurs des `colonnes` de `queryset`, lues par paquets."""
+    resolveur = resolveur_media(request)
+    chemins = [colonne.chemin or colonne.nom for colonne in colonnes]
+    medias = [colonne.media for colonne in colonnes]
+    for valeurs in queryset.values_list(*chemins).iterator(chunk_size=settings.EXPORT_CHUNK_SIZE):
+        yield [
+            resolveur.url(valeur) if media else valeur
+            for valeur, media in zip(valeurs, medias)
+        ]
+
+
+class _Tampon:
+    """Pseudo-fichier pour csv.writer : writerow() retourne la ligne au lieu de l'écrire."""
+
+    def write(self, valeur):
+        return valeur
+
+
+# Premiers caractères qu'Excel / LibreOffice interprètent comme une formule
+DEBUTS_FORMULE = ('=', '+', '-', '@', '\t', '\r')
+
+
+def valeur_csv(valeur):
+    """
+    Valeur écrite dans une cellule CSV. Les textes (saisis dans les formulaires
+    publics) commençant comme une formule sont préfixés d'une apostrophe pour
+    être affichés tels quels par le tableur (injection CSV).
+    """
+    if valeur is None:
+        return ''
+    if hasattr(valeur, 'isoformat'):
+        return valeur.isoformat()
+    if isinstance(valeur, str) and valeur.startswith(DEBUTS_FORMULE):
+        return f"'{valeur}"
+    return valeur
+
+
+def flux_csv(lignes, entetes):
+    """Génère le CSV (avec BOM pour Excel) par morceaux de LIGNES_PAR_MORCEAU lignes."""
+    writer = csv.writer(_Tampon())
+    yield '﻿' + writer.writerow(entetes)
+    morceau = []
+    for ligne in lignes:
+        morceau.append(writer.writerow([valeur_csv(valeur) for valeur in ligne]))
+        if len(morceau) >= LIGNES_PAR_MORCEAU:
+            yield ''.join(morceau)
+            morceau = []
+    if morceau:
+        yield ''.join(morceau)
+
+
+def flux_ndjson(lignes, cles):
+    """Génère un objet JSON par ligne, encodé comme les réponses de l'API."""
+    renderer = OrjsonRenderer()
+    for ligne in lignes:
+        yield renderer.render(dict(zip(cles, ligne))) + b'\n'
+
+
+class _TamponOctets(io.RawIOBase):
+    """Flux non positionnable qui accumule les octets écrits jusqu'à `vider()`."""
+
+    def __init__(self):
+        super().__init__()
+        self._morceaux = []
+
+    def writable(self):
+        return True
+
+    def write(self, octets):
+        self._morceaux.append(bytes(octets))
+        return len(octets)
+
+    def vider(self):
+        octets = b''.join(self._morceaux)
+        self._morceaux = []
+        return octets
+
+
+class ArchiveZipFlux:
+    """
+    Archive ZIP écrite au fil de l'eau : chaque méthode est un générateur qui
+    rend les octets de l'archive dès qu'ils sont produits. Le flux n'étant pas
+    positionnable, zipfile écrit la taille et le CRC de chaque fichier après
+    son contenu (descripteur de données) : ni l'archive ni les fichiers ne sont
+    conservés en mémoire ou sur disque.
+
+    Utilisation :
+        archive = ArchiveZipFlux()
+        yield from archive.ajouter_fichier('cv.pdf', fichier, taille)
+        yield from archive.fermer()
+    """
+    # Les fichiers (PDF, images) sont déjà compressés : compression minimale
+    NIVEAU_COMPRESSION = 1
+    TAILLE_LECTURE = 64 * 1024
+
+    def __init__(self):
+        self._tampon = _TamponOctets()
+        self._zip = zipfile.ZipFile(
+            self._tampon, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=self.NIVEAU_COMPRESSION
+        )
+
+    def _info(self, nom, taille, date):
+        info = zipfile.ZipInfo(nom, date_time=(date or timezone.localtime()).timetuple()[:6])
+        info.compress_type = zipfile.ZIP_DEFLATED
+        # Taille annoncée : ZIP64 activé si nécessaire pour les gros fichiers
+        info.file_size = taille
+        return info
+
+    def ajouter_fichier(self, nom, fichier, taille, date=None):
+        """Ajoute le contenu du fichier ouvert `fichier`, lu par blocs."""
+        with self._zip.open(self._info(nom, taille, date), 'w') as destination:
+            for bloc in iter(lambda: fichier.read(self.TAILLE_LECTURE), b''):
+                destination.write(bloc)
+                yield self._tampon.vider()
+        yield self._tampon.vider()
+
+    def ajouter_flux(self, nom, morceaux, date=None):
+        """
+        Ajoute un fichier dont le contenu est produit par l'itérable d'octets
+        `morceaux`. Sa taille n'étant pas connue d'avance, il doit rester sous
+        la limite ZIP64 (2 Go).
+        """
+        with self._zip.open(self._info(nom, 0, date), 'w') as destination:
+            for morceau in morceaux:
+                destination.write(morceau)
+                yield self._tampon.vider()
+        yield self._tampon.vider()
+
+    def fermer(self):
+        """Écrit le répertoire central de l'archive."""
+        self._zip.close()
+        yield self._tampon.vider()
+
+
+def reponse_zip(contenu, nom_fichier):
+    """StreamingHttpResponse d'une archive ZIP produite par le générateur `contenu`."""
+    response = StreamingHttpResponse(contenu, content_type='application/zip')
+    date = timezone.localdate().strftime('%Y%m%d')
+    response['Content-Disposition'] = f'attachment; filename="{nom_fichier}-{date}.zip"'
+    response['X-Accel-Buffering'] = 'no'
+    patch_cache_control(response, no_store=True)
+    return response
+
+
+def reponse_export(request, queryset, colonnes, type_export, nom_fichier):
+    """
+    Retourne une StreamingHttpResponse qui exporte `queryset` au format
+    `type_export` ('csv' ou 'ndjson'), en pièce jointe `<nom_fichier>-<date>.<type>`.
+    """
+    lignes = lire_lignes(queryset, colonnes, request)
+    noms = [colonne.nom for colonne in colonnes]
+    contenu = flux_ndjson(lignes, noms) if type_export == 'ndjson' else flux_csv(lignes, noms)
+
+    response = StreamingHttpResponse(contenu, content_type=FORMATS_EXPORT[type_export])
+    date = timezone.localdate().strftime('%Y%m%d')
+    response['Content-Disposition'] = f'attachment; filename="{nom_fichier}-{date}.{type_export}"'
+    # Pas de mise en tampon par un proxy nginx : les octets partent dès qu'ils sont produits
+    response['X-Accel-Buffering'] = 'no'
+    patch_cache_control(response, no_store=True)
+    return response
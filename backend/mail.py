@@ -0,0 +1,275 @@
+"""
+Backend d'envoi d'emails avec pool de connexions SMTP persistantes.
+
+Chaque processus (worker gunicorn, worker d'emails) conserve quelques connexions
+SMTP déjà authentifiées. Un envoi réutilise une connexion du pool au lieu de
+refaire connexion + STARTTLS + login, ce qui évite un handshake TLS par email.
+
+Un disjoncteur (circuit breaker) partagé via le cache Django mémorise l'état
+de santé du serveur SMTP : pendant une panne, l'ouverture d'une connexion
+échoue immédiatement au lieu d'attendre EMAIL_TIMEOUT.
+"""
+import logging
+import os
+import smtplib
+import ssl
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail.backends.smtp import EmailBackend
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitSMTPOuvert(ConnectionError):
+    """Levée quand le disjoncteur SMTP est ouvert : aucune connexion n'est tentée."""
+
+
+class DisjoncteurSMTP:
+    """
+    Disjoncteur (circuit breaker) protégeant les envois SMTP.
+
+    - fermé : les envois sont autorisés
+    - ouvert : après SMTP_CIRCUIT_FAILURE_THRESHOLD échecs consécutifs, les envois
+      sont refusés immédiatement pendant SMTP_CIRCUIT_RESET_TIMEOUT secondes
+    - semi-ouvert : une fois ce délai écoulé, une seule tentative est autorisée ;
+      son succès referme le circuit, son échec le rouvre
+
+    L'état est stocké dans le cache Django afin d'être partagé entre processus
+    lorsqu'un cache commun est configuré.
+    """
+    FERME = 'ferme'
+    OUVERT = 'ouvert'
+    SEMI_OUVERT = 'semi_ouvert'
+
+    CLE_ETAT = 'smtp:disjoncteur'
+    CLE_ESSAI = 'smtp:disjoncteur:essai'
+
+    def _lire(self):
+        return cache.get(self.CLE_ETAT) or {'etat': self.FERME, 'echecs': 0, 'ouvert_depuis': None}
+
+    def etat(self):
+        """Retourne l'état courant du circuit (ferme, ouvert ou semi_ouvert)."""
+        donnees = self._lire()
+        if donnees['etat'] == self.OUVERT and self._delai_ecoule(donnees):
+            return self.SEMI_OUVERT
+        return donnees['etat']
+
+    def _delai_ecoule(self, donnees):
+        return time.time() - donnees['ouvert_depuis'] >= settings.SMTP_CIRCUIT_RESET_TIMEOUT
+
+    def est_ouvert(self):
+        """Indique si les envois sont actuellement refusés (sans consommer de tentative)."""
+        return self.etat() == self.OUVERT
+
+    def autorise_envoi(self):
+        """
+        Indique si une connexion SMTP peut être tentée.
+        En semi-ouvert, une seule tentative est accordée à la fois.
+        """
+        etat = self.etat()
+        if etat == self.FERME:
+            return True
+        if etat == self.SEMI_OUVERT:
+            return cache.add(self.CLE_ESSAI, True, timeout=settings.EMAIL_TIMEOUT)
+        return False
+
+    def signaler_succes(self):
+        """Referme le circuit après une connexion réussie."""
+        donnees = self._lire()
+        if donnees['etat'] == self.FERME and not donnees['echecs']:
+            # Cas courant (connexion reprise au pool) : rien à écrire
+            return
+        if donnees['etat'] != self.FERME:
+            logger.info("Serveur SMTP de nouveau disponible, circuit refermé")
+        cache.set(self.CLE_ETAT, {'etat': self.FERME, 'echecs': 0, 'ouvert_depuis': None}, timeout=None)
+        cache.delete(self.CLE_ESSAI)
+
+    def signaler_echec(self):
+        """Comptabilise un échec de connexion et ouvre le circuit si nécessaire."""
+        donnees = self._lire()
+        donnees['echecs'] += 1
+        if donnees['etat'] == self.OUVERT or donnees['echecs'] >= settings.SMTP_CIRCUIT_FAILURE_THRESHOLD:
+            if donnees['etat'] != self.OUVERT:
+                logger.error(f"Serveur SMTP indisponible après {donnees['echecs']} échec(s), circuit ouvert")
+            donnees['etat'] = self.OUVERT
+            donnees['ouvert_depuis'] = time.time()
+        cache.set(self.CLE_ETAT, donnees, timeout=None)
+        cache.delete(self.CLE_ESSAI)
+
+
+disjoncteur_smtp = DisjoncteurSMTP()
+
+
+def sonder_smtp():
+    """
+    Vérifie que le serveur SMTP accepte une connexion authentifiée
+    (délai court SMTP_PROBE_TIMEOUT) et met à jour le disjoncteur.
+
+    Returns:
+        bool: True si le serveur est joignable
+    """
+    backend = PooledSMTPEmailBackend(timeout=settings.SMTP_PROBE_TIMEOUT)
+    backend.ignorer_disjoncteur = True
+    try:
+        backend.open()
+    except (smtplib.SMTPException, OSError) as e:
+        logger.error(f"Erreur de connexion SMTP: {e}")
+        return False
+    disjoncteur_smtp.signaler_succes()
+    # La connexion vérifiée est rendue au pool pour les prochains envois,
+    # avec le délai des envois et non le délai court de la sonde
+    backend.connection.timeout = settings.EMAIL_TIMEOUT
+    if backend.connection.sock is not None:
+        backend.connection.sock.settimeout(settings.EMAIL_TIMEOUT)
+    backend.close()
+    return True
+
+
+class _PoolConnexionsSMTP:
+    """
+    Pool de connexions SMTP ouvertes, partagé par toutes les instances du backend
+    d'un même processus. Les connexions sont regroupées par serveur/compte.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._connexions = {}
+        self._pid = os.getpid()
+
+    def _verifier_processus(self):
+        # Après un fork (gunicorn --preload), les sockets du parent ne doivent pas être réutilisés
+        if self._pid != os.getpid():
+            self._connexions = {}
+            self._pid = os.getpid()
+
+    def prendre(self, cle, delai_inactivite):
+        """
+        Retourne une connexion encore valide pour `cle`, ou None.
+        Les connexions inactives depuis trop longtemps ou qui ne répondent plus
+        à NOOP sont fermées.
+        """
+        while True:
+            with self._lock:
+                self._verifier_processus()
+                disponibles = self._connexions.get(cle)
+                if not disponibles:
+                    return None
+                connexion, derniere_utilisation = disponibles.pop()
+
+            if time.monotonic() - derniere_utilisation > delai_inactivite:
+                fermer_connexion(connexion)
+                continue
+            try:
+                if connexion.noop()[0] == 250:
+                    return connexion
+            except (smtplib.SMTPException, OSError):
+                pass
+            fermer_connexion(connexion)
+
+    def rendre(self, cle, connexion, taille_max):
+        """Remet une connexion dans le pool, ou la ferme si le pool est plein."""
+        with self._lock:
+            self._verifier_processus()
+            disponibles = self._connexions.setdefault(cle, [])
+            if len(disponibles) < taille_max:
+                disponibles.append((connexion, time.monotonic()))
+                return
+        fermer_connexion(connexion)
+
+    def vider(self):
+        """Ferme toutes les connexions du pool."""
+        with self._lock:
+            connexions = [c for disponibles in self._connexions.values() for c, _ in disponibles]
+            self._connexions = {}
+        for connexion in connexions:
+            fermer_connexion(connexion)
+
+
+pool_smtp = _PoolConnexionsSMTP()
+
+
+def fermer_connexion(connexion):
+    """Ferme une connexion SMTP sans lever d'exception."""
+    try:
+        connexion.quit()
+    except (ssl.SSLError, smtplib.SMTPException, OSError):
+        try:
+            connexion.close()
+        except OSError:
+            pass
+
+
+class PooledSMTPEmailBackend(EmailBackend):
+    """
+    Backend SMTP de Django utilisant le pool de connexions du processus.
+
+    - open() emprunte une connexion au pool (vérifiée par NOOP) ou en ouvre une nouvelle
+    - close() rend la connexion au pool au lieu d'envoyer QUIT
+    - une déconnexion du serveur pendant l'envoi provoque une reconnexion transparente
+    - si le disjoncteur SMTP est ouvert, open() lève CircuitSMTPOuvert sans contacter le serveur
+    """
+    ignorer_disjoncteur = False
+
+    @property
+    def cle_pool(self):
+        return (self.host, self.port, self.username, self.use_tls, self.use_ssl)
+
+    def open(self):
+        if self.connection:
+            return False
+
+        if not self.ignorer_disjoncteur and not disjoncteur_smtp.autorise_envoi():
+            if self.fail_silently:
+                return None
+            raise CircuitSMTPOuvert("Serveur SMTP indisponible (circuit ouvert)")
+
+        connexion = pool_smtp.prendre(self.cle_pool, settings.EMAIL_POOL_IDLE_TIMEOUT)
+        if connexion is not None:
+            self.connection = connexion
+            # Connexion vérifiée par NOOP : vaut succès (libère la tentative en semi-ouvert)
+            disjoncteur_smtp.signaler_succes()
+            return True
+        try:
+            ouverte = super().open()
+        except (smtplib.SMTPException, OSError):
+            disjoncteur_smtp.signaler_echec()
+            raise
+        if ouverte is None:
+            # Échec passé sous silence (fail_silently)
+            disjoncteur_smtp.signaler_echec()
+        else:
+            disjoncteur_smtp.signaler_succes()
+        return ouverte
+
+    def close(self):
+        if self.connection is None:
+            return
+        connexion, self.connection = self.connection, None
+        pool_smtp.rendre(self.cle_pool, connexion, settings.EMAIL_POOL_SIZE)
+
+    def _send(self, email_message):
+        # Le parent avale les erreurs SMTP quand fail_silently est vrai : la
+        # déconnexion ne serait pas détectée et le message serait perdu.
+        # send_messages() tient self._lock : l'attribut peut être modifié ici.
+        fail_silently, self.fail_silently = self.fail_silently, False
+        try:
+            return super()._send(email_message)
+        except smtplib.SMTPServerDisconnected:
+            # Connexion fermée par le serveur (timeout côté serveur) : on se reconnecte une fois
+            logger.info("Connexion SMTP perdue, reconnexion")
+            fermer_connexion(self.connection)
+            self.connection = None
+            self.fail_silently = fail_silently
+            # Via open() : pool et disjoncteur comme pour une première connexion
+            if not self.open():
+                return False
+            return super()._send(email_message)
+        except smtplib.SMTPException:
+            if not fail_silently:
+                raise
+            return False
+        finally:
+            self.fail_silently = fail_silently
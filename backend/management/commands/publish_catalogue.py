@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.catalogue import ENDPOINTS_CATALOGUE, publier_catalogue
+
+
+class Command(BaseCommand):
+    help = 'Génère les instantanés JSON statiques du catalogue public (STATIC_ROOT/catalogue/)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'noms',
+            nargs='*',
+            help=f"Endpoints à régénérer parmi : {', '.join(ENDPOINTS_CATALOGUE)} (tous par défaut)",
+        )
+
+    def handle(self, *args, **options):
+        # Validation manuelle : `choices` avec nargs='*' refuse l'absence d'argument
+        inconnus = [nom for nom in options['noms'] if nom not in ENDPOINTS_CATALOGUE]
+        if inconnus:
+            raise CommandError(
+                f"Endpoint(s) inconnu(s) : {', '.join(inconnus)} (choix : {', '.join(ENDPOINTS_CATALOGUE)})"
+            )
+        try:
+            fichiers = publier_catalogue(options['noms'] or None)
+        except Exception as e:
+            raise CommandError(f'Échec de la publication du catalogue : {e}')
+        for nom, url in fichiers.items():
+            self.stdout.write(f'{nom} : {url}')
+        self.stdout.write(self.style.SUCCESS(f'{len(fichiers)} fichier(s) publié(s)'))
@@ -0,0 +1,89 @@
+"""
+Résolution des URLs des fichiers media.
+
+`request.build_absolute_uri(fichier.url)` analyse l'hôte et le schéma de la
+requête et passe par le backend de stockage pour chaque fichier sérialisé. Le
+`ResolveurMedia` calcule une seule fois par requête la base absolue des media
+(ou le préfixe du CDN, MEDIA_CDN_URL) et y ajoute directement le nom stocké.
+
+Les serializers utilisent `ImageMediaField` (via `MediaUrlMixin`) pour les
+champs fichiers, et `url_media()` dans leurs SerializerMethodField.
+"""
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.db import models
+from django.utils.encoding import filepath_to_uri
+from rest_framework import serializers
+
+
+class ResolveurMedia:
+    """Construit les URLs absolues des fichiers media pour une requête."""
+
+    def __init__(self, request=None):
+        cdn = settings.MEDIA_CDN_URL
+        if cdn:
+            self.base = cdn.rstrip('/') + '/'
+        elif request is not None:
+            self.base = request.build_absolute_uri(settings.MEDIA_URL)
+        else:
+            self.base = settings.MEDIA_URL
+        # Pour les stockages autres que le stockage local (URLs relatives à l'hôte)
+        self.prefixe_hote = request.build_absolute_uri('/')[:-1] if request is not None else ''
+
+    def url(self, nom, storage=None):
+        """Retourne l'URL du fichier `nom` stocké dans `storage` (stockage par défaut si None)."""
+        if not nom:
+            return None
+        storage = storage or default_storage
+        if isinstance(storage, FileSystemStorage) and storage.base_url == settings.MEDIA_URL:
+            return self.base + filepath_to_uri(nom).lstrip('/')
+        url = storage.url(nom)
+        if self.prefixe_hote and url.startswith('/'):
+            return self.prefixe_hote + url
+        return url
+
+
+def resolveur_media(request):
+    """Retourne le résolveur de la requête, créé au premier appel puis mémorisé sur celle-ci."""
+    if request is None:
+        return ResolveurMedia()
+    # Mémorisé sur la HttpRequest, partagée par la Request DRF et la vue
+    requete = getattr(request, '_request', request)
+    resolveur = getattr(requete, '_resolveur_media', None)
+    if resolveur is None:
+        resolveur = ResolveurMedia(request)
+        requete._resolveur_media = resolveur
+    return resolveur
+
+
+def url_media(fichier, request):
+    """URL absolue du FieldFile `fichier`, ou None s'il est vide."""
+    if not fichier:
+        return None
+    return resolveur_media(request).url(fichier.name, fichier.storage)
+
+
+class ImageMediaField(serializers.ImageField):
+    """ImageField dont l'URL est construite par le résolveur media de la requête."""
+
+    def to_representation(self, value):
+        return url_media(value, self.context.get('request'))
+
+
+class FichierMediaField(serializers.FileField):
+    """FileField dont l'URL est construite par le résolveur media de la requête."""
+
+    def to_representation(self, value):
+        return url_media(value, self.context.get('request'))
+
+
+class MediaUrlMixin:
+    """
+    Mixin de ModelSerializer : les champs ImageField / FileField du modèle sont
+    sérialisés avec ImageMediaField / FichierMediaField.
+    """
+    serializer_field_mapping = {
+        **serializers.ModelSerializer.serializer_field_mapping,
+        models.ImageField: ImageMediaField,
+        models.FileField: FichierMediaField,
+    }
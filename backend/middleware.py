@@ -1,9 +1,14 @@
 """
 Middleware personnalisé pour gérer la sécurité des APIs.
 """
+import os
 import re
 from django.conf import settings
 from django.utils.deprecation import MiddlewareMixin
+from whitenoise.middleware import WhiteNoiseMiddleware
+from whitenoise.responders import MissingFileError
+
+from .catalogue import DOSSIER_CATALOGUE, FICHIER_VERSIONNE
 
 
 class CSRFExemptAPIMiddleware(MiddlewareMixin):
@@ -22,3 +27,48 @@ class CSRFExemptAPIMiddleware(MiddlewareMixin):
             setattr(request, '_dont_enforce_csrf_checks', True)
         
         return None
+
+
+class CatalogueWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise qui sert aussi les instantanés du catalogue (voir backend/catalogue.py).
+
+    WhiteNoise indexe STATIC_ROOT au démarrage seulement : les fichiers du
+    catalogue, régénérés pendant que le serveur tourne, sont recherchés sur le
+    disque à la demande. Les fichiers versionnés sont immuables et mis en cache
+    permanent ; le manifeste est relu à chaque requête.
+    """
+
+    @property
+    def catalogue_prefix(self):
+        return f'{self.static_prefix}{DOSSIER_CATALOGUE}/'
+
+    def __call__(self, request):
+        url = request.path_info
+        if self.static_root and url.startswith(self.catalogue_prefix):
+            static_file = self.files.get(url) if self._est_versionne(url) else None
+            if static_file is None:
+                static_file = self._trouver_fichier_catalogue(url)
+            if static_file is not None:
+                return self.serve(static_file, request)
+        return super().__call__(request)
+
+    def _est_versionne(self, url):
+        return bool(FICHIER_VERSIONNE.match(url[len(self.catalogue_prefix):]))
+
+    def _trouver_fichier_catalogue(self, url):
+        if not self.url_is_canonical(url) or self.is_compressed_variant(url):
+            return None
+        path = os.path.join(self.static_root, DOSSIER_CATALOGUE, url[len(self.catalogue_prefix):])
+        try:
+            static_file = self.get_static_file(path, url)
+        except MissingFileError:
+            return None
+        if self._est_versionne(url):
+            self.files[url] = static_file
+        return static_file
+
+    def immutable_file_test(self, path, url):
+        if url.startswith(self.catalogue_prefix):
+            return self._est_versionne(url)
+        return super().immutable_file_test(path, url)
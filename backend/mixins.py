@@ -0,0 +1,127 @@
+"""
+Mixins partagés par les modèles du projet.
+"""
+import copy
+
+from django.db import models
+from django.db.models.fields.files import FieldFile
+
+
+class TextesLongsQuerySet(models.QuerySet):
+    """
+    QuerySet des modèles affichés en liste sans leurs champs volumineux.
+
+    Utilisation :
+        class Formation(models.Model):
+            objects = TextesLongsQuerySet.as_manager()
+
+        Formation.objects.sans_textes_longs()
+    """
+
+    def sans_textes_longs(self):
+        """Diffère le chargement des champs texte longs et JSON (description, programme...)."""
+        return self.defer(*[
+            field.name for field in self.model._meta.concrete_fields
+            if isinstance(field, (models.TextField, models.JSONField))
+        ])
+
+
+class SuiviChangementsMixin:
+    """
+    Mixin de modèle qui mémorise les valeurs des champs telles que chargées depuis
+    la base (dans `from_db`) afin de savoir, sans requête supplémentaire, quels
+    champs ont été modifiés avant un `save()`.
+
+    Utilisation :
+        class DemandeStage(SuiviChangementsMixin, models.Model):
+            champs_suivis = ('statut',)
+
+        if demande.has_changed('statut'):
+            ...
+
+    Si `champs_suivis` est vide, tous les champs concrets sont suivis.
+    L'instantané est mis à jour après chaque `save()` et `refresh_from_db()` ;
+    les receveurs de `post_save` voient donc encore les anciennes valeurs.
+    """
+    champs_suivis = ()
+
+    @classmethod
+    def _attnames_suivis(cls):
+        if cls.champs_suivis:
+            return [cls._meta.get_field(nom).attname for nom in cls.champs_suivis]
+        return [field.attname for field in cls._meta.concrete_fields]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._memoriser_valeurs()
+        return instance
+
+    def _memoriser_valeurs(self, attnames=None):
+        """
+        Mémorise la valeur courante des champs `attnames` (tous les champs suivis par défaut).
+        Seuls les champs effectivement chargés sont mémorisés (pas les champs différés).
+        """
+        suivis = self._attnames_suivis()
+        if attnames is None or not hasattr(self, '_valeurs_initiales'):
+            self._valeurs_initiales = {}
+        for attname in suivis if attnames is None else attnames:
+            if attname in suivis and attname in self.__dict__:
+                self._valeurs_initiales[attname] = self._copier_valeur(self.__dict__[attname])
+
+    @staticmethod
+    def _copier_valeur(valeur):
+        # Les JSONField (listes, dictionnaires) sont mutables : on en garde une copie
+        if isinstance(valeur, (list, dict)):
+            return copy.deepcopy(valeur)
+        # Pour les fichiers, seul le nom stocké en base compte
+        if isinstance(valeur, FieldFile):
+            return valeur.name
+        return valeur
+
+    def has_changed(self, champ):
+        """
+        Indique si `champ` a été modifié depuis le chargement de l'instance.
+        Toujours vrai pour une instance qui n'a pas encore été enregistrée.
+        """
+        if self._state.adding:
+            return True
+        attname = self._meta.get_field(champ).attname
+        if attname not in self.__dict__:
+            # Champ différé jamais lu ni assigné
+            return False
+        initiales = getattr(self, '_valeurs_initiales', {})
+        if attname not in initiales:
+            # Valeur inconnue au chargement : on considère le champ comme modifié
+            return True
+        return initiales[attname] != self.__dict__[attname]
+
+    def valeur_initiale(self, champ, defaut=None):
+        """Retourne la valeur de `champ` au chargement de l'instance."""
+        attname = self._meta.get_field(champ).attname
+        return getattr(self, '_valeurs_initiales', {}).get(attname, defaut)
+
+    def champs_modifies(self):
+        """Retourne la liste des champs suivis modifiés depuis le chargement."""
+        suivis = set(self._attnames_suivis())
+        return [
+            field.name for field in self._meta.concrete_fields
+            if field.attname in suivis and self.has_changed(field.name)
+        ]
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None:
+            self._memoriser_valeurs()
+        else:
+            # Les champs non enregistrés restent considérés comme modifiés
+            self._memoriser_valeurs([self._meta.get_field(champ).attname for champ in update_fields])
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        if fields is None:
+            self._memoriser_valeurs()
+        else:
+            # Chargement d'un champ différé : les autres modifications en cours sont conservées
+            self._memoriser_valeurs([self._meta.get_field(champ).attname for champ in fields])
@@ -0,0 +1,202 @@
+"""
+Pagination de l'API.
+
+`PaginationEstimee` (pagination par défaut) évite le `COUNT(*)` exact sur les
+grandes tables : sous PostgreSQL, le nombre total est estimé à partir des
+statistiques du planificateur dès qu'il dépasse PAGINATION_COUNT_EXACT_SEUIL,
+et la réponse indique si `count` est exact (`count_exact`). Les liens `next`
+ne dépendent pas de cette estimation.
+
+La pagination par numéro de page parcourt aussi un OFFSET qui grandit avec le
+numéro de page. Pour les tables qui ne cessent de grandir (demandes de stage,
+inscriptions), les vues d'administration utilisent
+`PaginationCurseurOptionnelle` : le client peut demander une pagination par
+curseur (`?pagination=curseur`), dont le coût est constant quelle que soit la
+page, les liens `next` / `previous` portant ensuite le paramètre `cursor`.
+
+L'ordre du curseur est donné par l'attribut `ordre_curseur` de la vue ; il doit
+se terminer par un champ unique et être couvert par un index composite.
+"""
+import json
+import logging
+
+from django.conf import settings
+from django.core.paginator import EmptyPage, Page, Paginator
+from django.db import DatabaseError, connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+
+def _estimation_postgresql(queryset):
+    """Nombre de lignes estimé par PostgreSQL pour `queryset`, ou None s'il est inconnu."""
+    query = queryset.query
+    connection = connections[queryset.db]
+    try:
+        if not query.where and not query.distinct and query.group_by is None \
+                and not query.combinator and not query.is_sliced:
+            # Table entière : statistiques de la table (mises à jour par ANALYZE / autovacuum)
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT reltuples FROM pg_class WHERE oid = %s::regclass',
+                    [connection.ops.quote_name(queryset.model._meta.db_table)],
+                )
+                ligne = cursor.fetchone()
+            # -1 : table jamais analysée
+            return int(ligne[0]) if ligne and ligne[0] >= 0 else None
+        plan = json.loads(queryset.order_by().explain(format='json'))
+        if isinstance(plan, list):
+            plan = plan[0]
+        return int(plan['Plan']['Plan Rows'])
+    except (DatabaseError, ValueError, KeyError, IndexError, TypeError) as e:
+        logger.warning("Estimation du nombre de lignes impossible : %s", e)
+        return None
+
+
+def estimer_nombre(object_list):
+    """
+    Retourne (nombre, exact) : le nombre d'éléments de `object_list`, estimé
+    pour un QuerySet PostgreSQL dont l'estimation atteint
+    PAGINATION_COUNT_EXACT_SEUIL, exact sinon (petites tables, autres bases).
+    """
+    if not isinstance(object_list, QuerySet):
+        return len(object_list), True
+    seuil = settings.PAGINATION_COUNT_EXACT_SEUIL
+    if seuil and connections[object_list.db].vendor == 'postgresql':
+        estimation = _estimation_postgresql(object_list)
+        if estimation is not None and estimation >= seuil:
+            return estimation, False
+    return object_list.count(), True
+
+
+class PageEstimee(Page):
+    """Page dont l'existence d'une page suivante est connue sans le nombre total."""
+
+    def __init__(self, object_list, number, paginator, suivante):
+        super().__init__(object_list, number, paginator)
+        self.suivante = suivante
+
+    def has_next(self):
+        return self.suivante
+
+
+class PaginatorEstime(Paginator):
+    """
+    Paginator dont le nombre total peut être estimé (voir `estimer_nombre`).
+    Dans ce cas, chaque page lit une ligne de plus pour savoir s'il existe une
+    page suivante, et les numéros de page au-delà de l'estimation restent valides.
+    """
+    exact = True
+
+    @cached_property
+    def count(self):
+        nombre, self.exact = estimer_nombre(self.object_list)
+        return nombre
+
+    def _corriger_nombre(self, nombre, exact):
+        self.count = nombre
+        self.exact = exact
+        self.__dict__.pop('num_pages', None)
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            if self.exact or int(number) < 1:
+                raise
+            # Au-delà de l'estimation : la page est vérifiée à la lecture (voir page())
+            return int(number)
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if self.exact:
+            return super().page(number)
+
+        bottom = (number - 1) * self.per_page
+        lignes = list(self.object_list[bottom:bottom + self.per_page + 1])
+        suivante = len(lignes) > self.per_page
+        lignes = lignes[:self.per_page]
+        if not lignes and number > 1:
+            raise EmptyPage(self.error_messages['no_results'])
+        if not suivante:
+            # Dernière page atteinte : le nombre total est connu exactement
+            self._corriger_nombre(bottom + len(lignes), exact=True)
+        elif self.count <= bottom + len(lignes):
+            self._corriger_nombre(bottom + len(lignes) + 1, exact=False)
+        return PageEstimee(lignes, number, self, suivante)
+
+
+class PaginationEstimee(PageNumberPagination):
+    """PageNumberPagination avec un nombre total éventuellement estimé (`count_exact`)."""
+    django_paginator_class = PaginatorEstime
+
+    def get_paginated_response(self, data):
+        return Response({
+            'count': self.page.paginator.count,
+            'count_exact': self.page.paginator.exact,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        schema = super().get_paginated_response_schema(schema)
+        schema['properties']['count_exact'] = {
+            'type': 'boolean',
+            'description': "Faux si `count` est une estimation",
+        }
+        return schema
+
+
+class CurseurPagination(CursorPagination):
+    """CursorPagination dont l'ordre est défini par la vue (`ordre_curseur`)."""
+    ordering = ('-id',)
+
+    def get_ordering(self, request, queryset, view):
+        return tuple(getattr(view, 'ordre_curseur', self.ordering))
+
+
+class PaginationCurseurOptionnelle(PaginationEstimee):
+    """
+    Pagination par numéro de page par défaut ; par curseur si la requête
+    contient `?pagination=curseur` ou un paramètre `cursor`.
+    """
+    parametre_mode = 'pagination'
+    valeur_curseur = 'curseur'
+    pagination_curseur_class = CurseurPagination
+
+    def demande_curseur(self, request):
+        """Indique si la requête demande la pagination par curseur."""
+        parametres = request.query_params
+        return (
+            parametres.get(self.parametre_mode) == self.valeur_curseur
+            or self.pagination_curseur_class.cursor_query_param in parametres
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.curseur = None
+        if self.demande_curseur(request):
+            self.curseur = self.pagination_curseur_class()
+            return self.curseur.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.curseur is not None:
+            return self.curseur.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_schema_operation_parameters(self, view):
+        parametres = super().get_schema_operation_parameters(view)
+        return parametres + [
+            {
+                'name': self.parametre_mode,
+                'required': False,
+                'in': 'query',
+                'description': "« curseur » pour une pagination par curseur (coût constant)",
+                'schema': {'type': 'string', 'enum': [self.valeur_curseur]},
+            },
+            *self.pagination_curseur_class().get_schema_operation_parameters(view),
+        ]
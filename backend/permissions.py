@@ -1,10 +1,65 @@
 """
 Définition des permissions personnalisées pour le projet.
 """
+from django.conf import settings
+from django.core.cache import cache
 from rest_framework import permissions
 from accounts.models import Administrateur
 
 
+def cle_cache_admin(user_id):
+    """Clé de cache du statut administrateur d'un utilisateur."""
+    return f'gin_admin:{user_id}'
+
+
+def statut_admin(user_id):
+    """
+    Indique si l'utilisateur `user_id` fait partie des administrateurs GIN.
+    Le résultat est conservé dans le cache Django entre les requêtes.
+    """
+    cle = cle_cache_admin(user_id)
+    est_admin = cache.get(cle)
+    if est_admin is None:
+        est_admin = Administrateur.objects.filter(utilisateurs__id=user_id).exists()
+        cache.set(cle, est_admin, timeout=settings.GIN_ADMIN_CACHE_TIMEOUT)
+    return est_admin
+
+
+def is_gin_admin(user, request=None):
+    """
+    Indique si `user` fait partie des administrateurs GIN.
+
+    Pour un utilisateur authentifié par JWT, la réponse est celle de
+    `GinTokenUser.is_gin_admin`, lue dans le claim du token sans aucune requête
+    (voir accounts/tokens.py).
+    Sinon, le résultat est mémorisé sur la requête (plusieurs permissions et la
+    vue peuvent le demander) et dans le cache Django entre les requêtes. Le cache
+    est invalidé par les signaux de `accounts.signals` quand la liste des
+    administrateurs change.
+    """
+    if user is None or not user.is_authenticated:
+        return False
+
+    # Import local : accounts.tokens importe ce module
+    from accounts.tokens import GinTokenUser
+    if isinstance(user, GinTokenUser):
+        return user.is_gin_admin
+
+    if request is not None:
+        memo = getattr(request, '_is_gin_admin', None)
+        if memo is not None and memo[0] == user.pk:
+            return memo[1]
+
+    try:
+        est_admin = statut_admin(user.pk)
+    except Exception:
+        return False
+
+    if request is not None:
+        request._is_gin_admin = (user.pk, est_admin)
+    return est_admin
+
+
 class IsAdminUser(permissions.BasePermission):
     """
     Permission qui n'autorise que les administrateurs du système.
@@ -19,10 +74,7 @@ class IsAdminUser(permissions.BasePermission):
             return False
             
         # Vérifier si l'utilisateur est un administrateur
-        try:
-            return Administrateur.objects.filter(utilisateurs=request.user).exists()
-        except Exception:
-            return False
+        return is_gin_admin(request.user, request)
 
 
 class IsAdminOrReadOnly(permissions.BasePermission):
@@ -39,10 +91,7 @@ class IsAdminOrReadOnly(permissions.BasePermission):
         if not request.user.is_authenticated:
             return False
             
-        try:
-            return Administrateur.objects.filter(utilisateurs=request.user).exists()
-        except Exception:
-            return False
+        return is_gin_admin(request.user, request)
 
 
 class IsAdminOrCreateOnly(permissions.BasePermission):
@@ -60,7 +109,4 @@ class IsAdminOrCreateOnly(permissions.BasePermission):
         if not request.user.is_authenticated:
             return False
             
-        try:
-            return Administrateur.objects.filter(utilisateurs=request.user).exists()
-        except Exception:
-            return False
\ No newline at end of file
+        return is_gin_admin(request.user, request)
\ No newline at end of file
@@ -0,0 +1,102 @@
+"""
+Renderers et parsers rapides de l'API.
+
+- `OrjsonRenderer` / `OrjsonParser` : JSON encodé et décodé avec orjson. La
+  sortie est identique à celle du JSONRenderer de DRF (mode compact, UTF-8) ;
+  les types qu'orjson ne connaît pas ou qu'il formate autrement (Decimal,
+  dates, chaînes traduites paresseuses, QuerySet...) passent par l'encodeur
+  de DRF. Sans orjson, ce sont les classes de DRF qui sont utilisées.
+- `MessagePackRenderer` / `MessagePackParser` : format binaire MessagePack,
+  obtenu avec `Accept: application/msgpack` (ou `?format=msgpack`). Les
+  conversions sont les mêmes qu'en JSON. Enregistrés seulement si le paquet
+  msgpack est installé (voir REST_FRAMEWORK dans settings.py).
+"""
+from rest_framework import renderers
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+from rest_framework.settings import api_settings
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+_encodeur = encoders.JSONEncoder()
+
+
+def convertir(obj):
+    """
+    Conversion des types non natifs, avec les règles de l'encodeur de DRF :
+    Decimal en float, dates au format ISO 8601 (millisecondes, 'Z' pour UTC),
+    chaînes paresseuses en str...
+    """
+    return _encodeur.default(obj)
+
+
+if orjson is not None:
+    # Les dates passent par `convertir` pour garder le format de DRF
+    OPTIONS_ORJSON = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+
+class OrjsonRenderer(renderers.JSONRenderer):
+    """JSONRenderer encodé avec orjson."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        # orjson ne gère ni l'indentation de l'API navigable, ni les réglages JSON non par défaut
+        if (orjson is None or self.get_indent(accepted_media_type, renderer_context or {})
+                or not api_settings.COMPACT_JSON or not api_settings.UNICODE_JSON):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=convertir, option=OPTIONS_ORJSON)
+        except orjson.JSONEncodeError:
+            # Entier hors 64 bits, etc. : encodeur standard
+            return super().render(data, accepted_media_type, renderer_context)
+        # Comme DRF : U+2028 et U+2029 échappés pour rester valides en JavaScript
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class OrjsonParser(JSONParser):
+    """JSONParser décodé avec orjson."""
+    renderer_class = OrjsonRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read() if stream is not None else b'')
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
+
+
+class MessagePackRenderer(renderers.BaseRenderer):
+    """Rendu au format MessagePack."""
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=convertir, use_bin_type=True, datetime=False)
+
+
+class MessagePackParser(BaseParser):
+    """Décodage des corps de requête au format MessagePack."""
+    media_type = 'application/msgpack'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read() if stream is not None else b'', raw=False)
+        except (ValueError, msgpack.UnpackException) as exc:
+            raise ParseError(f'MessagePack parse error - {exc}')
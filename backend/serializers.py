@@ -0,0 +1,204 @@
+"""
+Sérialisation compilée des listes en lecture seule.
+
+Un `ModelSerializer` traite chaque instance champ par champ (get_attribute,
+SerializerMethodField, ReturnDict...). Pour les listes publiques, le
+`ListSerializerCompile` lit directement les colonnes nécessaires avec
+`.values()` et construit les dictionnaires à partir d'un plan calculé une seule
+fois par serializer.
+
+Utilisation :
+    class ServiceListSerializer(serializers.ModelSerializer):
+        image_principale = serializers.SerializerMethodField()
+
+        # Champs qui ne correspondent pas directement à une colonne
+        plan_compile = {'image_principale': url_fichier('image')}
+
+        class Meta:
+            model = Service
+            fields = ('id', 'titre', 'sous_titre', 'image_principale')
+            list_serializer_class = ListSerializerCompile
+
+Les champs simples (colonnes du modèle, fichiers, choix) sont compilés
+automatiquement ; les autres doivent figurer dans `plan_compile`, sinon une
+ImproperlyConfigured est levée. Voir `backend.base_api_views.ListeCompileeMixin`
+pour les vues.
+"""
+import string
+from collections import namedtuple
+
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db.models import Manager, QuerySet
+from django.db.models.query import ModelIterable
+from rest_framework import serializers
+
+from backend.media import resolveur_media
+
+PlanChamp = namedtuple('PlanChamp', ['colonnes', 'convertir'])
+
+# Champs DRF dont la valeur en base est déjà la représentation JSON
+CHAMPS_IDENTITE = (
+    serializers.CharField,
+    serializers.IntegerField,
+    serializers.BooleanField,
+    serializers.ChoiceField,
+    serializers.JSONField,
+    serializers.FloatField,
+    serializers.PrimaryKeyRelatedField,
+)
+
+_plans = {}
+
+
+def colonne(nom):
+    """Valeur brute de la colonne `nom`."""
+    def construire(model):
+        attname = model._meta.get_field(nom).attname
+        return PlanChamp((attname,), lambda ligne, contexte: ligne[attname])
+    return construire
+
+
+def url_fichier(nom):
+    """URL du fichier stocké dans la colonne `nom` (voir `backend.media.ResolveurMedia`)."""
+    def construire(model):
+        storage = model._meta.get_field(nom).storage
+
+        def convertir(ligne, contexte):
+            return contexte['media'].url(ligne[nom], storage)
+        return PlanChamp((nom,), convertir)
+    return construire
+
+
+def libelle_choix(nom):
+    """Libellé du choix stocké dans la colonne `nom` (équivalent de get_<nom>_display)."""
+    def construire(model):
+        libelles = {cle: str(libelle) for cle, libelle in model._meta.get_field(nom).flatchoices}
+        return PlanChamp((nom,), lambda ligne, contexte: libelles.get(ligne[nom], ligne[nom]))
+    return construire
+
+
+def format_texte(modele):
+    """Texte construit à partir de colonnes, par exemple format_texte('{prenom} {nom}')."""
+    noms = tuple(nom for _, nom, _, _ in string.Formatter().parse(modele) if nom)
+
+    def construire(model):
+        return PlanChamp(noms, lambda ligne, contexte: modele.format(**ligne))
+    return construire
+
+
+def _plan_automatique(model, field):
+    if isinstance(field, (serializers.SerializerMethodField, serializers.BaseSerializer)) \
+            or field.source == '*' or '.' in field.source:
+        return None
+    try:
+        field_modele = model._meta.get_field(field.source)
+    except FieldDoesNotExist:
+        return None
+    if not field_modele.concrete:
+        return None
+    if isinstance(field, serializers.FileField):
+        return url_fichier(field.source)(model)
+    if isinstance(field, CHAMPS_IDENTITE):
+        return colonne(field.source)(model)
+
+    attname = field_modele.attname
+
+    def convertir(ligne, contexte):
+        valeur = ligne[attname]
+        return None if valeur is None else field.to_representation(valeur)
+    return PlanChamp((attname,), convertir)
+
+
+def plan_lecture(serializer_class):
+    """
+    Retourne le plan de sérialisation de `serializer_class` : liste de
+    (nom du champ, PlanChamp), calculée une seule fois par classe.
+    """
+    plan = _plans.get(serializer_class)
+    if plan is not None:
+        return plan
+
+    model = serializer_class.Meta.model
+    declares = getattr(serializer_class, 'plan_compile', {})
+    plan = []
+    for nom, field in serializer_class().fields.items():
+        if field.write_only:
+            continue
+        if nom in declares:
+            plan_champ = declares[nom](model)
+        else:
+            plan_champ = _plan_automatique(model, field)
+        if plan_champ is None:
+            raise ImproperlyConfigured(
+                f"{serializer_class.__name__}.{nom} ne peut pas être compilé : "
+                f"le déclarer dans plan_compile"
+            )
+        plan.append((nom, plan_champ))
+    _plans[serializer_class] = plan
+    return plan
+
+
+def colonnes_lecture(serializer_class, noms=None):
+    """
+    Colonnes à lire avec `.values()` pour sérialiser avec `serializer_class`
+    (seulement les champs `noms` si donnés, voir ChampsPartielsMixin).
+    """
+    colonnes = []
+    for nom, plan_champ in plan_lecture(serializer_class):
+        if noms is None or nom in noms:
+            colonnes.extend(c for c in plan_champ.colonnes if c not in colonnes)
+    return colonnes
+
+
+def colonnes_champs(serializer, noms):
+    """
+    Champs du modèle à charger avec `.only()` pour sérialiser les champs `noms`
+    de `serializer`, ou None s'ils ne peuvent pas être déterminés (champ calculé
+    par une méthode non déclarée dans `plan_compile`, source '*'...).
+    """
+    model = serializer.Meta.model
+    declares = getattr(serializer, 'plan_compile', {})
+    colonnes = [model._meta.pk.name]
+    for nom in noms:
+        if nom in declares:
+            nouvelles = declares[nom](model).colonnes
+        else:
+            field = serializer.fields[nom]
+            if isinstance(field, serializers.SerializerMethodField) or field.source == '*':
+                return None
+            source = field.source.split('.')[0]
+            if source.startswith('get_') and source.endswith('_display'):
+                source = source[len('get_'):-len('_display')]
+            try:
+                field_modele = model._meta.get_field(source)
+            except FieldDoesNotExist:
+                return None
+            # Relations inverses et many-to-many : chargées par une requête séparée
+            nouvelles = (field_modele.name,) if field_modele.concrete else ()
+        colonnes.extend(c for c in nouvelles if c not in colonnes)
+    return colonnes
+
+
+class ListSerializerCompile(serializers.ListSerializer):
+    """
+    ListSerializer en lecture seule qui sérialise des lignes `.values()` avec le
+    plan de son serializer enfant. Une liste d'instances est sérialisée
+    normalement ; un QuerySet d'instances est converti en `.values()`.
+    """
+
+    def to_representation(self, data):
+        lignes = data.all() if isinstance(data, Manager) else data
+        if isinstance(lignes, QuerySet) and lignes._iterable_class is ModelIterable:
+            lignes = lignes.values(*colonnes_lecture(type(self.child), self.child.fields))
+        lignes = list(lignes)
+        if lignes and not isinstance(lignes[0], dict):
+            return super().to_representation(lignes)
+
+        request = self.context.get('request')
+        contexte = {'request': request, 'media': resolveur_media(request)}
+        # Les champs retirés du serializer enfant (?fields=, ?omit=) ne sont pas sérialisés
+        noms = self.child.fields
+        plan = [
+            (nom, plan_champ.convertir) for nom, plan_champ in plan_lecture(type(self.child)) if nom in noms
+        ]
+        return [{nom: convertir(ligne, contexte) for nom, convertir in plan} for ligne in lignes]
@@ -1,7 +1,10 @@
 from pathlib import Path
 from datetime import timedelta
 from decouple import config
+from django.core.exceptions import ImproperlyConfigured
+from urllib.parse import urlsplit
 import dj_database_url
+import importlib.util
 import os
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -15,19 +18,50 @@ DEBUG = config('DEBUG', default=False, cast=bool)
 
 ALLOWED_HOSTS = os.environ.get("DJANGO_ALLOWED_HOSTS", "localhost,127.0.0.1").split(",")
 
+# Format MessagePack proposé seulement si le paquet est installé
+MSGPACK_DISPONIBLE = importlib.util.find_spec('msgpack') is not None
+
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # Sans état : l'utilisateur est construit depuis le token (accounts.tokens.GinTokenUser)
+        'rest_framework_simplejwt.authentication.JWTStatelessUserAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
+    # Encodage rapide avec orjson, MessagePack en négociation de contenu (voir backend/renderers.py)
+    'DEFAULT_RENDERER_CLASSES': [
+        'backend.renderers.OrjsonRenderer',
+        *(['backend.renderers.MessagePackRenderer'] if MSGPACK_DISPONIBLE else []),
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'backend.renderers.OrjsonParser',
+        *(['backend.renderers.MessagePackParser'] if MSGPACK_DISPONIBLE else []),
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    # Nombre total estimé sur les grandes tables PostgreSQL (voir backend/pagination.py)
+    'DEFAULT_PAGINATION_CLASS': 'backend.pagination.PaginationEstimee',
     'PAGE_SIZE': 10,
+    # Nombre de proxys de confiance devant l'application (1 derrière le load balancer Render) :
+    # l'IP des throttles est lue à cette position de X-Forwarded-For, REMOTE_ADDR si 0.
+    # Sans ce réglage, DRF utiliserait l'en-tête X-Forwarded-For fourni par le client.
+    'NUM_PROXIES': config('NUM_PROXIES', default=0, cast=int),
+    # Tentatives de connexion (voir accounts/throttles.py)
+    'DEFAULT_THROTTLE_RATES': {
+        'connexion_ip': config('LOGIN_RATE_PER_IP', default='20/min'),
+        'connexion_utilisateur': config('LOGIN_RATE_PER_USERNAME', default='10/min'),
+    },
 }
 
+# Au-delà de ce nombre de lignes estimé, la pagination ne compte plus exactement (PostgreSQL)
+PAGINATION_COUNT_EXACT_SEUIL = config('PAGINATION_COUNT_EXACT_SEUIL', default=10000, cast=int)
+# Lignes lues par requête SQL pendant les exports en flux (voir backend/exports.py)
+EXPORT_CHUNK_SIZE = config('EXPORT_CHUNK_SIZE', default=2000, cast=int)
+
 
 # Application definition
 
@@ -40,6 +74,7 @@ INSTALLED_APPS = [
     "django.contrib.staticfiles",
     "rest_framework",
     "rest_framework_simplejwt",
+    "backend",
     "gin",
     'drf_spectacular',
     #"inscription",
@@ -51,16 +86,17 @@ INSTALLED_APPS = [
     "equipe",
     'corsheaders',
     'contact',
+    'notifications',
 ]
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',  # DOIT ÊTRE EN PREMIER
     "django.middleware.security.SecurityMiddleware",
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'backend.middleware.CatalogueWhiteNoiseMiddleware',  # WhiteNoise + instantanés du catalogue
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
-    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    'accounts.middleware.CachedAuthenticationMiddleware',  # AuthenticationMiddleware avec cache
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     'backend.middleware.CSRFExemptAPIMiddleware',  # Notre middleware personnalisé
@@ -158,6 +194,49 @@ DATABASES = {
     'default': dj_database_url.config(default=config('DATABASE_URL'))
 }
 
+# Cache
+# REDIS_URL est requis dès que plusieurs processus tournent (workers gunicorn,
+# worker d'emails) : disjoncteur SMTP, versions du cache des réponses, statut
+# administrateur et utilisateurs en cache ne sont invalidés que dans le cache partagé.
+# Le cache mémoire local (par processus) ne convient qu'au développement et aux tests.
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Durée de mise en cache du statut administrateur GIN (voir backend/permissions.py)
+GIN_ADMIN_CACHE_TIMEOUT = config('GIN_ADMIN_CACHE_TIMEOUT', default=300, cast=int)  # secondes
+
+# Durée de conservation des réponses des endpoints publics (voir backend/cache.py).
+# L'invalidation est exacte (versions par modèle) : ce délai ne borne que la mémoire.
+API_CACHE_TIMEOUT = config('API_CACHE_TIMEOUT', default=3600, cast=int)  # secondes
+
+# Recalcul des entrées de cache par une seule requête à la fois (voir backend/cache.py)
+CACHE_RECALCUL_TIMEOUT = config('CACHE_RECALCUL_TIMEOUT', default=30, cast=int)  # durée max. du verrou, secondes
+CACHE_RECALCUL_ATTENTE = config('CACHE_RECALCUL_ATTENTE', default=5, cast=float)  # attente max. des autres requêtes
+
+# Instantanés JSON du catalogue public (voir backend/catalogue.py)
+CATALOGUE_BASE_URL = config('CATALOGUE_BASE_URL', default='')  # URL publique du site : hôte des URLs absolues des images
+CATALOGUE_AUTO_PUBLISH = config('CATALOGUE_AUTO_PUBLISH', default=False, cast=bool)
+if CATALOGUE_AUTO_PUBLISH and not CATALOGUE_BASE_URL:
+    raise ImproperlyConfigured("CATALOGUE_BASE_URL est requis avec CATALOGUE_AUTO_PUBLISH")
+if CATALOGUE_BASE_URL and urlsplit(CATALOGUE_BASE_URL).hostname not in ALLOWED_HOSTS:
+    # Les instantanés sont rendus par des requêtes internes adressées à cet hôte
+    ALLOWED_HOSTS.append(urlsplit(CATALOGUE_BASE_URL).hostname)
+
+# Authentification par session : l'utilisateur est mis en cache (voir accounts/middleware.py)
+AUTH_USER_CACHE_TIMEOUT = config('AUTH_USER_CACHE_TIMEOUT', default=300, cast=int)  # secondes
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -198,10 +277,13 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')  # C'est ça qui manque
 # Si ce n’est pas déjà là :
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Préfixe public des media servis par un CDN (ex. https://cdn.example.com/media/).
+# Vide : URLs absolues construites à partir de l'hôte de la requête (voir backend/media.py)
+MEDIA_CDN_URL = config('MEDIA_CDN_URL', default='')
 
 # Email Configuration
 # Pour Gmail, utilisez un mot de passe d'application : https://support.google.com/accounts/answer/185833
-EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.smtp.EmailBackend')
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='backend.mail.PooledSMTPEmailBackend')
 EMAIL_HOST = config('EMAIL_HOST', default='smtp.gmail.com')
 EMAIL_PORT = config('EMAIL_PORT', default=587, cast=int)
 EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=True, cast=bool)
@@ -211,9 +293,39 @@ EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default=config('EMAIL_HOST_USER', default='noreply@gin.com'))
 CONTACT_EMAIL = config('CONTACT_EMAIL', default=config('EMAIL_HOST_USER', default='contact@gin.com'))
 
+# Mode digest des messages de contact (voir contact/digest.py) :
+# un seul email récapitulatif par exécution de `python manage.py send_contact_digest`,
+# sauf pour les sujets contenant un mot-clé prioritaire, transmis immédiatement.
+CONTACT_DIGEST_ENABLED = config('CONTACT_DIGEST_ENABLED', default=False, cast=bool)
+CONTACT_PRIORITY_KEYWORDS = [
+    mot.strip().lower()
+    for mot in config('CONTACT_PRIORITY_KEYWORDS', default='urgent,devis,partenariat').split(',')
+    if mot.strip()
+]
+
 # Email timeout settings
 EMAIL_TIMEOUT = config('EMAIL_TIMEOUT', default=30, cast=int)
 
+# Pool de connexions SMTP persistantes (voir backend/mail.py)
+EMAIL_POOL_SIZE = config('EMAIL_POOL_SIZE', default=2, cast=int)  # connexions conservées par processus
+EMAIL_POOL_IDLE_TIMEOUT = config('EMAIL_POOL_IDLE_TIMEOUT', default=60, cast=int)  # secondes
+
+# Surveillance du serveur SMTP et disjoncteur (voir backend/mail.py)
+SMTP_CIRCUIT_FAILURE_THRESHOLD = config('SMTP_CIRCUIT_FAILURE_THRESHOLD', default=3, cast=int)  # échecs avant ouverture
+SMTP_CIRCUIT_RESET_TIMEOUT = config('SMTP_CIRCUIT_RESET_TIMEOUT', default=60, cast=int)  # secondes avant un nouvel essai
+SMTP_HEALTH_CHECK_INTERVAL = config('SMTP_HEALTH_CHECK_INTERVAL', default=30, cast=int)  # secondes entre deux sondes
+SMTP_PROBE_TIMEOUT = config('SMTP_PROBE_TIMEOUT', default=5, cast=int)  # secondes
+
+# File d'envoi des emails (voir notifications/outbox.py)
+# Le worker `python manage.py process_email_outbox` envoie les emails en attente.
+EMAIL_OUTBOX_BATCH_SIZE = config('EMAIL_OUTBOX_BATCH_SIZE', default=50, cast=int)
+EMAIL_OUTBOX_POLL_INTERVAL = config('EMAIL_OUTBOX_POLL_INTERVAL', default=5, cast=float)
+EMAIL_OUTBOX_MAX_ATTEMPTS = config('EMAIL_OUTBOX_MAX_ATTEMPTS', default=8, cast=int)
+EMAIL_OUTBOX_BACKOFF_BASE = config('EMAIL_OUTBOX_BACKOFF_BASE', default=30, cast=int)  # secondes
+EMAIL_OUTBOX_BACKOFF_MAX = config('EMAIL_OUTBOX_BACKOFF_MAX', default=3600, cast=int)  # secondes
+# Durée de réservation d'un lot : passé ce délai, un lot non traité (worker arrêté) est repris
+EMAIL_OUTBOX_LEASE = config('EMAIL_OUTBOX_LEASE', default=300, cast=int)  # secondes
+
 # SSL configuration for email
 EMAIL_SSL_CERTFILE = None
 EMAIL_SSL_KEYFILE = None
@@ -259,10 +371,18 @@ if DEBUG and config('USE_CONSOLE_EMAIL', default=False, cast=bool):
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 SIMPLE_JWT = {
-    'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
+    # Authentification sans état : ni is_active ni le rôle administrateur (claim
+    # `is_gin_admin`) ne sont relus en base pendant la validité du token d'accès.
+    # Une désactivation ou un retrait des administrateurs est pris en compte au
+    # prochain rafraîchissement (voir accounts.serializers.GinTokenRefreshSerializer),
+    # d'où une durée courte, alignée sur GIN_ADMIN_CACHE_TIMEOUT par défaut.
+    'ACCESS_TOKEN_LIFETIME': timedelta(minutes=config('JWT_ACCESS_TOKEN_MINUTES', default=5, cast=int)),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
     'ROTATE_REFRESH_TOKENS': False,
     'BLACKLIST_AFTER_ROTATION': True,
+    'TOKEN_USER_CLASS': 'accounts.tokens.GinTokenUser',
+    'TOKEN_OBTAIN_SERIALIZER': 'accounts.serializers.GinTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'accounts.serializers.GinTokenRefreshSerializer',
 }
 
 SPECTACULAR_SETTINGS = {
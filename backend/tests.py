@@ -2,16 +2,15 @@
 Tests pour les permissions personnalisées du projet.
 """
 from rest_framework.test import APITestCase
-from rest_framework import status
 from django.contrib.auth.models import User, AnonymousUser
 from django.test import RequestFactory
 from rest_framework.views import APIView
 from accounts.models import Administrateur
-from backend.permissions import EstAdministrateur
+from backend.permissions import IsAdminUser
 
 class TestView(APIView):
     """Vue de test pour vérifier les permissions."""
-    permission_classes = [EstAdministrateur]
+    permission_classes = [IsAdminUser]
     
     def get(self, request):
         return None
@@ -35,26 +34,27 @@ class PermissionsTestCase(APITestCase):
         self.view = TestView()
         
     def test_est_administrateur_permission_with_admin(self):
-        """Test de la permission EstAdministrateur avec un utilisateur admin."""
+        """Test de la permission IsAdminUser avec un utilisateur admin."""
         request = self.factory.get('/dummy/')
         request.user = self.admin_user
-        permission = EstAdministrateur()
+        permission = IsAdminUser()
         self.assertTrue(permission.has_permission(request, self.view))
         
     def test_est_administrateur_permission_with_normal_user(self):
-        """Test de la permission EstAdministrateur avec un utilisateur normal."""
+        """Test de la permission IsAdminUser avec un utilisateur normal."""
         request = self.factory.get('/dummy/')
         request.user = self.normal_user
-        permission = EstAdministrateur()
+        permission = IsAdminUser()
         self.assertFalse(permission.has_permission(request, self.view))
-          def test_est_administrateur_permission_without_authentication(self):
-        """Test de la permission EstAdministrateur sans authentification."""
+
+    def test_est_administrateur_permission_without_authentication(self):
+        """Test de la permission IsAdminUser sans authentification."""
         request = self.factory.get('/dummy/')
         request.user = AnonymousUser()
-        permission = EstAdministrateur()
+        permission = IsAdminUser()
         self.assertFalse(permission.has_permission(request, self.view))
         
     def test_est_administrateur_message(self):
-        """Test du message d'erreur de la permission EstAdministrateur."""
-        permission = EstAdministrateur()
+        """Test du message d'erreur de la permission IsAdminUser."""
+        permission = IsAdminUser()
         self.assertEqual(permission.message, "Vous devez être administrateur pour effectuer cette action.")
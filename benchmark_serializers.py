@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+"""
+Compare la sérialisation standard (ModelSerializer) et la sérialisation compilée
+(backend/serializers.py) des listes publiques sur 10 000 lignes.
+Usage: python benchmark_serializers.py [nombre_de_lignes]
+
+Les données sont créées dans une base de test temporaire, supprimée à la fin.
+"""
+import os
+import sys
+import time
+from datetime import date
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test import RequestFactory  # noqa: E402
+from django.test.utils import setup_test_environment, teardown_test_environment  # noqa: E402
+from rest_framework import serializers  # noqa: E402
+
+from equipe.models import Employe  # noqa: E402
+from equipe.serializers import EmployeListSerializer  # noqa: E402
+from partenaires.models import Partenaire  # noqa: E402
+from partenaires.serializers import PartenaireSerializer  # noqa: E402
+from realisations.models import Categorie, Realisation  # noqa: E402
+from realisations.serializers import RealisationListSerializer  # noqa: E402
+from services.models import Service  # noqa: E402
+from services.serializers import ServiceListSerializer  # noqa: E402
+
+REPETITIONS = 3
+
+
+def creer_donnees(nombre):
+    """Crée `nombre` lignes pour chaque modèle (une ligne sur deux avec une image)."""
+    categories = [valeur for valeur, _ in Categorie.choices]
+    Service.objects.bulk_create([
+        Service(titre=f"Service {i}", sous_titre="Sous-titre", description="Description",
+                image=f'services/{i}.jpg' if i % 2 else None)
+        for i in range(nombre)
+    ])
+    Employe.objects.bulk_create([
+        Employe(nom=f"Nom {i}", prenom="Prénom", poste="Poste", photo=f'equipe/{i}.jpg' if i % 2 else None)
+        for i in range(nombre)
+    ])
+    Realisation.objects.bulk_create([
+        Realisation(nomProjet=f"Projet {i}", description="Description " * 20, categorie=categories[i % len(categories)],
+                    dateDebut=date(2023, 1, 1), mission="Mission", image1=f'realisations/{i}.jpg' if i % 2 else None)
+        for i in range(nombre)
+    ])
+    Partenaire.objects.bulk_create([
+        Partenaire(nom=f"Partenaire {i}", site_web="https://example.com", logo=f'partenaires/{i}.png' if i % 2 else None)
+        for i in range(nombre)
+    ])
+
+
+def mesurer(fonction):
+    """Retourne la meilleure durée (en secondes) sur REPETITIONS exécutions."""
+    durees = []
+    for _ in range(REPETITIONS):
+        debut = time.perf_counter()
+        fonction()
+        durees.append(time.perf_counter() - debut)
+    return min(durees)
+
+
+def comparer(serializer_class, model, contexte):
+    def standard():
+        # Sérialisation standard : ListSerializer de DRF sur des instances
+        return serializers.ListSerializer(
+            list(model.objects.all()), child=serializer_class(), context=contexte
+        ).data
+
+    def compile():
+        return serializer_class(model.objects.all(), many=True, context=contexte).data
+
+    assert standard() == compile(), f"Résultats différents pour {serializer_class.__name__}"
+    duree_standard = mesurer(standard)
+    duree_compile = mesurer(compile)
+    print(f"{serializer_class.__name__:<28} {duree_standard * 1000:>10.1f} ms {duree_compile * 1000:>10.1f} ms"
+          f" {duree_standard / duree_compile:>8.1f}x")
+
+
+def main():
+    nombre = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    setup_test_environment()
+    ancien_nom = connection.creation.create_test_db(verbosity=0)
+    try:
+        creer_donnees(nombre)
+        contexte = {'request': RequestFactory().get('/api/')}
+        print(f"Sérialisation de {nombre} lignes (meilleur temps sur {REPETITIONS})")
+        print(f"{'Serializer':<28} {'standard':>13} {'compilé':>13} {'gain':>9}")
+        print("-" * 66)
+        comparer(ServiceListSerializer, Service, contexte)
+        comparer(EmployeListSerializer, Employe, contexte)
+        comparer(RealisationListSerializer, Realisation, contexte)
+        comparer(PartenaireSerializer, Partenaire, contexte)
+    finally:
+        connection.creation.destroy_test_db(ancien_nom, verbosity=0)
+        teardown_test_environment()
+
+
+if __name__ == '__main__':
+    main()
@@ -11,3 +11,6 @@ python manage.py collectstatic --noinput
 
 # Créer automatiquement un superuser si aucun n'existe
 python manage.py create_superuser_if_none_exists
+
+# Publier le catalogue statique (un échec n'empêche pas le déploiement)
+python manage.py publish_catalogue || echo "Catalogue statique non publié"
@@ -0,0 +1,103 @@
+"""
+Notifications des messages de contact.
+
+Chaque message est notifié par un email mis en file (notifications.outbox) et
+envoyé par le worker : la requête du formulaire n'attend pas le serveur SMTP.
+En mode digest (CONTACT_DIGEST_ENABLED), les messages ne sont pas transmis un par
+un : ils restent marqués non notifiés et la commande `send_contact_digest`
+envoie un seul email récapitulatif par intervalle. Les sujets contenant un mot-clé
+prioritaire (CONTACT_PRIORITY_KEYWORDS) sont toujours transmis immédiatement, par
+un envoi direct (mis en file si le serveur SMTP est indisponible).
+"""
+from django.conf import settings
+from django.db import transaction
+
+from notifications.outbox import envoyer_ou_differer, mettre_en_file
+from .models import Contact
+
+
+def est_prioritaire(contact):
+    """Indique si le sujet du message contient un mot-clé prioritaire."""
+    sujet = contact.subject.lower()
+    return any(mot in sujet for mot in settings.CONTACT_PRIORITY_KEYWORDS)
+
+
+def formater_message(contact):
+    """Retourne le sujet et le corps de l'email de notification d'un message."""
+    subject = f"🔔 Nouveau message de contact: {contact.subject}"
+    message = f"""
+Nouveau message de contact reçu sur le site web GIN :
+
+👤 Nom: {contact.name}
+📧 Email: {contact.email}
+📝 Sujet: {contact.subject}
+
+💬 Message:
+{contact.message}
+
+🕒 Reçu le: {contact.created_at.strftime('%d/%m/%Y à %H:%M')}
+
+---
+Ce message a été envoyé automatiquement depuis le formulaire de contact du site web.
+                """
+    return subject, message
+
+
+def notifier_contact(contact):
+    """
+    Transmet un nouveau message de contact à CONTACT_EMAIL : envoi direct pour
+    les messages prioritaires, mise en file pour les autres, sauf en mode digest
+    où ils attendent le prochain récapitulatif.
+
+    Returns:
+        bool: True si le message a été transmis (ou mis en file), False s'il attend le digest
+    """
+    prioritaire = est_prioritaire(contact)
+    if settings.CONTACT_DIGEST_ENABLED and not prioritaire:
+        return False
+
+    subject, message = formater_message(contact)
+    if prioritaire:
+        envoyer_ou_differer(subject, message, [settings.CONTACT_EMAIL], settings.DEFAULT_FROM_EMAIL)
+        Contact.objects.filter(pk=contact.pk).update(notifie=True)
+        return True
+
+    with transaction.atomic():
+        mettre_en_file(subject, message, [settings.CONTACT_EMAIL], settings.DEFAULT_FROM_EMAIL)
+        Contact.objects.filter(pk=contact.pk).update(notifie=True)
+    return True
+
+
+def envoyer_digest():
+    """
+    Met en file un email récapitulatif de tous les messages non notifiés.
+
+    Returns:
+        int: Nombre de messages inclus dans le récapitulatif
+    """
+    with transaction.atomic():
+        contacts = list(
+            Contact.objects.select_for_update()
+            .filter(notifie=False)
+            .order_by('created_at', 'id')
+        )
+        if not contacts:
+            return 0
+
+        sections = []
+        for contact in contacts:
+            sections.append(f"""👤 {contact.name} <{contact.email}>
+📝 {contact.subject}
+🕒 {contact.created_at.strftime('%d/%m/%Y à %H:%M')}
+
+{contact.message}""")
+
+        subject = f"🔔 {len(contacts)} nouveau(x) message(s) de contact"
+        message = (
+            "Messages de contact reçus sur le site web GIN depuis le dernier récapitulatif :\n\n"
+            + "\n\n----------------------------------------\n\n".join(sections)
+            + "\n\n---\nCe récapitulatif a été envoyé automatiquement depuis le formulaire de contact du site web."
+        )
+        mettre_en_file(subject, message, [settings.CONTACT_EMAIL], settings.DEFAULT_FROM_EMAIL)
+        Contact.objects.filter(pk__in=[contact.pk for contact in contacts]).update(notifie=True)
+    return len(contacts)
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from contact.digest import envoyer_digest
+
+
+class Command(BaseCommand):
+    help = 'Envoie le récapitulatif des messages de contact non notifiés (à planifier en cron)'
+
+    def handle(self, *args, **options):
+        nombre = envoyer_digest()
+        if nombre:
+            self.stdout.write(self.style.SUCCESS(f'Récapitulatif de {nombre} message(s) mis en file'))
+        else:
+            self.stdout.write('Aucun nouveau message de contact')
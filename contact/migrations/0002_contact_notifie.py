@@ -0,0 +1,31 @@
+# Generated by Django 5.2 on 2026-10-18 12:28
+
+from django.db import migrations, models
+
+
+def marquer_messages_existants(apps, schema_editor):
+    # Les messages reçus avant le mode digest ont déjà été envoyés par email
+    Contact = apps.get_model("contact", "Contact")
+    Contact.objects.update(notifie=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contact", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="contact",
+            name="notifie",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(marquer_messages_existants, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="contact",
+            index=models.Index(
+                fields=["notifie", "created_at"], name="contact_a_notifier_idx"
+            ),
+        ),
+    ]
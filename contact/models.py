@@ -7,6 +7,13 @@ class Contact(models.Model):
     subject = models.CharField(max_length=200)
     message = models.TextField()
     created_at = models.DateTimeField(default=timezone.now)
+    # Faux tant que le message n'a pas été transmis à CONTACT_EMAIL (mode digest)
+    notifie = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['notifie', 'created_at'], name='contact_a_notifier_idx'),
+        ]
 
     def __str__(self):
         return f"{self.subject} - {self.name}"
@@ -1,3 +1,210 @@
-from django.test import TestCase
+from unittest import mock
+import smtplib
 
-# Create your tests here.
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail import EmailMessage
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from backend.mail import (
+    CircuitSMTPOuvert, DisjoncteurSMTP, PooledSMTPEmailBackend, disjoncteur_smtp, pool_smtp, sonder_smtp,
+)
+from notifications.models import EmailSortant
+from notifications.outbox import envoyer_emails_en_attente
+from .digest import envoyer_digest
+from .models import Contact
+
+
+@override_settings(CONTACT_DIGEST_ENABLED=True, CONTACT_PRIORITY_KEYWORDS=['urgent'])
+class ContactDigestTestCase(TestCase):
+    """Tests du mode digest des messages de contact."""
+
+    def envoyer_message(self, sujet):
+        data = {
+            "name": "Jean Dupont",
+            "email": "jean@example.com",
+            "subject": sujet,
+            "message": "Bonjour, je souhaite des informations.",
+        }
+        return self.client.post(reverse('contact'), data, content_type='application/json')
+
+    def test_messages_regroupes_dans_un_digest(self):
+        """Les messages non prioritaires sont envoyés dans un seul récapitulatif."""
+        self.envoyer_message("Demande d'information")
+        self.envoyer_message("Question sur les formations")
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(Contact.objects.filter(notifie=False).count(), 2)
+
+        self.assertEqual(envoyer_digest(), 2)
+        self.assertEqual(envoyer_digest(), 0)
+        envoyer_emails_en_attente()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn("Question sur les formations", mail.outbox[0].body)
+        self.assertFalse(Contact.objects.filter(notifie=False).exists())
+
+    @override_settings(CONTACT_DIGEST_ENABLED=False)
+    def test_message_mis_en_file_hors_digest(self):
+        """Hors mode digest, l'email est mis en file pour le worker, pas envoyé pendant la requête."""
+        self.envoyer_message("Demande d'information")
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(EmailSortant.objects.count(), 1)
+        self.assertTrue(Contact.objects.get().notifie)
+
+        envoyer_emails_en_attente()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn("Demande d'information", mail.outbox[0].subject)
+
+    def test_message_prioritaire_envoye_immediatement(self):
+        """Un sujet prioritaire est transmis sans attendre le récapitulatif."""
+        self.envoyer_message("URGENT : site en panne")
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertTrue(Contact.objects.get().notifie)
+
+
+@override_settings(EMAIL_POOL_SIZE=2, EMAIL_POOL_IDLE_TIMEOUT=60)
+class PooledSMTPEmailBackendTestCase(TestCase):
+    """Tests du backend SMTP avec pool de connexions."""
+
+    def setUp(self):
+        """Remplace smtplib.SMTP par un faux serveur."""
+        cache.clear()
+        pool_smtp.vider()
+        patcher = mock.patch('smtplib.SMTP')
+        self.smtp_class = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(pool_smtp.vider)
+        self.smtp_class.return_value.noop.return_value = (250, b'OK')
+
+    def envoyer(self, fail_silently=False):
+        backend = PooledSMTPEmailBackend(
+            host='smtp.test', port=587, username='u', password='p', use_tls=True, fail_silently=fail_silently,
+        )
+        message = EmailMessage('Sujet', 'Corps', 'from@test.com', ['to@test.com'])
+        return backend.send_messages([message])
+
+    def test_connexion_reutilisee_entre_envois(self):
+        """Deux envois successifs n'ouvrent qu'une seule connexion authentifiée."""
+        self.assertEqual(self.envoyer(), 1)
+        self.assertEqual(self.envoyer(), 1)
+        self.assertEqual(self.smtp_class.call_count, 1)
+        self.assertEqual(self.smtp_class.return_value.login.call_count, 1)
+        self.smtp_class.return_value.noop.assert_called_once()
+
+    def test_connexion_morte_remplacee(self):
+        """Une connexion qui ne répond plus à NOOP est remplacée."""
+        self.envoyer()
+        self.smtp_class.return_value.noop.side_effect = smtplib.SMTPServerDisconnected()
+        self.assertEqual(self.envoyer(), 1)
+        self.assertEqual(self.smtp_class.call_count, 2)
+
+    def test_reconnexion_transparente_pendant_envoi(self):
+        """Une déconnexion pendant l'envoi provoque une reconnexion et un nouvel essai."""
+        self.smtp_class.return_value.sendmail.side_effect = [smtplib.SMTPServerDisconnected(), {}]
+        self.assertEqual(self.envoyer(), 1)
+        self.assertEqual(self.smtp_class.call_count, 2)
+
+    def test_reconnexion_avec_fail_silently(self):
+        """La reconnexion a lieu aussi quand les erreurs sont passées sous silence."""
+        self.smtp_class.return_value.sendmail.side_effect = [smtplib.SMTPServerDisconnected(), {}]
+        self.assertEqual(self.envoyer(fail_silently=True), 1)
+        self.assertEqual(self.smtp_class.call_count, 2)
+
+    def test_erreur_passee_sous_silence(self):
+        """Avec fail_silently, une autre erreur SMTP n'est pas levée et le message n'est pas compté."""
+        self.smtp_class.return_value.sendmail.side_effect = smtplib.SMTPDataError(554, b'Refuse')
+        self.assertEqual(self.envoyer(fail_silently=True), 0)
+        with self.assertRaises(smtplib.SMTPDataError):
+            self.envoyer()
+
+    @override_settings(SMTP_CIRCUIT_FAILURE_THRESHOLD=2)
+    def test_reconnexion_soumise_au_disjoncteur(self):
+        """La reconnexion passe par open() : elle n'est pas tentée si le circuit s'est ouvert."""
+        def deconnexion(*args, **kwargs):
+            for _ in range(2):
+                disjoncteur_smtp.signaler_echec()
+            raise smtplib.SMTPServerDisconnected()
+
+        self.smtp_class.return_value.sendmail.side_effect = deconnexion
+        with self.assertRaises(CircuitSMTPOuvert):
+            self.envoyer()
+        self.assertEqual(self.smtp_class.call_count, 1)
+
+        cache.clear()
+        self.assertEqual(self.envoyer(fail_silently=True), 0)
+        self.assertEqual(self.smtp_class.call_count, 2)
+
+    @override_settings(SMTP_CIRCUIT_FAILURE_THRESHOLD=2, SMTP_CIRCUIT_RESET_TIMEOUT=60)
+    def test_connexion_du_pool_referme_le_circuit(self):
+        """En semi-ouvert, une connexion reprise au pool referme le circuit et libère la tentative."""
+        self.envoyer()
+        for _ in range(2):
+            disjoncteur_smtp.signaler_echec()
+        with mock.patch('backend.mail.time.time', return_value=disjoncteur_smtp._lire()['ouvert_depuis'] + 61):
+            self.assertEqual(self.envoyer(), 1)
+        self.assertEqual(disjoncteur_smtp.etat(), DisjoncteurSMTP.FERME)
+        self.assertIsNone(cache.get(DisjoncteurSMTP.CLE_ESSAI))
+        self.assertEqual(self.smtp_class.call_count, 1)
+
+    @override_settings(EMAIL_TIMEOUT=30, SMTP_PROBE_TIMEOUT=5)
+    def test_sonde_rend_connexion_avec_delai_normal(self):
+        """La connexion ouverte par la sonde retrouve EMAIL_TIMEOUT avant d'être mise dans le pool."""
+        self.assertTrue(sonder_smtp())
+        self.assertEqual(self.smtp_class.call_args.kwargs['timeout'], 5)
+        connexion = self.smtp_class.return_value
+        self.assertEqual(connexion.timeout, 30)
+        connexion.sock.settimeout.assert_called_with(30)
+
+
+@override_settings(SMTP_CIRCUIT_FAILURE_THRESHOLD=2, SMTP_CIRCUIT_RESET_TIMEOUT=60)
+class DisjoncteurSMTPTestCase(TestCase):
+    """Tests du disjoncteur SMTP."""
+
+    def setUp(self):
+        """Remplace smtplib.SMTP par un serveur injoignable."""
+        cache.clear()
+        pool_smtp.vider()
+        self.addCleanup(cache.clear)
+        patcher = mock.patch('smtplib.SMTP', side_effect=TimeoutError("timeout"))
+        self.smtp_class = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def ouvrir(self):
+        PooledSMTPEmailBackend(host='smtp.test', port=587).open()
+
+    def test_circuit_ouvert_apres_echecs(self):
+        """Après le seuil d'échecs, plus aucune connexion n'est tentée."""
+        for _ in range(2):
+            with self.assertRaises(TimeoutError):
+                self.ouvrir()
+        self.assertEqual(disjoncteur_smtp.etat(), DisjoncteurSMTP.OUVERT)
+
+        with self.assertRaises(CircuitSMTPOuvert):
+            self.ouvrir()
+        self.assertEqual(self.smtp_class.call_count, 2)
+
+    def test_semi_ouvert_puis_referme(self):
+        """Après le délai, une seule tentative est autorisée et son succès referme le circuit."""
+        for _ in range(2):
+            disjoncteur_smtp.signaler_echec()
+        with mock.patch('backend.mail.time.time', return_value=disjoncteur_smtp._lire()['ouvert_depuis'] + 61):
+            self.assertEqual(disjoncteur_smtp.etat(), DisjoncteurSMTP.SEMI_OUVERT)
+            self.assertTrue(disjoncteur_smtp.autorise_envoi())
+            self.assertFalse(disjoncteur_smtp.autorise_envoi())
+        disjoncteur_smtp.signaler_succes()
+        self.assertEqual(disjoncteur_smtp.etat(), DisjoncteurSMTP.FERME)
+
+    def test_contact_differe_si_circuit_ouvert(self):
+        """Pendant une panne, le message de contact est enregistré et son email mis en file."""
+        for _ in range(2):
+            disjoncteur_smtp.signaler_echec()
+        data = {
+            "name": "Jean Dupont",
+            "email": "jean@example.com",
+            "subject": "Demande d'information",
+            "message": "Bonjour, je souhaite des informations.",
+        }
+        response = self.client.post(reverse('contact'), data, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(EmailSortant.objects.count(), 1)
@@ -2,13 +2,12 @@ from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny
-from django.core.mail import send_mail
-from django.conf import settings
 from django.core.exceptions import ValidationError
 from drf_spectacular.utils import extend_schema, OpenApiExample
 import logging
 from .serializers import ContactSerializer
 from .models import Contact
+from .digest import notifier_contact
 
 logger = logging.getLogger(__name__)
 
@@ -51,47 +50,16 @@ class ContactView(APIView):
                 contact = serializer.save()
                 logger.info(f"Nouveau message de contact reçu de {contact.email}")
                 
-                # Préparer l'email
-                subject = f"🔔 Nouveau message de contact: {contact.subject}"
-                message = f"""
-Nouveau message de contact reçu sur le site web GIN :
-
-👤 Nom: {contact.name}
-📧 Email: {contact.email}
-📝 Sujet: {contact.subject}
-
-💬 Message:
-{contact.message}
-
-🕒 Reçu le: {contact.created_at.strftime('%d/%m/%Y à %H:%M')}
-
----
-Ce message a été envoyé automatiquement depuis le formulaire de contact du site web.
-                """
+                # Transmettre le message (immédiatement, ou au prochain récapitulatif en mode digest)
+                if notifier_contact(contact):
+                    logger.info(f"Email de contact transmis pour {contact.email}")
+                else:
+                    logger.info(f"Message de contact de {contact.email} en attente du prochain récapitulatif")
                 
-                # Envoyer l'email
-                try:
-                    send_mail(
-                        subject=subject,
-                        message=message,
-                        from_email=settings.DEFAULT_FROM_EMAIL,
-                        recipient_list=[settings.CONTACT_EMAIL],
-                        fail_silently=False,
-                    )
-                    logger.info(f"Email de contact envoyé avec succès pour {contact.email}")
-                    
-                    return Response({
-                        'message': 'Votre message a été envoyé avec succès. Nous vous répondrons dans les plus brefs délais.',
-                        'contact': serializer.data
-                    }, status=status.HTTP_201_CREATED)
-                    
-                except Exception as e:
-                    logger.error(f"Erreur lors de l'envoi de l'email de contact: {str(e)}")
-                    # Le message est sauvegardé même si l'email échoue
-                    return Response({
-                        'message': 'Votre message a été enregistré mais une erreur est survenue lors de l\'envoi de l\'email. Nos équipes ont été notifiées.',
-                        'contact': serializer.data
-                    }, status=status.HTTP_201_CREATED)
+                return Response({
+                    'message': 'Votre message a été envoyé avec succès. Nous vous répondrons dans les plus brefs délais.',
+                    'contact': serializer.data
+                }, status=status.HTTP_201_CREATED)
                     
             except Exception as e:
                 logger.error(f"Erreur lors de la sauvegarde du message de contact: {str(e)}")
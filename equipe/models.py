@@ -1,7 +1,8 @@
 from django.db import models
 from django.utils.translation import gettext_lazy as _
+from backend.mixins import SuiviChangementsMixin
 
-class Employe(models.Model):
+class Employe(SuiviChangementsMixin, models.Model):
     """
     Modèle représentant un employé de l'équipe de l'entreprise.
     """
@@ -1,7 +1,9 @@
 from rest_framework import serializers
+from backend.media import MediaUrlMixin, url_media
+from backend.serializers import ListSerializerCompile, format_texte, url_fichier
 from .models import Employe
 
-class EmployeSerializer(serializers.ModelSerializer):
+class EmployeSerializer(MediaUrlMixin, serializers.ModelSerializer):
     """Serializer pour le modèle Employe."""
     nom_complet = serializers.SerializerMethodField()
     photo_principale = serializers.SerializerMethodField()
@@ -16,20 +18,22 @@ class EmployeSerializer(serializers.ModelSerializer):
 
     def get_photo_principale(self, obj):
         """Retourne l'URL de la photo principale."""
-        if obj.photo_principale:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(obj.photo_principale.url)
-        return None
+        return url_media(obj.photo_principale, self.context.get('request'))
 
 class EmployeListSerializer(serializers.ModelSerializer):
     """Serializer pour la liste des employés (vue simplifiée)."""
     nom_complet = serializers.SerializerMethodField()
     photo_principale = serializers.SerializerMethodField()
 
+    plan_compile = {
+        'nom_complet': format_texte('{prenom} {nom}'),
+        'photo_principale': url_fichier('photo'),
+    }
+
     class Meta:
         model = Employe
         fields = ('id', 'nom_complet', 'poste', 'photo_principale', 'actif')
+        list_serializer_class = ListSerializerCompile
 
     def get_nom_complet(self, obj):
         """Retourne le nom complet de l'employé."""
@@ -37,13 +41,9 @@ class EmployeListSerializer(serializers.ModelSerializer):
 
     def get_photo_principale(self, obj):
         """Retourne l'URL de la photo principale."""
-        if obj.photo_principale:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(obj.photo_principale.url)
-        return None
+        return url_media(obj.photo_principale, self.context.get('request'))
 
-class EmployeCreateUpdateSerializer(serializers.ModelSerializer):
+class EmployeCreateUpdateSerializer(MediaUrlMixin, serializers.ModelSerializer):
     """Serializer pour la création et mise à jour des employés."""
     
     class Meta:
@@ -0,0 +1,6 @@
+from backend.cache import suivre_versions
+from backend.catalogue import suivre_catalogue
+from .models import Employe
+
+suivre_versions(Employe)
+suivre_catalogue(Employe, 'equipe')
@@ -1,3 +1,17 @@
-from django.test import TestCase
+from django.test import RequestFactory, TestCase
 
-# Create your tests here.
+from .models import Employe
+from .serializers import EmployeListSerializer
+
+
+class EmployeListSerializerTestCase(TestCase):
+    """Tests de la sérialisation compilée de la liste des employés."""
+
+    def test_meme_resultat_que_le_model_serializer(self):
+        """nom_complet et photo_principale sont calculés comme par les SerializerMethodField."""
+        Employe.objects.create(nom="Dupont", prenom="Jean", poste="Développeur")
+        Employe.objects.create(nom="Diallo", prenom="Awa", poste="Designer", photo='equipe/awa.jpg')
+        contexte = {'request': RequestFactory().get('/api/equipe/')}
+        attendu = [EmployeListSerializer(employe, context=contexte).data for employe in Employe.objects.all()]
+        compile = EmployeListSerializer(Employe.objects.all(), many=True, context=contexte).data
+        self.assertEqual(compile, attendu)
@@ -1,5 +1,7 @@
 from rest_framework import generics
 from rest_framework.permissions import AllowAny
+from backend.base_api_views import ChampsPartielsMixin, ListeCompileeMixin
+from backend.cache import CacheReponseMixin
 from backend.permissions import IsAdminOrReadOnly
 from .models import Employe
 from .serializers import (
@@ -16,7 +18,7 @@ from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiExam
         responses={200: EmployeListSerializer(many=True)}
     )
 )
-class EmployeListView(generics.ListAPIView):
+class EmployeListView(CacheReponseMixin, ChampsPartielsMixin, ListeCompileeMixin, generics.ListAPIView):
     """
     Vue pour lister tous les employés.
     Accessible à tous (lecture publique).
@@ -42,7 +44,7 @@ class EmployeListView(generics.ListAPIView):
         responses={200: EmployeSerializer}
     )
 )
-class EmployeDetailView(generics.RetrieveAPIView):
+class EmployeDetailView(CacheReponseMixin, ChampsPartielsMixin, generics.RetrieveAPIView):
     """
     Vue pour afficher les détails d'un employé spécifique.
     Accessible à tous (lecture publique).
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class GinConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "gin"
+
+    def ready(self):
+        import gin.signals
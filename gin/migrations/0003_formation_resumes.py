@@ -0,0 +1,36 @@
+# Generated by Django 5.2 on 2026-10-18 12:55
+
+from django.db import migrations, models
+
+
+def calculer_resumes(apps, schema_editor):
+    # Résumés des formations existantes ; ensuite recalculés par Formation.save()
+    Formation = apps.get_model("gin", "Formation")
+    formations = list(Formation.objects.only("id", "programme", "date_debut", "date_fin"))
+    for formation in formations:
+        programme = formation.programme
+        formation.nombre_modules = len(programme) if isinstance(programme, list) else 0
+        if formation.date_debut and formation.date_fin:
+            formation.duree_jours = (formation.date_fin - formation.date_debut).days + 1
+    Formation.objects.bulk_update(formations, ["nombre_modules", "duree_jours"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("gin", "0002_alter_formation_options_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="formation",
+            name="duree_jours",
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="formation",
+            name="nombre_modules",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(calculer_resumes, migrations.RunPython.noop),
+    ]
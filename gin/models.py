@@ -1,5 +1,6 @@
 from django.db import models
 from django.core.exceptions import ValidationError
+from backend.mixins import SuiviChangementsMixin, TextesLongsQuerySet
 
 class Formation(models.Model):
     titre = models.CharField(max_length=100)
@@ -17,18 +18,41 @@ class Formation(models.Model):
     date_fin = models.DateField(null=True, blank=True)
     lieu = models.CharField(max_length=100)
 
+    # Résumés affichés dans la liste des formations, recalculés dans save()
+    nombre_modules = models.PositiveIntegerField(default=0, editable=False)
+    duree_jours = models.PositiveIntegerField(null=True, blank=True, editable=False)
+
+    objects = TextesLongsQuerySet.as_manager()
+
     class Meta:
         ordering = ['-date_debut']  # Tri par date de début (du plus récent au plus ancien)
 
     def __str__(self):
         return self.titre
 
+    def calculer_resumes(self):
+        """Met à jour le nombre de modules du programme et la durée en jours (dates incluses)."""
+        self.nombre_modules = len(self.programme) if isinstance(self.programme, list) else 0
+        if self.date_debut and self.date_fin:
+            self.duree_jours = (self.date_fin - self.date_debut).days + 1
+        else:
+            self.duree_jours = None
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None:
+            self.calculer_resumes()
+        elif {'programme', 'date_debut', 'date_fin'} & set(update_fields):
+            self.calculer_resumes()
+            kwargs['update_fields'] = {*update_fields, 'nombre_modules', 'duree_jours'}
+        super().save(*args, **kwargs)
+
     def clean(self):
         if self.date_fin and self.date_fin < self.date_debut:
             raise ValidationError("La date de fin doit être postérieure à la date de début.")
         
 
-class InscriptionFormation(models.Model):
+class InscriptionFormation(SuiviChangementsMixin, models.Model):
     DIPLOME_CHOICES = [
         ('BEPC', 'BEPC'),
         ('BAC', 'Bac'),
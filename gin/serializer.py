@@ -1,4 +1,6 @@
 from rest_framework import serializers
+from backend.exports import FORMATS_EXPORT, Colonne
+from backend.serializers import ListSerializerCompile
 from .models import Formation, InscriptionFormation
 
 class ModuleSerializer(serializers.Serializer):
@@ -12,7 +14,50 @@ class FormationSerializer(serializers.ModelSerializer):
         model = Formation
         fields = '__all__'
 
+class FormationListSerializer(serializers.ModelSerializer):
+    """
+    Serializer pour la liste des formations : sans le programme ni les textes
+    longs, remplacés par les résumés calculés à l'enregistrement.
+    """
+
+    class Meta:
+        model = Formation
+        fields = ('id', 'titre', 'prix', 'date_debut', 'date_fin', 'duree_jours', 'lieu', 'nombre_modules')
+        list_serializer_class = ListSerializerCompile
+
 class InscriptionFormationSerializer(serializers.ModelSerializer):
     class Meta:
         model = InscriptionFormation
         fields = '__all__'
+
+class ExportInscriptionsSerializer(serializers.Serializer):
+    """
+    Paramètres de l'export des inscriptions (type remplace format, réservé par DRF).
+    Les inscriptions n'ayant pas de date, le filtre porte sur la formation et le diplôme.
+    """
+    type = serializers.ChoiceField(choices=list(FORMATS_EXPORT), default='csv')
+    formation = serializers.IntegerField(required=False)
+    dernier_diplome = serializers.ChoiceField(choices=InscriptionFormation.DIPLOME_CHOICES, required=False)
+
+    # Colonnes exportées (voir backend/exports.py)
+    colonnes = [
+        Colonne('id'),
+        Colonne('formation', 'formation_id'),
+        Colonne('formation_titre', 'formation__titre'),
+        Colonne('nom'),
+        Colonne('prenom'),
+        Colonne('email'),
+        Colonne('dernier_diplome'),
+        Colonne('domaine'),
+        Colonne('annees_experience'),
+        Colonne('motivations'),
+    ]
+
+    def filtrer(self, queryset):
+        """Applique les filtres validés à `queryset`."""
+        filtres = self.validated_data
+        if 'formation' in filtres:
+            queryset = queryset.filter(formation_id=filtres['formation'])
+        if 'dernier_diplome' in filtres:
+            queryset = queryset.filter(dernier_diplome=filtres['dernier_diplome'])
+        return queryset
@@ -0,0 +1,6 @@
+from backend.cache import suivre_versions
+from backend.catalogue import suivre_catalogue
+from .models import Formation
+
+suivre_versions(Formation)
+suivre_catalogue(Formation, 'formations')
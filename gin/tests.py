@@ -1,3 +1,249 @@
+import csv
+import datetime
+import io
+import json
+import unittest
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from accounts.models import Administrateur
+from backend.renderers import MessagePackRenderer, OrjsonParser, OrjsonRenderer, msgpack
+from .models import Formation, InscriptionFormation
+
+class FormationChampsPartielsTestCase(TestCase):
+    """Tests de ?fields= sur les formations (ModelViewSet)."""
+
+    def test_fields(self):
+        """Seuls les champs demandés sont renvoyés et lus en base."""
+        cache.clear()
+        formation = Formation.objects.create(
+            titre="Django", description="Description", acquis="Acquis", debouche="Débouchés",
+            prix=Decimal('150000.00'), date_debut=datetime.date(2025, 9, 1), lieu="Dakar",
+        )
+        with CaptureQueriesContext(connection) as requetes:
+            response = self.client.get(reverse('formations:formation-list'), {'fields': 'id,titre,prix'})
+        self.assertEqual(response.json()['results'], [{'id': formation.id, 'titre': "Django", 'prix': "150000.00"}])
+        self.assertNotIn('"programme"', requetes.captured_queries[-1]['sql'])
+
+
+class FormationListeTestCase(TestCase):
+    """Tests de la liste allégée des formations."""
+
+    def setUp(self):
+        """Configuration initiale pour les tests."""
+        cache.clear()
+        self.formation = Formation.objects.create(
+            titre="Django", description="Description", acquis="Acquis", debouche="Débouchés",
+            programme=[{"titre": "Modèles", "contenus": ["ORM"]}, {"titre": "Vues", "contenus": ["DRF"]}],
+            prix=Decimal('150000.00'), date_debut=datetime.date(2025, 9, 1),
+            date_fin=datetime.date(2025, 9, 30), lieu="Dakar",
+        )
+
+    def test_resumes_calcules(self):
+        """Le nombre de modules et la durée suivent le programme et les dates."""
+        self.assertEqual((self.formation.nombre_modules, self.formation.duree_jours), (2, 30))
+        self.formation.programme = self.formation.programme[:1]
+        self.formation.date_fin = None
+        self.formation.save(update_fields=['programme', 'date_fin'])
+        self.formation.refresh_from_db()
+        self.assertEqual((self.formation.nombre_modules, self.formation.duree_jours), (1, None))
+
+    def test_liste_sans_programme(self):
+        """La liste expose les résumés et ne lit ni le programme ni les textes longs."""
+        with CaptureQueriesContext(connection) as requetes:
+            response = self.client.get(reverse('formations:formation-list'))
+        formation = response.json()['results'][0]
+        self.assertNotIn('programme', formation)
+        self.assertEqual(formation['nombre_modules'], 2)
+        self.assertEqual(formation['duree_jours'], 30)
+        select = requetes.captured_queries[-1]['sql']
+        self.assertNotIn('"programme"', select)
+        self.assertNotIn('"acquis"', select)
+
+        response = self.client.get(reverse('formations:formation-detail', args=[self.formation.pk]))
+        self.assertEqual(len(response.json()['programme']), 2)
+
+
+class InscriptionPaginationCurseurTestCase(APITestCase):
+    """Tests de la pagination par curseur des inscriptions (backend/pagination.py)."""
+
+    def setUp(self):
+        """Configuration initiale pour les tests."""
+        admin = User.objects.create_user(username='admin', password='motdepasse')
+        Administrateur.objects.create().utilisateurs.add(admin)
+        self.client.force_authenticate(user=admin)
+        formation = Formation.objects.create(
+            titre="Django", description="Description", acquis="Acquis", debouche="Débouchés",
+            prix=Decimal('150000.00'), date_debut=datetime.date(2025, 9, 1), lieu="Dakar",
+        )
+        self.inscriptions = InscriptionFormation.objects.bulk_create([
+            InscriptionFormation(
+                formation=formation, nom=f"Nom {i}", prenom="Prénom", email=f"candidat{i}@example.com",
+                motivations="Motivations", dernier_diplome='BAC', domaine="Informatique", annees_experience=0,
+            )
+            for i in range(15)
+        ])
+
+    def test_pagination_par_defaut(self):
+        """Sans paramètre, la pagination par numéro de page est conservée."""
+        response = self.client.get(reverse('formations:inscriptionformation-list'))
+        self.assertEqual(response.data['count'], 15)
+
+    def test_pagination_curseur(self):
+        """?pagination=curseur parcourt toutes les inscriptions sans COUNT."""
+        with CaptureQueriesContext(connection) as requetes:
+            response = self.client.get(reverse('formations:inscriptionformation-list'), {'pagination': 'curseur'})
+        self.assertNotIn('count', response.data)
+        self.assertFalse(any('COUNT(' in requete['sql'] for requete in requetes.captured_queries))
+        ids = [inscription['id'] for inscription in response.data['results']]
+
+        response = self.client.get(response.data['next'])
+        ids += [inscription['id'] for inscription in response.data['results']]
+        self.assertIsNone(response.data['next'])
+        self.assertEqual(ids, sorted((inscription.id for inscription in self.inscriptions), reverse=True))
+
+
+class ExportInscriptionsTestCase(APITestCase):
+    """Tests de l'export en flux des inscriptions (backend/exports.py)."""
+
+    def setUp(self):
+        """Configuration initiale pour les tests."""
+        self.admin = User.objects.create_user(username='admin', password='motdepasse')
+        Administrateur.objects.create().utilisateurs.add(self.admin)
+        self.formations = [
+            Formation.objects.create(
+                titre=titre, description="Description", acquis="Acquis", debouche="Débouchés",
+                prix=Decimal('150000.00'), date_debut=datetime.date(2025, 9, 1), lieu="Dakar",
+            )
+            for titre in ("Django", "Réseaux")
+        ]
+        for i, formation in enumerate(self.formations * 3):
+            InscriptionFormation.objects.create(
+                formation=formation, nom=f"Nom {i}", prenom="Prénom", email=f"candidat{i}@example.com",
+                motivations="Motivé, disponible\net curieux", dernier_diplome='BAC', domaine="Informatique",
+                annees_experience=i,
+            )
+        self.url = reverse('formations:inscriptionformation-export')
+
+    def test_export_reserve_aux_administrateurs(self):
+        """L'export n'est pas accessible sans être administrateur."""
+        response = self.client.get(self.url)
+        self.assertIn(response.status_code, (401, 403))
+
+    def test_export_csv_filtre(self):
+        """L'export CSV est envoyé en flux et filtré par formation."""
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get(self.url, {'formation': self.formations[0].pk})
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment; filename="inscriptions-formations-', response['Content-Disposition'])
+        contenu = b''.join(response.streaming_content).decode('utf-8-sig')
+        lignes = list(csv.DictReader(io.StringIO(contenu)))
+        self.assertEqual(len(lignes), 3)
+        self.assertEqual({ligne['formation_titre'] for ligne in lignes}, {"Django"})
+        self.assertEqual(lignes[0]['motivations'], "Motivé, disponible\net curieux")
+
+    def test_export_ndjson(self):
+        """?type=ndjson donne un objet JSON par ligne."""
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get(self.url, {'type': 'ndjson', 'dernier_diplome': 'BAC'})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        lignes = [json.loads(ligne) for ligne in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual(len(lignes), 6)
+        self.assertEqual(lignes[0]['formation_titre'], "Réseaux")
+
+    def test_export_csv_formules_neutralisees(self):
+        """Une valeur commençant comme une formule est préfixée d'une apostrophe."""
+        InscriptionFormation.objects.filter(nom="Nom 0").update(nom='=HYPERLINK("http://x","clic")', prenom="-2+3")
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get(self.url, {'formation': self.formations[0].pk})
+        contenu = b''.join(response.streaming_content).decode('utf-8-sig')
+        ligne = next(ligne for ligne in csv.DictReader(io.StringIO(contenu)) if ligne['email'] == 'candidat0@example.com')
+        self.assertEqual(ligne['nom'], '\'=HYPERLINK("http://x","clic")')
+        self.assertEqual(ligne['prenom'], "'-2+3")
+        self.assertEqual(ligne['annees_experience'], '0')
+
+    def test_parametres_invalides(self):
+        """Un type d'export inconnu donne une erreur 400."""
+        self.client.force_authenticate(user=self.admin)
+        self.assertEqual(self.client.get(self.url, {'type': 'xlsx'}).status_code, 400)
+
+
+class RenderersTestCase(TestCase):
+    """Tests des renderers et parsers rapides (backend/renderers.py)."""
+
+    def setUp(self):
+        """Configuration initiale pour les tests."""
+        cache.clear()
+        self.formation = Formation.objects.create(
+            titre="Python pour l'automatisation",
+            description="Description",
+            objectifs=["Automatiser des tâches", "Écrire des scripts"],
+            programme=[{"titre": "Bases", "contenus": ["Variables", "Fonctions"]}],
+            acquis="Acquis",
+            debouche="Débouchés",
+            prix=Decimal('200000.00'),
+            date_debut=datetime.date(2025, 6, 10),
+            lieu="Dakar",
+        )
+
+    def test_sortie_identique_a_drf(self):
+        """Decimal, dates et chaînes paresseuses sont encodés comme par le JSONRenderer de DRF."""
+        data = {
+            'prix': Decimal('12.50'),
+            'date': datetime.date(2025, 6, 10),
+            'cree_le': datetime.datetime(2025, 6, 10, 8, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+            'heure': datetime.time(8, 30, 15, 123456),
+            'libelle': gettext_lazy("Développement"),
+            'liste': [1, 'é', None, {'a': True}],
+            'separateur': 'ligne suivante',
+        }
+        self.assertEqual(OrjsonRenderer().render(data), JSONRenderer().render(data))
+
+    def test_api_navigable_indentee(self):
+        """Avec une indentation demandée, la sortie reste celle de DRF."""
+        data = {'titre': "Formation"}
+        self.assertEqual(
+            OrjsonRenderer().render(data, 'application/json; indent=4'),
+            JSONRenderer().render(data, 'application/json; indent=4'),
+        )
+
+    def test_endpoint_json(self):
+        """Les formations sont rendues en JSON par orjson."""
+        response = self.client.get(reverse('formations:formation-detail', args=[self.formation.pk]))
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(response.json()['programme'][0]['titre'], "Bases")
+        self.assertEqual(response.json()['prix'], "200000.00")
+
+    def test_json_invalide(self):
+        """Un corps JSON invalide lève une ParseError (réponse 400)."""
+        self.assertEqual(OrjsonParser().parse(io.BytesIO('{"titre": "é"}'.encode())), {'titre': "é"})
+        with self.assertRaises(ParseError):
+            OrjsonParser().parse(io.BytesIO(b'{"titre": '))
+
+    @unittest.skipIf(msgpack is None, "msgpack n'est pas installé")
+    def test_negociation_msgpack(self):
+        """Accept: application/msgpack donne les mêmes données qu'en JSON."""
+        url = reverse('formations:formation-detail', args=[self.formation.pk])
+        attendu = json.loads(self.client.get(url).content)
+        response = self.client.get(url, HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        self.assertEqual(msgpack.unpackb(response.content), attendu)
 
-# Create your tests here.
+    @unittest.skipIf(msgpack is None, "msgpack n'est pas installé")
+    def test_msgpack_conversions(self):
+        """Les conversions MessagePack suivent celles du JSON."""
+        data = {'prix': Decimal('12.50'), 'date': datetime.date(2025, 6, 10), 'libelle': gettext_lazy("Web")}
+        self.assertEqual(
+            msgpack.unpackb(MessagePackRenderer().render(data)),
+            json.loads(JSONRenderer().render(data)),
+        )
@@ -1,7 +1,14 @@
 from rest_framework import viewsets
+from rest_framework.decorators import action
 from .models import Formation, InscriptionFormation
-from .serializer import FormationSerializer, InscriptionFormationSerializer
-from backend.permissions import IsAdminOrReadOnly, IsAdminOrCreateOnly
+from .serializer import (
+    ExportInscriptionsSerializer, FormationListSerializer, FormationSerializer, InscriptionFormationSerializer,
+)
+from backend.base_api_views import ChampsPartielsMixin, ListeCompileeMixin
+from backend.cache import CacheReponseMixin
+from backend.exports import reponse_export
+from backend.pagination import PaginationCurseurOptionnelle
+from backend.permissions import IsAdminOrReadOnly, IsAdminOrCreateOnly, IsAdminUser
 from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiExample
 
 @extend_schema_view(
@@ -72,11 +79,22 @@ from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiExam
     partial_update=extend_schema(summary="Mise à jour partielle"),
     destroy=extend_schema(summary="Supprimer une formation"),
 )
-class FormationViewSet(viewsets.ModelViewSet):
+class FormationViewSet(CacheReponseMixin, ChampsPartielsMixin, ListeCompileeMixin, viewsets.ModelViewSet):
     queryset = Formation.objects.all()
     serializer_class = FormationSerializer
     permission_classes = [IsAdminOrReadOnly]
 
+    def get_serializer_class(self):
+        # Liste allégée : résumés à la place du programme et des textes longs
+        if self.action == 'list':
+            return FormationListSerializer
+        return super().get_serializer_class()
+
+    def get_queryset(self):
+        if self.action == 'list':
+            return Formation.objects.sans_textes_longs()
+        return super().get_queryset()
+
 
 
 @extend_schema_view(
@@ -113,3 +131,24 @@ class InscriptionFormationViewSet(viewsets.ModelViewSet):
     queryset = InscriptionFormation.objects.all()
     serializer_class = InscriptionFormationSerializer
     permission_classes = [IsAdminOrCreateOnly]
+    # ?pagination=curseur : pagination à coût constant sur l'id (index de la clé primaire)
+    pagination_class = PaginationCurseurOptionnelle
+    ordre_curseur = ('-id',)
+
+    @extend_schema(
+        summary="Exporter les inscriptions (CSV ou NDJSON)",
+        parameters=[ExportInscriptionsSerializer],
+        responses={(200, 'text/csv'): bytes, (200, 'application/x-ndjson'): bytes},
+    )
+    @action(detail=False, methods=['get'], permission_classes=[IsAdminUser])
+    def export(self, request):
+        """Exporte en flux les inscriptions filtrées (?type=csv ou ?type=ndjson)."""
+        parametres = ExportInscriptionsSerializer(data=request.query_params)
+        parametres.is_valid(raise_exception=True)
+        return reponse_export(
+            request,
+            parametres.filtrer(self.get_queryset()),
+            ExportInscriptionsSerializer.colonnes,
+            parametres.validated_data['type'],
+            'inscriptions-formations',
+        )
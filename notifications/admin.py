@@ -0,0 +1,23 @@
+from django.contrib import admin
+from django.utils import timezone
+from .models import EmailSortant
+
+
+@admin.register(EmailSortant)
+class EmailSortantAdmin(admin.ModelAdmin):
+    """Suivi de la file d'envoi des emails."""
+    list_display = ('sujet', 'statut', 'tentatives', 'prochaine_tentative', 'date_creation', 'date_envoi')
+    list_filter = ('statut', 'date_creation')
+    search_fields = ('sujet', 'destinataires')
+    readonly_fields = ('date_creation', 'date_envoi', 'derniere_erreur')
+    actions = ['relancer']
+
+    def relancer(self, request, queryset):
+        """Remet les emails sélectionnés en file pour un envoi immédiat (sauf ceux en cours d'envoi)."""
+        nombre = queryset.exclude(statut__in=[EmailSortant.STATUT_ENVOYE, EmailSortant.STATUT_EN_COURS]).update(
+            statut=EmailSortant.STATUT_EN_ATTENTE,
+            tentatives=0,
+            prochaine_tentative=timezone.now(),
+        )
+        self.message_user(request, f"{nombre} email(s) remis en file.")
+    relancer.short_description = "Relancer l'envoi des emails sélectionnés"
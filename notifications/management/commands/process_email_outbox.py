@@ -0,0 +1,56 @@
+import time
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+
+from backend.mail import PooledSMTPEmailBackend, sonder_smtp
+from notifications.outbox import envoyer_emails_en_attente
+
+
+class Command(BaseCommand):
+    help = 'Envoie les emails en attente dans la file (worker à lancer en arrière-plan)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Vider la file une seule fois puis quitter (utile en cron)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.EMAIL_OUTBOX_BATCH_SIZE,
+            help='Nombre maximum d\'emails envoyés par connexion SMTP',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=settings.EMAIL_OUTBOX_POLL_INTERVAL,
+            help='Secondes d\'attente lorsque la file est vide',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        interval = options['interval']
+        # La sonde SMTP n'a de sens qu'avec le backend SMTP (pas en console/locmem)
+        sonde_active = isinstance(get_connection(), PooledSMTPEmailBackend)
+        derniere_sonde = 0
+
+        while True:
+            # Sonde périodique : met à jour l'état du disjoncteur partagé
+            if sonde_active and time.monotonic() - derniere_sonde >= settings.SMTP_HEALTH_CHECK_INTERVAL:
+                sonder_smtp()
+                derniere_sonde = time.monotonic()
+
+            # Vider la file tant que des lots complets sont envoyés
+            while True:
+                envoyes, echecs = envoyer_emails_en_attente(taille_lot=batch_size)
+                if envoyes or echecs:
+                    self.stdout.write(f'{envoyes} email(s) envoyé(s), {echecs} échec(s)')
+                if envoyes + echecs < batch_size:
+                    break
+
+            if options['once']:
+                return
+            time.sleep(interval)
@@ -0,0 +1,63 @@
+# Generated by Django 5.2 on 2026-10-18 12:23
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="EmailSortant",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("sujet", models.CharField(max_length=255)),
+                ("message", models.TextField()),
+                ("expediteur", models.CharField(blank=True, max_length=254)),
+                ("destinataires", models.JSONField(default=list)),
+                (
+                    "statut",
+                    models.CharField(
+                        choices=[
+                            ("en_attente", "En attente"),
+                            ("envoye", "Envoyé"),
+                            ("echec", "Échec définitif"),
+                        ],
+                        default="en_attente",
+                        max_length=20,
+                    ),
+                ),
+                ("tentatives", models.PositiveSmallIntegerField(default=0)),
+                (
+                    "prochaine_tentative",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                ("derniere_erreur", models.TextField(blank=True)),
+                ("date_creation", models.DateTimeField(auto_now_add=True)),
+                ("date_envoi", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "verbose_name": "Email sortant",
+                "verbose_name_plural": "Emails sortants",
+                "ordering": ["id"],
+                "indexes": [
+                    models.Index(
+                        fields=["statut", "prochaine_tentative"],
+                        name="notif_email_a_envoyer_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2 on 2026-10-18 13:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="emailsortant",
+            name="statut",
+            field=models.CharField(
+                choices=[
+                    ("en_attente", "En attente"),
+                    ("en_cours", "En cours d'envoi"),
+                    ("envoye", "Envoyé"),
+                    ("echec", "Échec définitif"),
+                ],
+                default="en_attente",
+                max_length=20,
+            ),
+        ),
+    ]
@@ -0,0 +1,59 @@
+"""
+Modèles de la file d'envoi des emails (outbox).
+Les emails applicatifs sont enregistrés ici puis envoyés par un worker
+(`python manage.py process_email_outbox`) en dehors du cycle de requête.
+"""
+from django.db import models
+from django.utils import timezone
+
+
+class EmailSortant(models.Model):
+    """
+    Email en attente d'envoi.
+
+    Attributes:
+        sujet (str): Sujet de l'email
+        message (str): Corps texte de l'email
+        expediteur (str): Adresse d'expédition (DEFAULT_FROM_EMAIL si vide)
+        destinataires (list): Liste des adresses destinataires
+        statut (str): Statut de l'envoi (en_attente, en_cours, envoye, echec)
+        tentatives (int): Nombre de tentatives d'envoi déjà effectuées
+        prochaine_tentative (datetime): Date à partir de laquelle l'email peut être (re)tenté ;
+            pour un email en cours, fin de la réservation par le worker
+        derniere_erreur (str): Message de la dernière erreur SMTP
+        date_creation (datetime): Date de mise en file
+        date_envoi (datetime): Date de l'envoi effectif
+    """
+    STATUT_EN_ATTENTE = 'en_attente'
+    STATUT_EN_COURS = 'en_cours'
+    STATUT_ENVOYE = 'envoye'
+    STATUT_ECHEC = 'echec'
+    STATUT_CHOICES = [
+        (STATUT_EN_ATTENTE, 'En attente'),
+        (STATUT_EN_COURS, "En cours d'envoi"),
+        (STATUT_ENVOYE, 'Envoyé'),
+        (STATUT_ECHEC, 'Échec définitif'),
+    ]
+
+    sujet = models.CharField(max_length=255)
+    message = models.TextField()
+    expediteur = models.CharField(max_length=254, blank=True)
+    destinataires = models.JSONField(default=list)
+    statut = models.CharField(max_length=20, choices=STATUT_CHOICES, default=STATUT_EN_ATTENTE)
+    tentatives = models.PositiveSmallIntegerField(default=0)
+    prochaine_tentative = models.DateTimeField(default=timezone.now)
+    derniere_erreur = models.TextField(blank=True)
+    date_creation = models.DateTimeField(auto_now_add=True)
+    date_envoi = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Email sortant"
+        verbose_name_plural = "Emails sortants"
+        ordering = ['id']  # Ordre d'arrivée dans la file
+        indexes = [
+            # Index utilisé par le worker pour trouver les emails à envoyer
+            models.Index(fields=['statut', 'prochaine_tentative'], name='notif_email_a_envoyer_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.sujet} -> {', '.join(self.destinataires)} ({self.statut})"
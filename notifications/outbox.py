@@ -0,0 +1,209 @@
+"""
+File d'envoi des emails (outbox).
+
+`mettre_en_file` enregistre un email dans la transaction de l'appelant : si la
+transaction est annulée, l'email n'est jamais envoyé, et le worker ne voit que
+les emails réellement validés. `envoyer_emails_en_attente` est appelé par le
+worker pour vider la file avec reprises et backoff exponentiel.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection, send_mail
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from backend.mail import CircuitSMTPOuvert, disjoncteur_smtp
+from .models import EmailSortant
+
+logger = logging.getLogger(__name__)
+
+
+def mettre_en_file(sujet, message, destinataires, expediteur=None):
+    """
+    Ajoute un email à la file d'envoi.
+
+    Doit être appelé dans la transaction qui crée/modifie l'objet métier
+    afin que l'email et l'objet soient validés ensemble.
+    """
+    email = EmailSortant.objects.create(
+        sujet=sujet,
+        message=message,
+        expediteur=expediteur or '',
+        destinataires=list(destinataires),
+    )
+    transaction.on_commit(
+        lambda: logger.info(f"Email #{email.pk} mis en file pour {', '.join(email.destinataires)}")
+    )
+    return email
+
+
+def mettre_en_file_lot(emails):
+    """
+    Ajoute plusieurs emails à la file en une seule requête INSERT.
+
+    Args:
+        emails: itérable de tuples (sujet, message, destinataires, expediteur)
+    """
+    lot = EmailSortant.objects.bulk_create([
+        EmailSortant(
+            sujet=sujet,
+            message=message,
+            expediteur=expediteur or '',
+            destinataires=list(destinataires),
+        )
+        for sujet, message, destinataires, expediteur in emails
+    ])
+    if lot:
+        transaction.on_commit(lambda: logger.info(f"{len(lot)} email(s) mis en file"))
+    return lot
+
+
+def envoyer_ou_differer(sujet, message, destinataires, expediteur=None):
+    """
+    Envoie l'email immédiatement si le serveur SMTP est disponible, sinon
+    (circuit ouvert ou erreur d'envoi) le met en file pour le worker.
+
+    Returns:
+        bool: True si l'email a été envoyé, False s'il a été mis en file
+    """
+    if not disjoncteur_smtp.est_ouvert():
+        try:
+            send_mail(
+                subject=sujet,
+                message=message,
+                from_email=expediteur or settings.DEFAULT_FROM_EMAIL,
+                recipient_list=list(destinataires),
+                fail_silently=False,
+            )
+            return True
+        except Exception as e:
+            logger.error(f"Erreur lors de l'envoi de l'email, mise en file: {e}")
+    mettre_en_file(sujet, message, destinataires, expediteur)
+    return False
+
+
+def calculer_delai_reprise(tentatives):
+    """
+    Retourne le délai avant la prochaine tentative (backoff exponentiel plafonné).
+    """
+    base = settings.EMAIL_OUTBOX_BACKOFF_BASE
+    maximum = settings.EMAIL_OUTBOX_BACKOFF_MAX
+    return timedelta(seconds=min(base * (2 ** max(tentatives - 1, 0)), maximum))
+
+
+def reserver_lot(taille_lot):
+    """
+    Réserve un lot d'emails arrivés à échéance dans une transaction courte.
+
+    Les lignes sont verrouillées (SELECT ... FOR UPDATE SKIP LOCKED sur les bases
+    qui le supportent) le temps de les passer au statut `en_cours` jusqu'à la fin
+    de la réservation (EMAIL_OUTBOX_LEASE) : plusieurs workers peuvent tourner en
+    parallèle, et un lot abandonné (worker arrêté) est repris après ce délai.
+    """
+    maintenant = timezone.now()
+    with transaction.atomic():
+        lot = list(
+            EmailSortant.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(statut=EmailSortant.STATUT_EN_ATTENTE) | Q(statut=EmailSortant.STATUT_EN_COURS),
+                prochaine_tentative__lte=maintenant,
+            )
+            .order_by('prochaine_tentative', 'id')[:taille_lot]
+        )
+        if lot:
+            EmailSortant.objects.filter(pk__in=[email.pk for email in lot]).update(
+                statut=EmailSortant.STATUT_EN_COURS,
+                prochaine_tentative=maintenant + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE),
+            )
+    return lot
+
+
+def _liberer(lot):
+    """Remet en file les emails réservés non traités, sans consommer de tentative."""
+    EmailSortant.objects.filter(pk__in=[email.pk for email in lot]).update(
+        statut=EmailSortant.STATUT_EN_ATTENTE,
+        prochaine_tentative=timezone.now(),
+    )
+
+
+def envoyer_emails_en_attente(taille_lot=None, max_tentatives=None):
+    """
+    Envoie un lot d'emails arrivés à échéance sur une seule connexion SMTP.
+
+    Le lot est réservé (voir `reserver_lot`), puis les emails sont envoyés hors
+    de toute transaction : chaque résultat est enregistré aussitôt par sa propre
+    requête UPDATE. Une erreur en cours de lot ne fait donc pas renvoyer les
+    emails déjà remis.
+
+    Returns:
+        tuple: (nombre d'emails envoyés, nombre d'échecs)
+    """
+    taille_lot = taille_lot or settings.EMAIL_OUTBOX_BATCH_SIZE
+    max_tentatives = max_tentatives or settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+    envoyes = echecs = 0
+
+    if disjoncteur_smtp.est_ouvert():
+        # Serveur SMTP en panne : les emails restent en file sans consommer de tentative
+        return envoyes, echecs
+
+    lot = reserver_lot(taille_lot)
+    if not lot:
+        return envoyes, echecs
+
+    connexion = get_connection(fail_silently=False)
+    try:
+        connexion.open()
+    except CircuitSMTPOuvert:
+        _liberer(lot)
+        return envoyes, echecs
+    except Exception as e:
+        # Serveur injoignable : tout le lot est reporté
+        logger.error(f"Connexion SMTP impossible, {len(lot)} email(s) reporté(s): {e}")
+        for email in lot:
+            _enregistrer_echec(email, e, max_tentatives)
+        return envoyes, len(lot)
+
+    try:
+        for email in lot:
+            message = EmailMessage(
+                subject=email.sujet,
+                body=email.message,
+                from_email=email.expediteur or settings.DEFAULT_FROM_EMAIL,
+                to=email.destinataires,
+                connection=connexion,
+            )
+            try:
+                message.send(fail_silently=False)
+            except Exception as e:
+                logger.error(f"Erreur lors de l'envoi de l'email #{email.pk}: {e}")
+                _enregistrer_echec(email, e, max_tentatives)
+                echecs += 1
+                continue
+
+            EmailSortant.objects.filter(pk=email.pk).update(
+                statut=EmailSortant.STATUT_ENVOYE,
+                tentatives=F('tentatives') + 1,
+                date_envoi=timezone.now(),
+                derniere_erreur='',
+            )
+            envoyes += 1
+    finally:
+        connexion.close()
+
+    return envoyes, echecs
+
+
+def _enregistrer_echec(email, erreur, max_tentatives):
+    """Planifie une nouvelle tentative ou marque l'email en échec définitif."""
+    email.tentatives += 1
+    email.derniere_erreur = str(erreur)
+    email.statut = EmailSortant.STATUT_EN_ATTENTE
+    if email.tentatives >= max_tentatives:
+        email.statut = EmailSortant.STATUT_ECHEC
+        logger.error(f"Email #{email.pk} abandonné après {email.tentatives} tentatives")
+    else:
+        email.prochaine_tentative = timezone.now() + calculer_delai_reprise(email.tentatives)
+    email.save(update_fields=['statut', 'tentatives', 'derniere_erreur', 'prochaine_tentative'])
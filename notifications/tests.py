@@ -0,0 +1,160 @@
+import tempfile
+from datetime import date, timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import Administrateur
+
+from stages.models import OffreStage, DemandeStage
+from .models import EmailSortant
+from .outbox import envoyer_emails_en_attente, calculer_delai_reprise
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class OutboxTestCase(TestCase):
+    """Tests de la file d'envoi des emails."""
+
+    def setUp(self):
+        """Configuration initiale pour les tests."""
+        self.offre = OffreStage.objects.create(
+            titre="Stage Django",
+            description="Description",
+            date_debut=date(2025, 7, 1),
+            duree=12,
+            competences="Python",
+            mission="Développer l'API",
+        )
+
+    def creer_demande(self):
+        return DemandeStage.objects.create(
+            nom="Doe",
+            prenom="John",
+            email="john@example.com",
+            offre=self.offre,
+            cv=SimpleUploadedFile("cv.pdf", b"cv", content_type="application/pdf"),
+            lettre_motivation=SimpleUploadedFile("lm.pdf", b"lm", content_type="application/pdf"),
+        )
+
+    def test_creation_demande_met_email_en_file(self):
+        """La création d'une demande n'envoie rien mais ajoute un email à la file."""
+        self.creer_demande()
+        self.assertEqual(len(mail.outbox), 0)
+        email = EmailSortant.objects.get()
+        self.assertEqual(email.destinataires, ["john@example.com"])
+        self.assertEqual(email.statut, EmailSortant.STATUT_EN_ATTENTE)
+
+    def test_worker_envoie_les_emails(self):
+        """Le worker envoie les emails en attente et les marque comme envoyés."""
+        self.creer_demande()
+        envoyes, echecs = envoyer_emails_en_attente()
+        self.assertEqual((envoyes, echecs), (1, 0))
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].subject, 'Confirmation de votre demande de stage')
+        self.assertEqual(EmailSortant.objects.get().statut, EmailSortant.STATUT_ENVOYE)
+
+    def test_changement_statut_met_email_en_file(self):
+        """Un changement de statut ajoute un second email à la file."""
+        demande = self.creer_demande()
+        demande.statut = 'accepte'
+        # Pas de SELECT préalable : SAVEPOINT, UPDATE, INSERT dans la file, RELEASE
+        with self.assertNumQueries(4):
+            demande.save()
+        self.assertEqual(EmailSortant.objects.count(), 2)
+
+        demande = DemandeStage.objects.select_related('offre').get(pk=demande.pk)
+        demande.nom = "Smith"
+        demande.save()
+        self.assertEqual(EmailSortant.objects.count(), 2)
+
+    def test_changement_statut_groupe(self):
+        """Le changement groupé ne modifie que les demandes concernées et met un email en file par demande."""
+        demandes = [self.creer_demande() for _ in range(3)]
+        EmailSortant.objects.all().delete()
+        demandes[0].statut = 'refuse'
+        demandes[0].save()
+
+        with self.assertNumQueries(5):
+            nombre = DemandeStage.objects.all().changer_statut('refuse')
+        self.assertEqual(nombre, 2)
+        self.assertEqual(DemandeStage.objects.filter(statut='refuse').count(), 3)
+        self.assertEqual(EmailSortant.objects.count(), 3)
+
+        envoyer_emails_en_attente()
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_retour_en_cours_sans_message_de_refus(self):
+        """Remettre une demande en cours n'annonce ni acceptation ni refus."""
+        demande = self.creer_demande()
+        DemandeStage.objects.filter(pk=demande.pk).update(statut='accepte')
+        EmailSortant.objects.all().delete()
+
+        self.assertEqual(DemandeStage.objects.all().changer_statut('en_cours'), 1)
+        message = EmailSortant.objects.get().message
+        self.assertIn("de nouveau en cours de traitement", message)
+        self.assertNotIn("refusée", message)
+
+    def test_api_changement_statut_groupe(self):
+        """L'endpoint bulk_status est réservé aux administrateurs."""
+        demande = self.creer_demande()
+        url = reverse('demandestage-bulk-status')
+        data = {'ids': [demande.pk], 'status': 'accepte'}
+
+        client = APIClient()
+        self.assertEqual(client.post(url, data, format='json').status_code, 401)
+
+        admin_user = User.objects.create_user(username="admin", password="adminpass")
+        Administrateur.objects.create().utilisateurs.add(admin_user)
+        client.force_authenticate(user=admin_user)
+        response = client.post(url, data, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['updated'], 1)
+        demande.refresh_from_db()
+        self.assertEqual(demande.statut, 'accepte')
+
+    @override_settings(EMAIL_OUTBOX_MAX_ATTEMPTS=2)
+    def test_echec_reprise_puis_abandon(self):
+        """Un échec SMTP reporte l'email avec backoff puis l'abandonne."""
+        self.creer_demande()
+        with mock.patch('django.core.mail.EmailMessage.send', side_effect=OSError("SMTP indisponible")):
+            self.assertEqual(envoyer_emails_en_attente(), (0, 1))
+            email = EmailSortant.objects.get()
+            self.assertEqual(email.statut, EmailSortant.STATUT_EN_ATTENTE)
+            self.assertGreater(email.prochaine_tentative, timezone.now())
+
+            EmailSortant.objects.update(prochaine_tentative=timezone.now())
+            envoyer_emails_en_attente()
+        email.refresh_from_db()
+        self.assertEqual(email.statut, EmailSortant.STATUT_ECHEC)
+        self.assertEqual(email.tentatives, 2)
+
+    def test_interruption_en_cours_de_lot(self):
+        """Un email déjà remis reste envoyé si le worker s'arrête en cours de lot ; le reste est repris."""
+        self.creer_demande()
+        self.creer_demande()
+        with mock.patch('django.core.mail.EmailMessage.send', side_effect=[1, KeyboardInterrupt]):
+            with self.assertRaises(KeyboardInterrupt):
+                envoyer_emails_en_attente()
+        premier, second = EmailSortant.objects.order_by('id')
+        self.assertEqual(premier.statut, EmailSortant.STATUT_ENVOYE)
+        self.assertEqual(second.statut, EmailSortant.STATUT_EN_COURS)
+
+        # Réservé : pas repris avant la fin de la réservation
+        self.assertEqual(envoyer_emails_en_attente(), (0, 0))
+        EmailSortant.objects.filter(pk=second.pk).update(prochaine_tentative=timezone.now())
+        self.assertEqual(envoyer_emails_en_attente(), (1, 0))
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertFalse(EmailSortant.objects.exclude(statut=EmailSortant.STATUT_ENVOYE).exists())
+
+    @override_settings(EMAIL_OUTBOX_BACKOFF_BASE=30, EMAIL_OUTBOX_BACKOFF_MAX=100)
+    def test_backoff_exponentiel_plafonne(self):
+        """Le délai double à chaque tentative sans dépasser le maximum."""
+        self.assertEqual(calculer_delai_reprise(1), timedelta(seconds=30))
+        self.assertEqual(calculer_delai_reprise(2), timedelta(seconds=60))
+        self.assertEqual(calculer_delai_reprise(5), timedelta(seconds=100))
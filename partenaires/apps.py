@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class PartenairesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "partenaires"
+
+    def ready(self):
+        import partenaires.signals
@@ -1,7 +1,10 @@
 from rest_framework import serializers
+from backend.media import MediaUrlMixin
+from backend.serializers import ListSerializerCompile
 from .models import Partenaire
 
-class PartenaireSerializer(serializers.ModelSerializer):
+class PartenaireSerializer(MediaUrlMixin, serializers.ModelSerializer):
     class Meta:
         model = Partenaire
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+        list_serializer_class = ListSerializerCompile
\ No newline at end of file
@@ -0,0 +1,6 @@
+from backend.cache import suivre_versions
+from backend.catalogue import suivre_catalogue
+from .models import Partenaire
+
+suivre_versions(Partenaire)
+suivre_catalogue(Partenaire, 'partenaires')
@@ -1,9 +1,11 @@
 from rest_framework import generics
+from backend.base_api_views import ChampsPartielsMixin, ListeCompileeMixin
+from backend.cache import CacheReponseMixin
 from backend.permissions import IsAdminOrReadOnly
 from .models import Partenaire
 from .serializers import PartenaireSerializer
 
-class PartenaireListCreateView(generics.ListCreateAPIView):
+class PartenaireListCreateView(CacheReponseMixin, ChampsPartielsMixin, ListeCompileeMixin, generics.ListCreateAPIView):
     """
     Vue pour lister et créer des partenaires.
     - READ (list): Public (AllowAny)
@@ -13,7 +15,7 @@ class PartenaireListCreateView(generics.ListCreateAPIView):
     serializer_class = PartenaireSerializer
     permission_classes = [IsAdminOrReadOnly]
 
-class PartenaireRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
+class PartenaireRetrieveUpdateDestroyView(CacheReponseMixin, ChampsPartielsMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Vue pour récupérer, modifier et supprimer un partenaire.
     - READ (retrieve): Public (AllowAny)
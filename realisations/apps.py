@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class RealisationsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "realisations"
+
+    def ready(self):
+        import realisations.signals
@@ -0,0 +1,57 @@
+# Generated by Django 5.2 on 2026-10-18 12:39
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def initialiser_compteurs(apps, schema_editor):
+    # Compteurs des réalisations existantes ; ensuite tenus à jour par les signaux
+    Realisation = apps.get_model("realisations", "Realisation")
+    CompteurCategorie = apps.get_model("realisations", "CompteurCategorie")
+    comptes = Realisation.objects.order_by().values("categorie").annotate(nombre=Count("id"))
+    CompteurCategorie.objects.bulk_create(
+        [CompteurCategorie(categorie=c["categorie"], nombre=c["nombre"]) for c in comptes]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("realisations", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CompteurCategorie",
+            fields=[
+                (
+                    "categorie",
+                    models.CharField(
+                        choices=[
+                            ("DEV_WEB", "Développement web"),
+                            ("DEV_MOBILE", "Développement mobile"),
+                            ("CYBERSECURITE", "Cybersécurité"),
+                            ("RESEAU_INFRA", "Réseau et Infrastructure"),
+                            ("IA", "Intelligence Artificielle"),
+                        ],
+                        max_length=20,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="Catégorie",
+                    ),
+                ),
+                (
+                    "nombre",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Nombre de réalisations"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Compteur de catégorie",
+                "verbose_name_plural": "Compteurs de catégories",
+                "ordering": ["categorie"],
+            },
+        ),
+        migrations.RunPython(initialiser_compteurs, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2 on 2026-10-18 12:54
+
+from django.db import migrations, models
+
+
+def creer_extrait(texte, longueur=200):
+    # Copie de realisations.models.creer_extrait à la date de la migration
+    texte = " ".join((texte or "").split())
+    if len(texte) <= longueur:
+        return texte
+    coupe = texte[: longueur - 1]
+    if texte[longueur - 1] != " " and " " in coupe:
+        coupe = coupe.rsplit(" ", 1)[0]
+    return coupe.rstrip(" ,;:.") + "…"
+
+
+def remplir_extraits(apps, schema_editor):
+    # Extraits des réalisations existantes ; ensuite tenus à jour par Realisation.save()
+    Realisation = apps.get_model("realisations", "Realisation")
+    realisations = list(Realisation.objects.only("id", "description"))
+    for realisation in realisations:
+        realisation.extrait = creer_extrait(realisation.description)
+    Realisation.objects.bulk_update(realisations, ["extrait"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("realisations", "0002_compteurcategorie"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="realisation",
+            name="extrait",
+            field=models.CharField(
+                blank=True, editable=False, max_length=255, verbose_name="Extrait"
+            ),
+        ),
+        migrations.RunPython(remplir_extraits, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,9 @@
 from django.db import models
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
 from django.utils.translation import gettext_lazy as _
+from backend.cache import modifier_version
+from backend.mixins import SuiviChangementsMixin, TextesLongsQuerySet
 
 class Categorie(models.TextChoices):
     """Catégories disponibles pour les réalisations."""
@@ -9,12 +13,32 @@ class Categorie(models.TextChoices):
     RESEAU_INFRA = 'RESEAU_INFRA', _('Réseau et Infrastructure')
     IA = 'IA', _('Intelligence Artificielle')
 
-class Realisation(models.Model):
+# Longueur maximale de l'extrait de la description affiché dans les listes
+LONGUEUR_EXTRAIT = 200
+
+
+def creer_extrait(texte, longueur=LONGUEUR_EXTRAIT):
+    """
+    Retourne le début de `texte` (espaces normalisés), coupé à la fin d'un mot
+    et suivi de « … » s'il dépasse `longueur` caractères.
+    """
+    texte = ' '.join((texte or '').split())
+    if len(texte) <= longueur:
+        return texte
+    coupe = texte[:longueur - 1]
+    if texte[longueur - 1] != ' ' and ' ' in coupe:
+        coupe = coupe.rsplit(' ', 1)[0]
+    return coupe.rstrip(' ,;:.') + '…'
+
+
+class Realisation(SuiviChangementsMixin, models.Model):
     """
     Modèle représentant une réalisation (projet réalisé) avec toutes ses informations.
     """
     nomProjet = models.CharField(_('Nom du projet'), max_length=255, help_text=_('Entrez le nom du projet'))
     description = models.TextField(_('Description'), help_text=_('Description détaillée du projet'))
+    # Tenu à jour dans save() ; les listes l'affichent à la place de la description complète
+    extrait = models.CharField(_('Extrait'), max_length=255, blank=True, editable=False)
     categorie = models.CharField(
         _('Catégorie'), 
         max_length=20, 
@@ -32,6 +56,8 @@ class Realisation(models.Model):
     image2 = models.ImageField(_('Image secondaire 1'), upload_to='realisations/', blank=True, null=True, help_text=_('Téléchargez une image secondaire'))
     image3 = models.ImageField(_('Image secondaire 2'), upload_to='realisations/', blank=True, null=True, help_text=_('Téléchargez une autre image secondaire'))
 
+    objects = TextesLongsQuerySet.as_manager()
+
     class Meta:
         verbose_name = _('Réalisation')
         verbose_name_plural = _('Réalisations')
@@ -41,9 +67,64 @@ class Realisation(models.Model):
         """Représentation textuelle d'une réalisation."""
         return f"{self.nomProjet} ({self.get_categorie_display()})"
 
+    def save(self, *args, **kwargs):
+        """
+        Met à jour l'extrait lorsque la description change.
+        Les mises à jour en masse (QuerySet.update()) ne passent pas par ici.
+        """
+        update_fields = kwargs.get('update_fields')
+        description_enregistree = update_fields is None or 'description' in update_fields
+        # Description différée et non modifiée : l'extrait est déjà à jour
+        if description_enregistree and 'description' in self.__dict__ \
+                and (self.has_changed('description') or not self.extrait):
+            self.extrait = creer_extrait(self.description)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'extrait'}
+        super().save(*args, **kwargs)
+
     @property
     def image_principale(self):
         """Renvoie la première image disponible, ou None si aucune n'est définie."""
         if self.image1:
             return self.image1
-        return None
\ No newline at end of file
+        return None
+
+class CompteurCategorie(models.Model):
+    """
+    Nombre de réalisations par catégorie, tenu à jour par les signaux de
+    `realisations.signals` pour éviter un GROUP BY à chaque affichage des filtres.
+    """
+    categorie = models.CharField(_('Catégorie'), max_length=20, choices=Categorie.choices, primary_key=True)
+    nombre = models.PositiveIntegerField(_('Nombre de réalisations'), default=0)
+
+    class Meta:
+        verbose_name = _('Compteur de catégorie')
+        verbose_name_plural = _('Compteurs de catégories')
+        ordering = ['categorie']
+
+    def __str__(self):
+        return f"{self.categorie} : {self.nombre}"
+
+    @classmethod
+    def ajuster(cls, categorie, delta):
+        """Ajoute `delta` (positif ou négatif) au compteur de `categorie`."""
+        modifies = cls.objects.filter(categorie=categorie).update(nombre=Greatest(F('nombre') + delta, 0))
+        if not modifies:
+            compteur, created = cls.objects.get_or_create(categorie=categorie, defaults={'nombre': max(delta, 0)})
+            if not created:
+                cls.ajuster(categorie, delta)
+
+    @classmethod
+    def recalculer(cls):
+        """
+        Recalcule tous les compteurs depuis la table des réalisations.
+        À appeler après une modification en masse (QuerySet.update()) qui n'envoie pas de signaux.
+        """
+        comptes = dict(
+            Realisation.objects.order_by().values_list('categorie').annotate(nombre=Count('id'))
+        )
+        cls.objects.exclude(categorie__in=comptes).delete()
+        for categorie, nombre in comptes.items():
+            cls.objects.update_or_create(categorie=categorie, defaults={'nombre': nombre})
+        # Invalide la liste des catégories en cache (realisations.views.liste_categories)
+        modifier_version(Realisation)
@@ -1,19 +1,26 @@
 from rest_framework import serializers
+from backend.media import MediaUrlMixin
+from backend.serializers import ListSerializerCompile, libelle_choix
 from .models import Realisation, Categorie
 
-class RealisationListSerializer(serializers.ModelSerializer):
+class RealisationListSerializer(MediaUrlMixin, serializers.ModelSerializer):
     """
     Sérialiseur pour l'affichage de la liste des réalisations.
     Affiche des informations réduites: nom du projet, description, catégorie, et une seule image.
+    La description est remplacée par son extrait (Realisation.extrait).
     """
+    description = serializers.CharField(source='extrait', read_only=True)
     categorie_display = serializers.CharField(source='get_categorie_display', read_only=True)
+
+    plan_compile = {'categorie_display': libelle_choix('categorie')}
     
     class Meta:
         model = Realisation
         fields = ['id', 'nomProjet', 'description', 'categorie', 'categorie_display', 'image1']
+        list_serializer_class = ListSerializerCompile
 
 
-class RealisationDetailSerializer(serializers.ModelSerializer):
+class RealisationDetailSerializer(MediaUrlMixin, serializers.ModelSerializer):
     """
     Sérialiseur pour l'affichage détaillé d'une réalisation.
     Affiche toutes les informations du projet, y compris les trois images si elles existent.
@@ -25,7 +32,7 @@ class RealisationDetailSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
-class RealisationCreateUpdateSerializer(serializers.ModelSerializer):
+class RealisationCreateUpdateSerializer(MediaUrlMixin, serializers.ModelSerializer):
     """
     Sérialiseur pour la création et la mise à jour d'une réalisation.
     Inclut la validation des champs requis.
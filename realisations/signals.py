@@ -0,0 +1,35 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from backend.cache import suivre_versions
+from backend.catalogue import suivre_catalogue
+from .models import CompteurCategorie, Realisation
+
+@receiver(post_save, sender=Realisation)
+def realisation_enregistree(sender, instance, created, update_fields=None, **kwargs):
+    # Les receveurs de post_save voient encore la catégorie chargée (SuiviChangementsMixin)
+    if created:
+        CompteurCategorie.ajuster(instance.categorie, 1)
+        return
+    if update_fields is not None and 'categorie' not in update_fields:
+        return
+    if not instance.has_changed('categorie'):
+        return
+    ancienne = instance.valeur_initiale('categorie')
+    if ancienne is None:
+        # Instance construite sans chargement depuis la base : ancienne catégorie inconnue
+        CompteurCategorie.recalculer()
+        return
+    CompteurCategorie.ajuster(ancienne, -1)
+    CompteurCategorie.ajuster(instance.categorie, 1)
+
+
+@receiver(post_delete, sender=Realisation)
+def realisation_supprimee(sender, instance, **kwargs):
+    CompteurCategorie.ajuster(instance.valeur_initiale('categorie', instance.categorie), -1)
+
+
+# Connectés après les compteurs : hors transaction, une requête concurrente qui
+# lit la nouvelle version voit déjà les compteurs à jour.
+suivre_versions(Realisation)
+suivre_catalogue(Realisation, 'realisations', 'categories')
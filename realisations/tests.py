@@ -3,14 +3,21 @@ from rest_framework.test import APITestCase
 from rest_framework import status
 from django.contrib.auth.models import User
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import RequestFactory, override_settings
 from django.urls import reverse
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from accounts.models import Administrateur
 from datetime import date
 import tempfile
 import os
+from unittest import mock
 from PIL import Image
 
-from .models import Realisation, Categorie
+from backend.serializers import colonnes_lecture
+from .models import Realisation, Categorie, CompteurCategorie, LONGUEUR_EXTRAIT, creer_extrait
+from .serializers import RealisationListSerializer
 
 class RealisationModelTestCase(TestCase):
     """Tests pour le modèle Realisation."""
@@ -178,3 +185,184 @@ class RealisationsAPITestCase(APITestCase):
         categories_from_response = {cat['id'] for cat in response.data['categories']}
         categories_from_model = set(dict(Categorie.choices).keys())
         self.assertTrue(categories_from_model.issubset(categories_from_response))
+
+
+class CompteurCategorieTestCase(TestCase):
+    """Tests des compteurs de réalisations par catégorie."""
+
+    def creer(self, categorie):
+        return Realisation.objects.create(
+            nomProjet="Projet",
+            description="Description",
+            categorie=categorie,
+            dateDebut=date(2023, 1, 1),
+            mission="Mission",
+        )
+
+    def comptes(self):
+        return dict(CompteurCategorie.objects.filter(nombre__gt=0).values_list('categorie', 'nombre'))
+
+    def test_compteurs_maintenus_par_signaux(self):
+        """Création, changement de catégorie et suppression mettent à jour les compteurs."""
+        self.creer(Categorie.DEV_WEB)
+        self.creer(Categorie.DEV_WEB)
+        self.assertEqual(self.comptes(), {Categorie.DEV_WEB: 2})
+
+        realisation = Realisation.objects.first()
+        realisation.categorie = Categorie.IA
+        realisation.save()
+        self.assertEqual(self.comptes(), {Categorie.DEV_WEB: 1, Categorie.IA: 1})
+
+        realisation.nomProjet = "Renommé"
+        realisation.save()
+        self.assertEqual(self.comptes(), {Categorie.DEV_WEB: 1, Categorie.IA: 1})
+
+        Realisation.objects.filter(categorie=Categorie.DEV_WEB).delete()
+        self.assertEqual(self.comptes(), {Categorie.IA: 1})
+
+    def test_liste_categories_sans_agregation(self):
+        """L'endpoint lit les compteurs en une seule requête."""
+        self.creer(Categorie.CYBERSECURITE)
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('realisations:categorie-list'))
+        categories = response.data['categories']
+        self.assertEqual(categories[0], {'id': 'CYBERSECURITE', 'name': 'Cybersécurité', 'count': 1})
+        self.assertEqual(len(categories), len(Categorie.choices))
+
+    def test_version_renouvelee_apres_les_compteurs(self):
+        """Quand la version du cache change, les compteurs sont déjà à jour."""
+        comptes_vus = []
+        with mock.patch('backend.cache.modifier_version', side_effect=lambda *models: comptes_vus.append(self.comptes())):
+            realisation = self.creer(Categorie.DEV_WEB)
+            realisation.delete()
+        self.assertEqual(comptes_vus, [{Categorie.DEV_WEB: 1}, {}])
+
+    def test_recalculer(self):
+        """recalculer() corrige les compteurs après une mise à jour en masse."""
+        self.creer(Categorie.DEV_WEB)
+        Realisation.objects.update(categorie=Categorie.DEV_MOBILE)
+        CompteurCategorie.recalculer()
+        self.assertEqual(self.comptes(), {Categorie.DEV_MOBILE: 1})
+
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ListSerializerCompileTestCase(TestCase):
+    """Tests de la sérialisation compilée de la liste des réalisations."""
+
+    def setUp(self):
+        """Configuration initiale pour les tests."""
+        Realisation.objects.create(
+            nomProjet="Projet",
+            description="Description",
+            categorie=Categorie.IA,
+            dateDebut=date(2023, 1, 1),
+            mission="Mission",
+            image1=SimpleUploadedFile('projet.jpg', b'contenu', content_type='image/jpeg'),
+        )
+        Realisation.objects.create(
+            nomProjet="Sans image",
+            description="Description",
+            categorie=Categorie.DEV_WEB,
+            dateDebut=date(2022, 1, 1),
+            mission="Mission",
+        )
+        self.request = RequestFactory().get('/api/realisations/')
+
+    def test_meme_resultat_que_le_model_serializer(self):
+        """La sérialisation compilée donne le même résultat que la sérialisation standard."""
+        contexte = {'request': self.request}
+        attendu = [
+            RealisationListSerializer(realisation, context=contexte).data
+            for realisation in Realisation.objects.all()
+        ]
+        with self.assertNumQueries(1):
+            compile = RealisationListSerializer(Realisation.objects.all(), many=True, context=contexte).data
+        self.assertEqual(compile, attendu)
+        self.assertTrue(compile[0]['image1'].startswith('http://testserver/'))
+
+    def test_colonnes_lues(self):
+        """Seules les colonnes utiles sont lues."""
+        self.assertEqual(
+            colonnes_lecture(RealisationListSerializer),
+            ['id', 'nomProjet', 'extrait', 'categorie', 'image1'],
+        )
+
+
+class ChampsPartielsTestCase(TestCase):
+    """Tests de la sélection des champs (?fields=, ?omit=)."""
+
+    def setUp(self):
+        """Configuration initiale pour les tests."""
+        cache.clear()
+        self.realisation = Realisation.objects.create(
+            nomProjet="Site vitrine",
+            description="Description",
+            categorie=Categorie.DEV_WEB,
+            dateDebut=date(2023, 1, 1),
+            mission="Mission",
+        )
+
+    def test_liste_fields(self):
+        """?fields= ne renvoie que les champs demandés et ne lit que leurs colonnes."""
+        with CaptureQueriesContext(connection) as requetes:
+            response = self.client.get(reverse('realisations:list'), {'fields': 'id,nomProjet'})
+        self.assertEqual(response.json()['results'], [{'id': self.realisation.id, 'nomProjet': "Site vitrine"}])
+        select = requetes.captured_queries[-1]['sql']
+        self.assertIn('"nomProjet"', select)
+        self.assertNotIn('"description"', select)
+
+    def test_detail_omit(self):
+        """?omit= retire les champs et diffère leurs colonnes."""
+        url = reverse('realisations:detail', args=[self.realisation.id])
+        with CaptureQueriesContext(connection) as requetes:
+            response = self.client.get(url, {'omit': 'description,mission'})
+        self.assertNotIn('description', response.json())
+        self.assertEqual(response.json()['categorie_display'], "Développement web")
+        self.assertNotIn('"mission"', requetes.captured_queries[-1]['sql'])
+
+    def test_champ_inconnu(self):
+        """Un champ inconnu donne une erreur 400."""
+        response = self.client.get(reverse('realisations:list'), {'fields': 'id,inconnu'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('fields', response.json())
+
+
+class ExtraitTestCase(TestCase):
+    """Tests de l'extrait de la description (Realisation.extrait)."""
+
+    def creer_realisation(self, description):
+        return Realisation.objects.create(
+            nomProjet="Projet",
+            description=description,
+            categorie=Categorie.DEV_WEB,
+            dateDebut=date(2023, 1, 1),
+            mission="Mission " * 100,
+        )
+
+    def test_creer_extrait(self):
+        """Le texte est coupé à la fin d'un mot, espaces normalisés."""
+        self.assertEqual(creer_extrait("Court\n  texte"), "Court texte")
+        self.assertEqual(creer_extrait("Un site vitrine moderne", longueur=15), "Un site…")
+        self.assertLessEqual(len(creer_extrait("mot " * 200)), LONGUEUR_EXTRAIT)
+
+    def test_synchronise_a_l_enregistrement(self):
+        """L'extrait suit la description, y compris avec update_fields."""
+        realisation = self.creer_realisation("Première description")
+        self.assertEqual(realisation.extrait, "Première description")
+
+        realisation.description = "Nouvelle description"
+        realisation.save(update_fields=['description'])
+        realisation.refresh_from_db()
+        self.assertEqual(realisation.extrait, "Nouvelle description")
+
+    def test_liste_sans_textes_longs(self):
+        """La liste renvoie l'extrait et ne lit pas les champs texte longs."""
+        cache.clear()
+        self.creer_realisation("Description " * 100)
+        with CaptureQueriesContext(connection) as requetes:
+            response = self.client.get(reverse('realisations:list'))
+        self.assertLessEqual(len(response.json()['results'][0]['description']), LONGUEUR_EXTRAIT)
+        select = requetes.captured_queries[-1]['sql']
+        self.assertNotIn('"mission"', select)
+        self.assertNotIn('"description"', select)
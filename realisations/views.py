@@ -2,11 +2,13 @@ from rest_framework import generics, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
 from rest_framework.response import Response
-from django.db.models import Count
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiResponse, extend_schema_view
+from django.conf import settings
+from backend.base_api_views import ChampsPartielsMixin, ListeCompileeMixin
+from backend.cache import CacheReponseMixin, obtenir_ou_calculer, version_modele
 from backend.permissions import IsAdminUser as CustomIsAdminUser
 
-from .models import Realisation, Categorie
+from .models import Realisation, Categorie, CompteurCategorie
 from .serializers import (
     RealisationListSerializer,
     RealisationDetailSerializer,
@@ -14,8 +16,11 @@ from .serializers import (
     CategorieListResponseSerializer
 )
 
+# Libellés des catégories, construits une seule fois au chargement du module
+LIBELLES_CATEGORIES = dict(Categorie.choices)
 
-class RealisationListView(generics.ListAPIView):
+
+class RealisationListView(CacheReponseMixin, ChampsPartielsMixin, ListeCompileeMixin, generics.ListAPIView):
     """
     Vue pour lister toutes les réalisations avec possibilité de filtrer par catégorie.
     """
@@ -26,18 +31,19 @@ class RealisationListView(generics.ListAPIView):
         """
         Filtre les réalisations par catégorie si un paramètre 'categorie' est fourni.
         """
-        queryset = Realisation.objects.all()
+        # La liste n'affiche que l'extrait de la description
+        queryset = Realisation.objects.sans_textes_longs()
         categorie = self.request.query_params.get('categorie')
         
         if categorie:
             # Vérifier si la catégorie est valide
-            if categorie in dict(Categorie.choices):
+            if categorie in LIBELLES_CATEGORIES:
                 queryset = queryset.filter(categorie=categorie)
         
         return queryset
 
 
-class RealisationDetailView(generics.RetrieveAPIView):
+class RealisationDetailView(CacheReponseMixin, ChampsPartielsMixin, generics.RetrieveAPIView):
     """
     Vue pour afficher les détails d'une réalisation spécifique.
     """
@@ -87,31 +93,32 @@ def liste_categories(request):
     """
     Vue pour récupérer la liste des catégories disponibles et leur nombre de réalisations.
     Cette vue est utilisée pour le système de filtre sur la page des réalisations.
+    Les nombres sont lus dans la table CompteurCategorie, tenue à jour par signaux,
+    et le résultat est mis en cache (un seul recalcul à la fois, en arrière-plan).
     """
-    # Récupère les catégories distinctes qui ont au moins une réalisation
-    categories = Realisation.objects.values('categorie').annotate(count=Count('id')).order_by('categorie')
-    
-    # Prépare la réponse
-    formatted_categories = []
-    for cat in categories:
-        cat_value = cat['categorie']
-        cat_name = dict(Categorie.choices).get(cat_value, cat_value)
-        formatted_categories.append({
-            'id': cat_value,
-            'name': cat_name,
-            'count': cat['count']
-        })
-    
-    # Ajoute également toutes les catégories possibles même si elles n'ont pas de réalisations
-    all_categories = dict(Categorie.choices)
-    existing_cats = {cat['id'] for cat in formatted_categories}
-    
-    for cat_value, cat_name in all_categories.items():
-        if cat_value not in existing_cats:
-            formatted_categories.append({
-                'id': cat_value,
-                'name': cat_name,
-                'count': 0
-            })
-    
-    return Response({'categories': formatted_categories})
+    categories = obtenir_ou_calculer(
+        'realisations:categories',
+        calculer_categories,
+        version=version_modele(Realisation),
+        duree_fraiche=settings.API_CACHE_TIMEOUT,
+        arriere_plan=True,
+    )
+    return Response({'categories': categories})
+
+
+def calculer_categories():
+    """
+    Retourne les catégories avec leur nombre de réalisations : celles qui ont au
+    moins une réalisation, puis toutes les autres catégories possibles.
+    """
+    comptes = dict(CompteurCategorie.objects.filter(nombre__gt=0).values_list('categorie', 'nombre'))
+    formatted_categories = [
+        {'id': cat_value, 'name': str(LIBELLES_CATEGORIES.get(cat_value, cat_value)), 'count': comptes[cat_value]}
+        for cat_value in sorted(comptes)
+    ]
+    formatted_categories.extend(
+        {'id': cat_value, 'name': str(cat_name), 'count': 0}
+        for cat_value, cat_name in LIBELLES_CATEGORIES.items()
+        if cat_value not in comptes
+    )
+    return formatted_categories
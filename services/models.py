@@ -1,7 +1,8 @@
 from django.db import models
 from django.utils.translation import gettext_lazy as _
+from backend.mixins import SuiviChangementsMixin
 
-class Service(models.Model):
+class Service(SuiviChangementsMixin, models.Model):
     """
     Modèle représentant un service proposé par l'entreprise.
     """
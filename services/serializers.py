@@ -1,4 +1,6 @@
 from rest_framework import serializers
+from backend.media import MediaUrlMixin, url_media
+from backend.serializers import ListSerializerCompile, url_fichier
 from .models import Service
 
 class DetailSerializer(serializers.Serializer):
@@ -6,7 +8,7 @@ class DetailSerializer(serializers.Serializer):
     specificite = serializers.CharField(max_length=255)
     detail = serializers.CharField()
 
-class ServiceSerializer(serializers.ModelSerializer):
+class ServiceSerializer(MediaUrlMixin, serializers.ModelSerializer):
     """Serializer pour le modèle Service."""
     details = DetailSerializer(many=True, required=False)
     image_principale = serializers.SerializerMethodField()
@@ -17,11 +19,7 @@ class ServiceSerializer(serializers.ModelSerializer):
 
     def get_image_principale(self, obj):
         """Retourne l'URL de l'image principale."""
-        if obj.image_principale:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(obj.image_principale.url)
-        return None
+        return url_media(obj.image_principale, self.context.get('request'))
 
     def validate_details(self, value):
         """Validation des détails."""
@@ -47,19 +45,18 @@ class ServiceListSerializer(serializers.ModelSerializer):
     """Serializer pour la liste des services (vue simplifiée)."""
     image_principale = serializers.SerializerMethodField()
 
+    plan_compile = {'image_principale': url_fichier('image')}
+
     class Meta:
         model = Service
         fields = ('id', 'titre', 'sous_titre', 'image_principale')
+        list_serializer_class = ListSerializerCompile
 
     def get_image_principale(self, obj):
         """Retourne l'URL de l'image principale."""
-        if obj.image_principale:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(obj.image_principale.url)
-        return None
+        return url_media(obj.image_principale, self.context.get('request'))
 
-class ServiceCreateUpdateSerializer(serializers.ModelSerializer):
+class ServiceCreateUpdateSerializer(MediaUrlMixin, serializers.ModelSerializer):
     """Serializer pour la création et mise à jour des services."""
     details = DetailSerializer(many=True, required=False)
 
@@ -0,0 +1,6 @@
+from backend.cache import suivre_versions
+from backend.catalogue import suivre_catalogue
+from .models import Service
+
+suivre_versions(Service)
+suivre_catalogue(Service, 'services')
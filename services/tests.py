@@ -1,3 +1,308 @@
-from django.test import TestCase
+import gzip
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from backend.cache import lire_ou_calculer, obtenir_ou_calculer
+from backend.catalogue import (
+    ENDPOINTS_CATALOGUE, NOM_VERROU, dossier_catalogue, lire_manifeste, publier_catalogue,
+)
+from .models import Service
+
+
+class SuiviChangementsTestCase(TestCase):
+    """Tests du suivi des modifications de champs (SuiviChangementsMixin)."""
+
+    def setUp(self):
+        """Configuration initiale pour les tests."""
+        Service.objects.create(
+            titre="Développement Web",
+            sous_titre="Sites modernes",
+            description="Description",
+            details=[{"specificite": "React", "detail": "Front-end"}],
+        )
+        self.service = Service.objects.get()
+
+    def test_aucun_changement_apres_chargement(self):
+        """Une instance fraîchement chargée n'a aucun champ modifié."""
+        self.assertFalse(self.service.has_changed('titre'))
+        self.assertEqual(self.service.champs_modifies(), [])
+
+    def test_changement_detecte_sans_requete(self):
+        """La modification d'un champ est détectée sans requête SQL."""
+        self.service.titre = "Cybersécurité"
+        self.service.details[0]["detail"] = "Back-end"
+        with self.assertNumQueries(0):
+            self.assertTrue(self.service.has_changed('titre'))
+            self.assertTrue(self.service.has_changed('details'))
+            self.assertEqual(self.service.valeur_initiale('titre'), "Développement Web")
+
+    def test_instantane_mis_a_jour_apres_save(self):
+        """Après save(), les nouvelles valeurs deviennent les valeurs de référence."""
+        self.service.titre = "Cybersécurité"
+        self.service.save()
+        self.assertFalse(self.service.has_changed('titre'))
+
+    def test_champ_differe(self):
+        """Un champ différé non lu n'est pas considéré comme modifié."""
+        service = Service.objects.only('id').get()
+        self.assertFalse(service.has_changed('titre'))
+        service.sous_titre = "Autre"
+        service.titre  # Chargement du champ différé
+        self.assertTrue(service.has_changed('sous_titre'))
+        self.assertFalse(service.has_changed('titre'))
+
+
+class CacheReponseTestCase(TestCase):
+    """Tests du cache des réponses publiques (backend.cache.CacheReponseMixin)."""
+
+    def setUp(self):
+        """Configuration initiale pour les tests."""
+        cache.clear()
+        self.service = Service.objects.create(
+            titre="Développement Web",
+            sous_titre="Sites modernes",
+            description="Description",
+        )
+
+    def test_reponse_servie_depuis_le_cache(self):
+        """Le second appel ne fait aucune requête SQL."""
+        self.client.get(reverse('services:service-list'))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('services:service-list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['titre'], "Développement Web")
+
+    def test_invalidation_apres_modification(self):
+        """Une modification ou une suppression rend la réponse en cache obsolète."""
+        self.client.get(reverse('services:service-detail', args=[self.service.pk]))
+        self.service.titre = "Cybersécurité"
+        self.service.save()
+        response = self.client.get(reverse('services:service-detail', args=[self.service.pk]))
+        self.assertEqual(response.json()['titre'], "Cybersécurité")
+
+        self.service.delete()
+        response = self.client.get(reverse('services:service-list'))
+        self.assertEqual(response.json()['count'], 0)
+
+    def test_parametres_dans_la_cle(self):
+        """Des paramètres de requête différents donnent des entrées distinctes."""
+        self.client.get(reverse('services:service-list'))
+        with self.assertNumQueries(2):
+            self.client.get(reverse('services:service-list'), {'page': 1})
+
+
+class ReponseConditionnelleTestCase(TestCase):
+    """Tests des requêtes conditionnelles (ETag / Last-Modified) sur les réponses publiques."""
+
+    def setUp(self):
+        """Configuration initiale pour les tests."""
+        cache.clear()
+        self.service = Service.objects.create(
+            titre="Développement Web",
+            sous_titre="Sites modernes",
+            description="Description",
+        )
+
+    def test_requete_conditionnelle_etag(self):
+        """Un ETag à jour donne une réponse 304 sans requête SQL."""
+        response = self.client.get(reverse('services:service-list'))
+        etag = response['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('services:service-list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        self.service.titre = "Cybersécurité"
+        self.service.save()
+        response = self.client.get(reverse('services:service-list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_requete_conditionnelle_last_modified(self):
+        """If-Modified-Since postérieur à la dernière modification donne une réponse 304."""
+        response = self.client.get(reverse('services:service-detail', args=[self.service.pk]))
+        response = self.client.get(
+            reverse('services:service-detail', args=[self.service.pk]),
+            HTTP_IF_MODIFIED_SINCE=response['Last-Modified'],
+        )
+        self.assertEqual(response.status_code, 304)
+
+
+class CatalogueStatiqueTestCase(TestCase):
+    """Tests des instantanés statiques du catalogue (backend.catalogue)."""
+
+    def setUp(self):
+        """Configuration initiale pour les tests."""
+        cache.clear()
+        dossier = tempfile.TemporaryDirectory()
+        self.addCleanup(dossier.cleanup)
+        reglages = override_settings(STATIC_ROOT=dossier.name)
+        reglages.enable()
+        self.addCleanup(reglages.disable)
+        Service.objects.create(titre="Développement Web", sous_titre="Sites modernes", description="Description")
+
+    def test_publication_et_service_par_whitenoise(self):
+        """Les fichiers versionnés sont publiés puis servis sans requête SQL."""
+        url = publier_catalogue(['services'])['services']
+        self.assertRegex(url, r'^/static/catalogue/services\.[0-9a-f]{12}\.json$')
+        self.assertEqual(lire_manifeste()['fichiers']['services'], url)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('immutable', response['Cache-Control'])
+        data = json.loads(gzip.decompress(b''.join(response.streaming_content)))
+        self.assertEqual(data['results'][0]['titre'], "Développement Web")
+
+        response = self.client.get('/static/catalogue/manifest.json')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('immutable', response['Cache-Control'])
+
+    @override_settings(CATALOGUE_AUTO_PUBLISH=True)
+    def test_regeneration_apres_modification(self):
+        """Une modification du contenu publie une nouvelle version."""
+        url = publier_catalogue(['services'])['services']
+        with mock.patch('backend.catalogue._executer_publication') as executer:
+            with self.captureOnCommitCallbacks(execute=True):
+                Service.objects.create(titre="Cybersécurité", sous_titre="Audit", description="Description")
+                Service.objects.create(titre="Réseaux", sous_titre="Audit", description="Description")
+            # Publication hors de la requête, une seule pour les deux modifications
+            self.assertEqual(lire_manifeste()['fichiers']['services'], url)
+            executer.assert_called_once()
+        executer.call_args.args[0]()
+        self.assertNotEqual(lire_manifeste()['fichiers']['services'], url)
+
+    def test_verrou_sans_fcntl(self):
+        """Sans fcntl (Windows), le manifeste est protégé par un fichier de verrou supprimé ensuite."""
+        with mock.patch('backend.catalogue.fcntl', None):
+            url = publier_catalogue(['services'])['services']
+        self.assertEqual(lire_manifeste()['fichiers']['services'], url)
+        self.assertFalse(os.path.exists(os.path.join(dossier_catalogue(), NOM_VERROU)))
+
+    def test_commande_sans_argument(self):
+        """publish_catalogue sans argument publie tous les endpoints ; un nom inconnu est refusé."""
+        call_command('publish_catalogue', stdout=io.StringIO())
+        self.assertEqual(set(lire_manifeste()['fichiers']), set(ENDPOINTS_CATALOGUE))
+        with self.assertRaises(CommandError):
+            call_command('publish_catalogue', 'inconnu', stdout=io.StringIO())
+
+
+class LireOuCalculerTestCase(TestCase):
+    """Tests du recalcul unique et de la revalidation des entrées de cache."""
+
+    def setUp(self):
+        """Configuration initiale pour les tests."""
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_un_seul_calcul_pour_les_requetes_concurrentes(self):
+        """Des requêtes simultanées sur une clé absente ne la calculent qu'une fois."""
+        appels = []
+
+        def calculer():
+            appels.append(1)
+            time.sleep(0.2)
+            return 'valeur'
+
+        resultats = []
+        threads = [
+            threading.Thread(target=lambda: resultats.append(obtenir_ou_calculer('cle', calculer, version=1)))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(appels), 1)
+        self.assertEqual(resultats, ['valeur'] * 5)
+
+    def test_valeur_perimee_servie_pendant_le_recalcul(self):
+        """Pendant qu'une autre requête recalcule, l'ancienne valeur est servie."""
+        obtenir_ou_calculer('cle', lambda: 'ancienne', version=1)
+        cache.add('cle:verrou', 1)
+        calculer = mock.Mock(return_value='nouvelle')
+        self.assertEqual(lire_ou_calculer('cle', calculer, version=2), ('ancienne', False))
+        calculer.assert_not_called()
+
+    def test_revalidation_en_arriere_plan(self):
+        """Une entrée expirée est servie puis recalculée en arrière-plan."""
+        obtenir_ou_calculer('cle', lambda: 'ancienne', version=1, duree_fraiche=60)
+        with mock.patch('backend.cache.time.time', return_value=time.time() + 61), \
+                mock.patch('backend.cache._executer_en_arriere_plan', side_effect=lambda fonction: fonction()):
+            self.assertEqual(obtenir_ou_calculer('cle', lambda: 'nouvelle', version=1, duree_fraiche=60), 'ancienne')
+        self.assertEqual(obtenir_ou_calculer('cle', lambda: 'autre', version=1), 'nouvelle')
+
+
+class ResolveurMediaTestCase(TestCase):
+    """Tests des URLs des images (backend.media.ResolveurMedia)."""
+
+    def setUp(self):
+        """Configuration initiale pour les tests."""
+        cache.clear()
+        self.service = Service.objects.create(
+            titre="Développement Web",
+            sous_titre="Sites modernes",
+            description="Description",
+            image='services/site web.jpg',
+        )
+
+    def test_url_absolue(self):
+        """Liste et détail donnent la même URL que request.build_absolute_uri."""
+        attendu = 'http://testserver/media/services/site%20web.jpg'
+        response = self.client.get(reverse('services:service-list'))
+        self.assertEqual(response.json()['results'][0]['image_principale'], attendu)
+        response = self.client.get(reverse('services:service-detail', args=[self.service.pk]))
+        self.assertEqual(response.json()['image_principale'], attendu)
+        self.assertEqual(response.json()['image'], attendu)
+
+    @override_settings(MEDIA_CDN_URL='https://cdn.example.com/media')
+    def test_prefixe_cdn(self):
+        """Avec MEDIA_CDN_URL, les URLs pointent vers le CDN."""
+        response = self.client.get(reverse('services:service-detail', args=[self.service.pk]))
+        self.assertEqual(response.json()['image_principale'], 'https://cdn.example.com/media/services/site%20web.jpg')
+
+
+class PaginationEstimeeTestCase(TestCase):
+    """Tests de la pagination avec nombre total estimé (backend.pagination.PaginationEstimee)."""
+
+    def setUp(self):
+        """Configuration initiale pour les tests."""
+        cache.clear()
+        Service.objects.bulk_create([
+            Service(titre=f"Service {i:02d}", sous_titre="Sous-titre", description="Description")
+            for i in range(25)
+        ])
+
+    def test_nombre_exact(self):
+        """Hors PostgreSQL, le nombre est exact."""
+        response = self.client.get(reverse('services:service-list'))
+        self.assertEqual(response.json()['count'], 25)
+        self.assertTrue(response.json()['count_exact'])
+
+    def test_nombre_estime(self):
+        """Avec une estimation, les pages suivantes sont détectées sans COUNT."""
+        with mock.patch('backend.pagination.estimer_nombre', return_value=(12, False)):
+            response = self.client.get(reverse('services:service-list'), {'page': 2})
+            self.assertFalse(response.json()['count_exact'])
+            self.assertIsNotNone(response.json()['next'])
+
+            # Au-delà de l'estimation, la dernière page donne le nombre exact
+            response = self.client.get(reverse('services:service-list'), {'page': 3})
+            self.assertEqual(len(response.json()['results']), 5)
+            self.assertEqual(response.json()['count'], 25)
+            self.assertTrue(response.json()['count_exact'])
+            self.assertIsNone(response.json()['next'])
+
+            response = self.client.get(reverse('services:service-list'), {'page': 4})
+            self.assertEqual(response.status_code, 404)
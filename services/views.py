@@ -1,5 +1,7 @@
 from rest_framework import generics
 from rest_framework.permissions import AllowAny
+from backend.base_api_views import ChampsPartielsMixin, ListeCompileeMixin
+from backend.cache import CacheReponseMixin
 from backend.permissions import IsAdminOrReadOnly
 from .models import Service
 from .serializers import (
@@ -16,7 +18,7 @@ from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiExam
         responses={200: ServiceListSerializer(many=True)}
     )
 )
-class ServiceListView(generics.ListAPIView):
+class ServiceListView(CacheReponseMixin, ChampsPartielsMixin, ListeCompileeMixin, generics.ListAPIView):
     """
     Vue pour lister tous les services.
     Accessible à tous (lecture publique).
@@ -33,7 +35,7 @@ class ServiceListView(generics.ListAPIView):
         responses={200: ServiceSerializer}
     )
 )
-class ServiceDetailView(generics.RetrieveAPIView):
+class ServiceDetailView(CacheReponseMixin, ChampsPartielsMixin, generics.RetrieveAPIView):
     """
     Vue pour afficher les détails d'un service spécifique.
     Accessible à tous (lecture publique).
@@ -1,5 +1,8 @@
 from django.contrib import admin
+from backend.exports import reponse_export
+from .archives import reponse_archive_demandes
 from .models import OffreStage, DemandeStage
+from .serializers import ExportDemandesSerializer
 
 @admin.register(OffreStage)
 class OffreStageAdmin(admin.ModelAdmin):
@@ -14,12 +17,26 @@ class DemandeStageAdmin(admin.ModelAdmin):
     list_filter = ('statut', 'date_demande', 'offre')
     search_fields = ('nom', 'prenom', 'email')
     readonly_fields = ('date_demande', 'date_modification')
-    actions = ['marquer_comme_accepte', 'marquer_comme_refuse']
+    actions = ['marquer_comme_accepte', 'marquer_comme_refuse', 'exporter_csv', 'exporter_ndjson', 'telecharger_pieces_jointes']
     
     def marquer_comme_accepte(self, request, queryset):
-        queryset.update(statut='accepte')
+        nombre = queryset.changer_statut('accepte')
+        self.message_user(request, f"{nombre} demande(s) acceptée(s), candidats notifiés par email.")
     marquer_comme_accepte.short_description = "Marquer les demandes sélectionnées comme acceptées"
     
     def marquer_comme_refuse(self, request, queryset):
-        queryset.update(statut='refuse')
-    marquer_comme_refuse.short_description = "Marquer les demandes sélectionnées comme refusées"
\ No newline at end of file
+        nombre = queryset.changer_statut('refuse')
+        self.message_user(request, f"{nombre} demande(s) refusée(s), candidats notifiés par email.")
+    marquer_comme_refuse.short_description = "Marquer les demandes sélectionnées comme refusées"
+
+    def exporter_csv(self, request, queryset):
+        return reponse_export(request, queryset, ExportDemandesSerializer.colonnes, 'csv', 'demandes-stage')
+    exporter_csv.short_description = "Exporter les demandes sélectionnées (CSV)"
+
+    def exporter_ndjson(self, request, queryset):
+        return reponse_export(request, queryset, ExportDemandesSerializer.colonnes, 'ndjson', 'demandes-stage')
+    exporter_ndjson.short_description = "Exporter les demandes sélectionnées (NDJSON)"
+
+    def telecharger_pieces_jointes(self, request, queryset):
+        return reponse_archive_demandes(queryset)
+    telecharger_pieces_jointes.short_description = "Télécharger les CV et lettres des demandes sélectionnées (ZIP)"
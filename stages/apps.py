@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class StagesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "stages"
+
+    def ready(self):
+        import stages.signals
@@ -0,0 +1,110 @@
+"""
+Archive ZIP des pièces jointes (CV, lettres de motivation) des demandes de stage.
+
+L'archive est produite en flux (voir backend.exports.ArchiveZipFlux) : les
+fichiers sont lus par blocs depuis le stockage et envoyés au fur et à mesure.
+Chaque demande a son dossier `<id>_<nom>-<prenom>/` ; `manifest.csv`, écrit en
+dernier, liste les demandes, les chemins des fichiers dans l'archive et les
+fichiers absents du stockage.
+
+Une seule entrée de l'archive peut être ouverte en écriture à la fois : le
+manifeste ne peut pas être écrit pendant l'ajout des fichiers. Il est produit
+par un second parcours des demandes, écrit directement dans l'archive ; seuls
+les fichiers illisibles du premier parcours sont gardés en mémoire.
+"""
+import logging
+import os
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.text import slugify
+
+from backend.exports import ArchiveZipFlux, flux_csv, reponse_zip
+from .models import DemandeStage
+
+logger = logging.getLogger(__name__)
+
+# Pièces jointes ajoutées à l'archive (champs FileField de DemandeStage)
+CHAMPS_FICHIERS = ('cv', 'lettre_motivation')
+
+ENTETES_MANIFESTE = [
+    'id', 'nom', 'prenom', 'email', 'offre', 'offre_titre', 'statut', 'date_demande',
+    *CHAMPS_FICHIERS, 'fichiers_manquants',
+]
+
+COLONNES_DEMANDE = (
+    'id', 'nom', 'prenom', 'email', 'offre_id', 'offre__titre', 'statut', 'date_demande', *CHAMPS_FICHIERS,
+)
+
+
+def dossier_demande(pk, nom, prenom):
+    """Dossier de la demande dans l'archive."""
+    return f"{pk}_{slugify(nom)}-{slugify(prenom)}"
+
+
+def chemin_fichier(dossier, champ, nom_stocke):
+    """Chemin dans l'archive de la pièce jointe `champ` stockée sous `nom_stocke`."""
+    return f"{dossier}/{champ}{os.path.splitext(nom_stocke)[1].lower()}"
+
+
+def lire_demandes(queryset):
+    return queryset.values_list(*COLONNES_DEMANDE).iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+
+
+def lignes_manifeste(queryset, manquants):
+    """
+    Lignes du manifeste, relues en base. `manquants` contient les couples
+    (id, champ) des fichiers qui n'ont pas pu être ajoutés à l'archive.
+    """
+    for pk, nom, prenom, email, offre, offre_titre, statut, date_demande, *fichiers in lire_demandes(queryset):
+        dossier = dossier_demande(pk, nom, prenom)
+        chemins = [
+            chemin_fichier(dossier, champ, nom_stocke) if nom_stocke and (pk, champ) not in manquants else ''
+            for champ, nom_stocke in zip(CHAMPS_FICHIERS, fichiers)
+        ]
+        manquants_demande = [champ for champ in CHAMPS_FICHIERS if (pk, champ) in manquants]
+        yield (
+            pk, nom, prenom, email, offre, offre_titre, statut, timezone.localtime(date_demande),
+            *chemins, ' '.join(manquants_demande),
+        )
+
+
+def flux_archive_demandes(queryset):
+    """
+    Génère l'archive ZIP des pièces jointes des demandes de `queryset`.
+
+    Le manifeste ne porte que sur les demandes du premier parcours : celles
+    créées entre-temps (id supérieur) sont exclues. Une demande supprimée
+    entre les deux parcours a ses fichiers dans l'archive mais pas de ligne.
+    """
+    archive = ArchiveZipFlux()
+    stockages = [DemandeStage._meta.get_field(champ).storage for champ in CHAMPS_FICHIERS]
+    manquants = set()
+    pk_max = None
+
+    for pk, nom, prenom, _, _, _, _, date_demande, *fichiers in lire_demandes(queryset):
+        pk_max = pk if pk_max is None else max(pk_max, pk)
+        dossier = dossier_demande(pk, nom, prenom)
+        date = timezone.localtime(date_demande)
+        for champ, stockage, nom_stocke in zip(CHAMPS_FICHIERS, stockages, fichiers):
+            if not nom_stocke:
+                continue
+            try:
+                taille = stockage.size(nom_stocke)
+                fichier = stockage.open(nom_stocke, 'rb')
+            except OSError as e:
+                logger.warning("Fichier %s de la demande %s illisible : %s", nom_stocke, pk, e)
+                manquants.add((pk, champ))
+                continue
+            with fichier:
+                yield from archive.ajouter_fichier(chemin_fichier(dossier, champ, nom_stocke), fichier, taille, date)
+
+    demandes_archivees = queryset.none() if pk_max is None else queryset.filter(pk__lte=pk_max)
+    manifeste = flux_csv(lignes_manifeste(demandes_archivees, manquants), ENTETES_MANIFESTE)
+    yield from archive.ajouter_flux('manifest.csv', (morceau.encode('utf-8') for morceau in manifeste))
+    yield from archive.fermer()
+
+
+def reponse_archive_demandes(queryset):
+    """StreamingHttpResponse de l'archive ZIP des demandes de `queryset`."""
+    return reponse_zip(flux_archive_demandes(queryset), 'demandes-stage')
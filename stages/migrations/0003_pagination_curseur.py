@@ -0,0 +1,21 @@
+# Generated by Django 5.2 on 2026-10-18 12:56
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("stages", "0002_alter_demandestage_options_alter_offrestage_options"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="demandestage",
+            index=models.Index(
+                fields=["date_demande", "id"], name="demandestage_date_id_idx"
+            ),
+        ),
+    ]
@@ -1,11 +1,10 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
-from django.core.mail import send_mail
 from django.conf import settings
+from django.utils import timezone
 import logging
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from backend.mixins import SuiviChangementsMixin, TextesLongsQuerySet
+from notifications.outbox import mettre_en_file, mettre_en_file_lot
 
 logger = logging.getLogger(__name__)
 
@@ -23,17 +22,6 @@ logger = logging.getLogger(__name__)
     #def __str__(self):
     #    return self.nom
 
-def test_smtp_connection():
-    try:
-        server = smtplib.SMTP(settings.EMAIL_HOST, settings.EMAIL_PORT)
-        server.starttls()
-        server.login(settings.EMAIL_HOST_USER, settings.EMAIL_HOST_PASSWORD)
-        server.quit()
-        return True
-    except Exception as e:
-        logger.error(f"Erreur de connexion SMTP: {str(e)}")
-        return False
-
 class OffreStage(models.Model):
     """
     Modèle représentant une offre de stage.
@@ -52,6 +40,8 @@ class OffreStage(models.Model):
     duree = models.IntegerField(help_text="Durée en semaines")
     competences = models.TextField()
     mission = models.TextField()
+
+    objects = TextesLongsQuerySet.as_manager()
     
     class Meta:
         ordering = ['-date_debut']  # Tri par date de début (du plus récent au plus ancien)
@@ -59,7 +49,37 @@ class OffreStage(models.Model):
     def __str__(self):
         return self.titre
 
-class DemandeStage(models.Model):
+class DemandeStageQuerySet(models.QuerySet):
+    
+    def changer_statut(self, statut):
+        """
+        Change le statut de toutes les demandes du queryset en une seule requête UPDATE
+        et met en file un email de notification par demande réellement modifiée.
+        
+        Returns:
+            int: Nombre de demandes modifiées
+        """
+        with transaction.atomic():
+            demandes = list(
+                self.exclude(statut=statut)
+                .select_for_update(of=('self',))
+                .values_list('pk', 'email', 'offre__titre')
+            )
+            if not demandes:
+                return 0
+            
+            DemandeStage.objects.filter(pk__in=[pk for pk, _, _ in demandes]).update(
+                statut=statut,
+                date_modification=timezone.now(),
+            )
+            mettre_en_file_lot(
+                (*DemandeStage.email_changement_statut(titre_offre, statut), [email], settings.DEFAULT_FROM_EMAIL)
+                for _, email, titre_offre in demandes
+            )
+        return len(demandes)
+
+
+class DemandeStage(SuiviChangementsMixin, models.Model):
     """
     Modèle représentant une demande de stage.
     
@@ -91,60 +111,53 @@ class DemandeStage(models.Model):
     date_demande = models.DateTimeField(auto_now_add=True)
     date_modification = models.DateTimeField(auto_now=True)
     
+    objects = DemandeStageQuerySet.as_manager()
+    
+    # Champs dont la modification est détectée sans relire la base (voir SuiviChangementsMixin)
+    champs_suivis = ('statut',)
+    
     class Meta:
         ordering = ['-date_demande']  # Tri par date de demande (du plus récent au plus ancien)
+        indexes = [
+            # Pagination par curseur sur (date_demande, id) (voir backend/pagination.py)
+            models.Index(fields=['date_demande', 'id'], name='demandestage_date_id_idx'),
+        ]
     
     def __str__(self):
         return f"{self.nom} {self.prenom} - {self.email} - {self.offre.titre} - {self.statut}"
     
+    @staticmethod
+    def email_changement_statut(titre_offre, statut):
+        """
+        Retourne le sujet et le message de l'email envoyé au candidat lors d'un changement de statut.
+        """
+        if statut == 'accepte':
+            message = f'Votre demande de stage pour "{titre_offre}" a été acceptée. Nous vous contacterons pour la suite.'
+        elif statut == 'refuse':
+            message = f'Votre demande de stage pour "{titre_offre}" a été refusée. Nous vous remercions de votre intérêt.'
+        else:
+            message = f'Votre demande de stage pour "{titre_offre}" est de nouveau en cours de traitement.'
+        return f'Statut de votre demande de stage - {statut}', message
+    
     def save(self, *args, **kwargs):
         is_new = self.pk is None
-        old_instance = None
-        if not is_new:
-            old_instance = DemandeStage.objects.get(pk=self.pk)
-        
-        super().save(*args, **kwargs)
+        statut_modifie = not is_new and self.has_changed('statut')
         
-        try:
-            # Test de la connexion SMTP avant d'envoyer l'email
-            if not test_smtp_connection():
-                logger.error("Impossible de se connecter au serveur SMTP")
-                raise Exception("Erreur de connexion SMTP")
+        # La demande et l'email sont enregistrés dans la même transaction :
+        # l'envoi réel est assuré par le worker (process_email_outbox).
+        with transaction.atomic():
+            super().save(*args, **kwargs)
             
-            # Envoi d'email lors de la création d'une nouvelle demande
+            # Email de confirmation lors de la création d'une nouvelle demande
             if is_new:
-                logger.info(f"Tentative d'envoi d'email de confirmation à {self.email}")
-                logger.info(f"Configuration email: HOST={settings.EMAIL_HOST}, PORT={settings.EMAIL_PORT}, USER={settings.EMAIL_HOST_USER}")
-                
-                # Création d'un message à envoyer
-                msg = MIMEMultipart()
-                send_mail(
+                mettre_en_file(
                     'Confirmation de votre demande de stage',
                     f'Votre demande de stage pour "{self.offre.titre}" a bien été reçue. Nous vous contacterons bientôt.',
-                    settings.DEFAULT_FROM_EMAIL,
                     [self.email],
-                    fail_silently=False,
-                )
-                logger.info(f"Email de confirmation envoyé avec succès à {self.email}")
-            
-            # Envoi d'email lors du changement de statut
-            elif old_instance and old_instance.statut != self.statut:
-                logger.info(f"Tentative d'envoi d'email de changement de statut à {self.email}")
-                if self.statut == 'accepte':
-                    message = f'Votre demande de stage pour "{self.offre.titre}" a été acceptée. Nous vous contacterons pour la suite.'
-                else:
-                    message = f'Votre demande de stage pour "{self.offre.titre}" a été refusée. Nous vous remercions de votre intérêt.'
-                
-                send_mail(
-                    f'Statut de votre demande de stage - {self.statut}',
-                    message,
                     settings.DEFAULT_FROM_EMAIL,
-                    [self.email],
-                    fail_silently=False,
                 )
-                logger.info(f"Email de changement de statut envoyé avec succès à {self.email}")
-        
-        except Exception as e:
-            logger.error(f"Erreur lors de l'envoi de l'email: {str(e)}")
-            # On lève l'exception pour voir l'erreur dans la console    pour le test
-            raise
\ No newline at end of file
+            
+            # Email lors du changement de statut
+            elif statut_modifie:
+                sujet, message = self.email_changement_statut(self.offre.titre, self.statut)
+                mettre_en_file(sujet, message, [self.email], settings.DEFAULT_FROM_EMAIL)
@@ -1,4 +1,9 @@
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
 from rest_framework import serializers
+from backend.exports import FORMATS_EXPORT, Colonne
+from backend.serializers import ListSerializerCompile
 from .models import OffreStage, DemandeStage
 
 class OffreStageSerializer(serializers.ModelSerializer):
@@ -12,6 +17,17 @@ class OffreStageSerializer(serializers.ModelSerializer):
         model = OffreStage
         fields = '__all__'
 
+class OffreStageListSerializer(serializers.ModelSerializer):
+    """
+    Sérialiseur pour la liste des offres de stage.
+
+    Sans la description, les compétences ni la mission, disponibles dans le détail.
+    """
+    class Meta:
+        model = OffreStage
+        fields = ('id', 'titre', 'date_debut', 'duree')
+        list_serializer_class = ListSerializerCompile
+
 class DemandeStageSerializer(serializers.ModelSerializer):
     """
     Sérialiseur pour le modèle DemandeStage.
@@ -52,6 +68,63 @@ class DemandeStageSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("La lettre de motivation est requise")
         return value
 
+class StatutGroupeSerializer(serializers.Serializer):
+    """
+    Sérialiseur pour le changement de statut groupé de plusieurs demandes.
+    """
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+    status = serializers.ChoiceField(choices=DemandeStage.STATUT_CHOICES)
+
+def debut_journee(jour):
+    """Début (00:00, fuseau courant) de la journée `jour`."""
+    return timezone.make_aware(datetime.combine(jour, time.min))
+
+class FiltreDemandesSerializer(serializers.Serializer):
+    """
+    Sérialiseur des filtres des exports de demandes de stage (paramètres de requête).
+    Les dates sont incluses et s'appliquent à la date de la demande.
+    """
+    offre = serializers.IntegerField(required=False)
+    statut = serializers.ChoiceField(choices=DemandeStage.STATUT_CHOICES, required=False)
+    depuis = serializers.DateField(required=False)
+    jusqu_a = serializers.DateField(required=False)
+
+    def filtrer(self, queryset):
+        """Applique les filtres validés à `queryset`."""
+        filtres = self.validated_data
+        if 'offre' in filtres:
+            queryset = queryset.filter(offre_id=filtres['offre'])
+        if 'statut' in filtres:
+            queryset = queryset.filter(statut=filtres['statut'])
+        # Bornes en date et heure pour profiter de l'index sur date_demande
+        if 'depuis' in filtres:
+            queryset = queryset.filter(date_demande__gte=debut_journee(filtres['depuis']))
+        if 'jusqu_a' in filtres:
+            queryset = queryset.filter(date_demande__lt=debut_journee(filtres['jusqu_a'] + timedelta(days=1)))
+        return queryset
+
+class ExportDemandesSerializer(FiltreDemandesSerializer):
+    """
+    Sérialiseur des paramètres de l'export des demandes de stage.
+    `type` remplace `format`, réservé par DRF à la négociation de contenu.
+    """
+    type = serializers.ChoiceField(choices=list(FORMATS_EXPORT), default='csv')
+
+    # Colonnes exportées (voir backend/exports.py)
+    colonnes = [
+        Colonne('id'),
+        Colonne('nom'),
+        Colonne('prenom'),
+        Colonne('email'),
+        Colonne('offre', 'offre_id'),
+        Colonne('offre_titre', 'offre__titre'),
+        Colonne('statut'),
+        Colonne('date_demande'),
+        Colonne('date_modification'),
+        Colonne('cv', media=True),
+        Colonne('lettre_motivation', media=True),
+    ]
+
 #class VerificationStatutSerializer(serializers.Serializer):
     #"""
     #Sérialiseur pour la vérification du statut d'une demande.
@@ -0,0 +1,4 @@
+from backend.cache import suivre_versions
+from .models import OffreStage
+
+suivre_versions(OffreStage)
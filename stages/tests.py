@@ -1,165 +1,257 @@
-from django.test import TestCase
+import csv
+import datetime
+import io
+import tempfile
+import zipfile
+from unittest import mock
+
+from django.test import override_settings
 from django.urls import reverse
 from rest_framework.test import APITestCase
 from rest_framework import status
 from django.contrib.auth.models import User
-from .models import DomaineStage, DemandeStage
-import json
-import uuid
 from django.core.files.uploadedfile import SimpleUploadedFile
+from accounts.models import Administrateur
+from . import archives
+from .models import OffreStage, DemandeStage
+
+
+def creer_offre(titre="Développeur"):
+    return OffreStage.objects.create(
+        titre=titre,
+        description="Description",
+        date_debut=datetime.date(2025, 9, 1),
+        duree=12,
+        competences="Python",
+        mission="Mission",
+    )
+
+
+def creer_admin(username='admin'):
+    admin = User.objects.create_user(username=username, password='adminpass123')
+    Administrateur.objects.create().utilisateurs.add(admin)
+    return admin
 
-class DomaineStageTests(APITestCase):
+
+class OffreStageTests(APITestCase):
     def setUp(self):
-        self.domaine_url = reverse('domaines-list')
-        self.domaine = DomaineStage.objects.create(
-            nom="Développement Web",
-            description="Stages en développement web"
-        )
+        self.offre_url = reverse('offrestage-list')
+        self.offre = creer_offre()
 
-    def test_list_domaines(self):
-        response = self.client.get(self.domaine_url)
+    def test_list_offres(self):
+        response = self.client.get(self.offre_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['nom'], "Développement Web")
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(response.data['results'][0]['titre'], "Développeur")
+
 
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
 class DemandeStageTests(APITestCase):
     def setUp(self):
-        # Créer un domaine de stage
-        self.domaine = DomaineStage.objects.create(
-            nom="Développement Web",
-            description="Stages en développement web"
-        )
-        
-        # Créer un utilisateur
-        self.user = User.objects.create_user(
-            username='testuser',
-            password='testpass123'
-        )
-        
-        # URLs
-        self.demande_url = reverse('demande-create')
-        self.verification_url = reverse('verification-statut')
-        
-        # Créer un fichier CV de test
-        self.cv_file = SimpleUploadedFile(
-            "test_cv.pdf",
-            b"file_content",
-            content_type="application/pdf"
-        )
+        self.offre = creer_offre()
+        self.demande_url = reverse('demandestage-list')
+
+        # Fichiers de test
+        self.cv_file = SimpleUploadedFile("test_cv.pdf", b"file_content", content_type="application/pdf")
+        self.lettre_file = SimpleUploadedFile("test_lm.pdf", b"file_content", content_type="application/pdf")
 
     def test_create_demande(self):
         data = {
+            'nom': 'Doe',
+            'prenom': 'John',
             'email': 'test@example.com',
-            'domaine': self.domaine.id,
-            'requete': 'Je souhaite faire un stage en développement web',
-            'cv': self.cv_file
+            'offre': self.offre.id,
+            'cv': self.cv_file,
+            'lettre_motivation': self.lettre_file,
         }
-        
-        response = self.client.post(
-            self.demande_url,
-            data=data,
-            format='multipart'
-        )
-        
+        response = self.client.post(self.demande_url, data=data, format='multipart')
+
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertEqual(DemandeStage.objects.count(), 1)
         self.assertEqual(DemandeStage.objects.get().email, 'test@example.com')
-
-    def test_verification_statut(self):
-        # Créer une demande de stage
-        demande = DemandeStage.objects.create(
-            email='test@example.com',
-            domaine=self.domaine,
-            requete='Test requête',
-            cv=self.cv_file
-        )
-        
-        # Tester la vérification du statut
-        data = {'code_unique': str(demande.code_unique)}
-        response = self.client.post(
-            self.verification_url,
-            data=json.dumps(data),
-            content_type='application/json'
-        )
-        
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data['email'], 'test@example.com')
         self.assertEqual(response.data['statut'], 'en_cours')
 
-    def test_verification_statut_invalid_code(self):
-        data = {'code_unique': str(uuid.uuid4())}
-        response = self.client.post(
-            self.verification_url,
-            data=json.dumps(data),
-            content_type='application/json'
-        )
-        
-        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+    def test_list_demandes_unauthorized(self):
+        response = self.client.get(self.demande_url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
 class DemandeStageDetailTests(APITestCase):
     def setUp(self):
-        # Créer un domaine de stage
-        self.domaine = DomaineStage.objects.create(
-            nom="Développement Web",
-            description="Stages en développement web"
-        )
-        
-        # Créer un utilisateur admin
-        self.admin_user = User.objects.create_superuser(
-            username='admin',
-            email='admin@example.com',
-            password='adminpass123'
-        )
-        
-        # Créer un fichier CV de test
-        self.cv_file = SimpleUploadedFile(
-            "test_cv.pdf",
-            b"file_content",
-            content_type="application/pdf"
-        )
-        
         # Créer une demande de stage
         self.demande = DemandeStage.objects.create(
+            nom='Doe',
+            prenom='John',
             email='test@example.com',
-            domaine=self.domaine,
-            requete='Test requête',
-            cv=self.cv_file
+            offre=creer_offre(),
+            cv=SimpleUploadedFile("test_cv.pdf", b"file_content", content_type="application/pdf"),
+            lettre_motivation=SimpleUploadedFile("test_lm.pdf", b"file_content", content_type="application/pdf"),
         )
-        
-        # URL pour la mise à jour
-        self.detail_url = reverse('demande-detail', kwargs={'code_unique': self.demande.code_unique})
-        
+        self.status_url = reverse('demandestage-update-status', args=[self.demande.pk])
+        self.detail_url = reverse('demandestage-detail', args=[self.demande.pk])
+
         # Authentifier l'admin
-        self.client.force_authenticate(user=self.admin_user)
+        self.client.force_authenticate(user=creer_admin())
 
     def test_update_statut(self):
-        data = {
-            'statut': 'accepte'
-        }
-        response = self.client.patch(
-            self.detail_url,
-            data=json.dumps(data),
-            content_type='application/json'
-        )
-        
+        response = self.client.post(self.status_url, {'status': 'accepte'}, format='json')
+
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(DemandeStage.objects.get().statut, 'accepte')
 
     def test_update_statut_unauthorized(self):
-        # Créer un utilisateur non-admin
-        user = User.objects.create_user(
-            username='user',
-            password='userpass123'
-        )
+        # Utilisateur non administrateur
+        user = User.objects.create_user(username='user', password='userpass123')
         self.client.force_authenticate(user=user)
-        
-        data = {
-            'statut': 'accepte'
-        }
-        response = self.client.patch(
-            self.detail_url,
-            data=json.dumps(data),
-            content_type='application/json'
-        )
-        
+
+        response = self.client.post(self.status_url, {'status': 'accepte'}, format='json')
+
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(DemandeStage.objects.get().statut, 'en_cours')
+
+    def test_verification_statut(self):
+        response = self.client.get(self.detail_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['email'], 'test@example.com')
+        self.assertEqual(response.data['statut'], 'en_cours')
+
+    def test_verification_statut_demande_inconnue(self):
+        response = self.client.get(reverse('demandestage-detail', args=[self.demande.pk + 1]))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_modification_unauthorized(self):
+        # Utilisateur non administrateur
+        user = User.objects.create_user(username='user', password='userpass123')
+        self.client.force_authenticate(user=user)
+
+        response = self.client.patch(self.detail_url, {'nom': 'Autre'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(DemandeStage.objects.get().nom, 'Doe')
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ExportDemandesTestCase(APITestCase):
+    """Tests de l'export en flux des demandes de stage (backend/exports.py)."""
+
+    def setUp(self):
+        """Configuration initiale pour les tests."""
+        self.admin = creer_admin()
+        self.offres = [creer_offre(titre) for titre in ("Développeur", "Réseaux")]
+        for i, offre in enumerate(self.offres * 2):
+            DemandeStage.objects.create(
+                nom=f"Nom {i}", prenom="+33 6 00 00 00 00" if i == 0 else "Prénom", email=f"candidat{i}@example.com",
+                offre=offre, statut='accepte' if i < 2 else 'en_cours',
+                cv=SimpleUploadedFile(f"cv{i}.pdf", b"cv"),
+                lettre_motivation=SimpleUploadedFile(f"lettre{i}.pdf", b"lettre"),
+            )
+        self.url = reverse('demandestage-export')
+
+    def test_export_reserve_aux_administrateurs(self):
+        """L'export n'est pas accessible sans être administrateur."""
+        self.assertIn(self.client.get(self.url).status_code, (401, 403))
+
+    def test_export_csv_filtre(self):
+        """L'export CSV est filtré par offre et statut, avec les URLs des fichiers."""
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get(self.url, {'offre': self.offres[0].pk, 'statut': 'accepte'})
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment; filename="demandes-stage-', response['Content-Disposition'])
+        contenu = b''.join(response.streaming_content).decode('utf-8-sig')
+        lignes = list(csv.DictReader(io.StringIO(contenu)))
+        self.assertEqual(len(lignes), 1)
+        self.assertEqual(lignes[0]['offre_titre'], "Développeur")
+        self.assertTrue(lignes[0]['cv'].startswith('http://testserver/media/cvs/cv0'))
+        self.assertEqual(lignes[0]['prenom'], "'+33 6 00 00 00 00")
+
+    def test_parametres_invalides(self):
+        """Un statut inconnu donne une erreur 400."""
+        self.client.force_authenticate(user=self.admin)
+        self.assertEqual(self.client.get(self.url, {'statut': 'archive'}).status_code, 400)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ArchiveDemandesTestCase(APITestCase):
+    """Tests de l'archive ZIP en flux des pièces jointes des demandes (stages/archives.py)."""
+
+    def setUp(self):
+        """Configuration initiale pour les tests."""
+        self.admin = creer_admin()
+        self.offres = [creer_offre(titre) for titre in ("Développeur", "Réseaux")]
+        self.demandes = [
+            DemandeStage.objects.create(
+                nom="@SOMME(A1)" if i == 0 else f"Nom {i}", prenom="Prénom", email=f"candidat{i}@example.com",
+                offre=offre,
+                cv=SimpleUploadedFile(f"cv{i}.pdf", b"%PDF-cv " * 10000),
+                lettre_motivation=SimpleUploadedFile(f"lettre{i}.PDF", f"lettre {i}".encode()),
+            )
+            for i, offre in enumerate(self.offres * 2)
+        ]
+        self.url = reverse('demandestage-archive')
+
+    def lire_archive(self, response):
+        self.assertTrue(response.streaming)
+        return zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+
+    def test_archive_reservee_aux_administrateurs(self):
+        """L'archive n'est pas accessible sans être administrateur."""
+        response = self.client.get(self.url)
+        self.assertIn(response.status_code, (401, 403))
+
+    def test_archive_filtree_par_offre(self):
+        """L'archive contient les fichiers des demandes de l'offre et un manifeste."""
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get(self.url, {'offre': self.offres[0].pk})
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        self.assertIn('attachment; filename="demandes-stage-', response['Content-Disposition'])
+        archive = self.lire_archive(response)
+        self.assertIsNone(archive.testzip())
+
+        demande = self.demandes[0]
+        dossier = f"{demande.pk}_sommea1-prenom"
+        self.assertEqual(archive.read(f"{dossier}/cv.pdf"), b"%PDF-cv " * 10000)
+        self.assertEqual(archive.read(f"{dossier}/lettre_motivation.pdf"), b"lettre 0")
+        self.assertEqual(len(archive.namelist()), 2 * 2 + 1)
+
+        manifeste = archive.read('manifest.csv').decode('utf-8-sig')
+        lignes = list(csv.DictReader(io.StringIO(manifeste)))
+        self.assertEqual({int(ligne['id']) for ligne in lignes}, {self.demandes[0].pk, self.demandes[2].pk})
+        self.assertEqual(lignes[0]['offre_titre'], "Développeur")
+        # Valeur saisie par le candidat neutralisée comme dans les exports CSV
+        self.assertIn("'@SOMME(A1)", [ligne['nom'] for ligne in lignes])
+
+    def test_fichier_manquant(self):
+        """Un fichier absent du stockage est signalé dans le manifeste sans interrompre l'archive."""
+        demande = self.demandes[1]
+        demande.cv.storage.delete(demande.cv.name)
+        self.client.force_authenticate(user=self.admin)
+        archive = self.lire_archive(self.client.get(self.url, {'offre': self.offres[1].pk}))
+        lignes = {
+            int(ligne['id']): ligne
+            for ligne in csv.DictReader(io.StringIO(archive.read('manifest.csv').decode('utf-8-sig')))
+        }
+        self.assertEqual(lignes[demande.pk]['cv'], '')
+        self.assertEqual(lignes[demande.pk]['fichiers_manquants'], 'cv')
+        self.assertTrue(lignes[demande.pk]['lettre_motivation'])
+        self.assertEqual(len(archive.namelist()), 3 + 1)
+
+    def test_demande_creee_pendant_archive(self):
+        """Une demande créée après l'ajout des fichiers n'apparaît pas dans le manifeste."""
+        lignes_manifeste = archives.lignes_manifeste
+
+        def creer_puis_lire(queryset, manquants):
+            DemandeStage.objects.create(
+                nom="Nouveau", prenom="Candidat", email="nouveau@example.com", offre=self.offres[0],
+                cv=SimpleUploadedFile("cv.pdf", b"cv"), lettre_motivation=SimpleUploadedFile("lettre.pdf", b"lettre"),
+            )
+            return lignes_manifeste(queryset, manquants)
+
+        self.client.force_authenticate(user=self.admin)
+        with mock.patch('stages.archives.lignes_manifeste', side_effect=creer_puis_lire):
+            archive = self.lire_archive(self.client.get(self.url))
+        lignes = list(csv.DictReader(io.StringIO(archive.read('manifest.csv').decode('utf-8-sig'))))
+        self.assertEqual({int(ligne['id']) for ligne in lignes}, {demande.pk for demande in self.demandes})
+        self.assertEqual(len(archive.namelist()), 4 * 2 + 1)
@@ -2,9 +2,17 @@ from django.shortcuts import render
 from rest_framework import status, viewsets, permissions
 from rest_framework.response import Response
 from rest_framework.decorators import action
-from backend.permissions import IsAdminUser, IsAdminOrReadOnly, IsAdminOrCreateOnly
+from backend.base_api_views import ChampsPartielsMixin, ListeCompileeMixin
+from backend.cache import CacheReponseMixin
+from backend.exports import reponse_export
+from backend.pagination import PaginationCurseurOptionnelle
+from backend.permissions import IsAdminUser, IsAdminOrReadOnly, IsAdminOrCreateOnly, is_gin_admin
+from .archives import reponse_archive_demandes
 from .models import OffreStage, DemandeStage
-from .serializers import DemandeStageSerializer, OffreStageSerializer
+from .serializers import (
+    DemandeStageSerializer, ExportDemandesSerializer, FiltreDemandesSerializer, OffreStageListSerializer,
+    OffreStageSerializer, StatutGroupeSerializer,
+)
 from drf_spectacular.utils import extend_schema, extend_schema_view
 
 
@@ -16,16 +24,27 @@ from drf_spectacular.utils import extend_schema, extend_schema_view
     partial_update=extend_schema(summary="Mise à jour partielle d'une offre de stage"),
     destroy=extend_schema(summary="Supprimer une offre de stage"),
 )
-class OffreStageViewSet(viewsets.ModelViewSet):
+class OffreStageViewSet(CacheReponseMixin, ChampsPartielsMixin, ListeCompileeMixin, viewsets.ModelViewSet):
     """
     ViewSet pour les offres de stage.
     - READ (list, retrieve): Public (AllowAny)
     - CREATE/UPDATE/DELETE: Admin uniquement
+    La liste n'affiche pas les champs texte longs (voir OffreStageListSerializer).
     """
     queryset = OffreStage.objects.all()
     serializer_class = OffreStageSerializer
     permission_classes = [IsAdminOrReadOnly]
 
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return OffreStageListSerializer
+        return super().get_serializer_class()
+
+    def get_queryset(self):
+        if self.action == 'list':
+            return OffreStage.objects.sans_textes_longs()
+        return super().get_queryset()
+
 @extend_schema_view(
     list=extend_schema(summary="Lister les demandes de stage"),
     retrieve=extend_schema(summary="Voir une demande de stage"),
@@ -43,25 +62,23 @@ class DemandeStageViewSet(viewsets.ModelViewSet):
     queryset = DemandeStage.objects.all()
     serializer_class = DemandeStageSerializer
     permission_classes = [IsAdminOrCreateOnly]
+    # ?pagination=curseur : pagination à coût constant sur (date_demande, id)
+    pagination_class = PaginationCurseurOptionnelle
+    ordre_curseur = ('-date_demande', '-id')
 
     def get_queryset(self):
         """
         Retourne toutes les demandes si l'utilisateur est admin,
         sinon aucune demande (sécurité).
         """
-        if self.request.user.is_authenticated:
-            try:
-                from accounts.models import Administrateur
-                if Administrateur.objects.filter(utilisateurs=self.request.user).exists():
-                    return DemandeStage.objects.all()
-            except Exception:
-                pass
+        if is_gin_admin(self.request.user, self.request):
+            return DemandeStage.objects.all()
         return DemandeStage.objects.none()
 
     @extend_schema(summary="Mettre à jour le statut d'une demande")
     @action(detail=True, methods=['post'])
     def update_status(self, request, pk=None):
-        if not request.user.is_staff:
+        if not is_gin_admin(request.user, request):
             return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
         demande = self.get_object()
         new_status = request.data.get('status')
@@ -71,3 +88,59 @@ class DemandeStageViewSet(viewsets.ModelViewSet):
         demande.save()
         serializer = self.get_serializer(demande)
         return Response(serializer.data)
+
+    @extend_schema(
+        summary="Changer le statut de plusieurs demandes",
+        request=StatutGroupeSerializer,
+    )
+    @action(detail=False, methods=['post'], permission_classes=[IsAdminUser])
+    def bulk_status(self, request):
+        """
+        Change le statut des demandes indiquées en une seule requête
+        et met en file les emails de notification des candidats.
+        """
+        serializer = StatutGroupeSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        nombre = self.get_queryset().filter(
+            pk__in=serializer.validated_data['ids']
+        ).changer_statut(serializer.validated_data['status'])
+        return Response({
+            'message': f'{nombre} demande(s) mise(s) à jour',
+            'updated': nombre,
+        })
+
+    @extend_schema(
+        summary="Exporter les demandes de stage (CSV ou NDJSON)",
+        parameters=[ExportDemandesSerializer],
+        responses={(200, 'text/csv'): bytes, (200, 'application/x-ndjson'): bytes},
+    )
+    @action(detail=False, methods=['get'], permission_classes=[IsAdminUser])
+    def export(self, request):
+        """
+        Exporte en flux les demandes filtrées par offre, statut et dates
+        (?type=csv ou ?type=ndjson), sans les charger toutes en mémoire.
+        """
+        parametres = ExportDemandesSerializer(data=request.query_params)
+        parametres.is_valid(raise_exception=True)
+        return reponse_export(
+            request,
+            parametres.filtrer(self.get_queryset()),
+            ExportDemandesSerializer.colonnes,
+            parametres.validated_data['type'],
+            'demandes-stage',
+        )
+
+    @extend_schema(
+        summary="Télécharger les CV et lettres de motivation (ZIP)",
+        parameters=[FiltreDemandesSerializer],
+        responses={(200, 'application/zip'): bytes},
+    )
+    @action(detail=False, methods=['get'], permission_classes=[IsAdminUser])
+    def archive(self, request):
+        """
+        Archive ZIP en flux des CV et lettres de motivation des demandes
+        filtrées par offre, statut et dates, avec un manifest.csv.
+        """
+        parametres = FiltreDemandesSerializer(data=request.query_params)
+        parametres.is_valid(raise_exception=True)
+        return reponse_archive_demandes(parametres.filtrer(self.get_queryset()))